@@ -43,7 +43,7 @@ def create_app(config_name=None):
     
     # Carrega configurações
     from .config import get_config
-    config = get_config()
+    config = get_config(config_name)
     app.config.from_object(config)
     
     # Configura extensões
@@ -54,7 +54,12 @@ def create_app(config_name=None):
     jwt.init_app(app)
     cache.init_app(app)
     CORS(app)
-    Talisman(app, content_security_policy=None)
+    # Nos testes o cliente usa HTTP; sem isso toda requisição seria redirecionada
+    Talisman(
+        app,
+        content_security_policy=None,
+        force_https=not app.config.get('TESTING', False)
+    )
     
     # Configura login
     login_manager.login_view = 'rotas.login'
@@ -63,13 +68,81 @@ def create_app(config_name=None):
     # Cria diretórios necessários
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     
+    # As tabelas e o gerente padrão são criados por ``flask gymflow init-db``
+    # (banco novo) ou pelas migrações; a criação da aplicação não consulta o
+    # banco, para que ``flask db upgrade`` rode em bancos desatualizados
+    
+    # Serviços de cada processo, iniciados na primeira requisição
+    from .inicializacao import TarefasDoProcesso
+    tarefas_do_processo = TarefasDoProcesso()
+    app.extensions['tarefas_do_processo'] = tarefas_do_processo
+    
+    @app.before_request
+    def iniciar_processo():
+        """Inicia filas, índices e threads do processo na primeira requisição."""
+        tarefas_do_processo.executar(app)
+    
+    # Fila de processamento de fotos; retoma as tarefas pendentes
+    from .fotos import FilaFotos
+    app.extensions['fila_fotos'] = FilaFotos(
+        app.config['UPLOAD_FOLDER'],
+        workers=app.config.get('PHOTO_WORKERS', 2),
+        limite_bytes=app.config.get('PHOTO_MAX_BYTES'),
+        limite_pixels=app.config.get('PHOTO_MAX_PIXELS')
+    )
+    tarefas_do_processo.adicionar(
+        'a fila de fotos',
+        lambda: app.extensions['fila_fotos'].retomar()
+    )
+    
+    # Presenças: recupera eventos deixados no log por processos encerrados
+    from .presencas import FilaPresencas
+    app.extensions['fila_presencas'] = FilaPresencas(
+        app,
+        app.config.get('PRESENCA_WAL_FOLDER')
+        or os.path.join(app.instance_path, 'presencas'),
+        tamanho_lote=app.config.get('PRESENCA_BATCH_SIZE', 500),
+        intervalo=app.config.get('PRESENCA_FLUSH_INTERVAL') or None,
+        fsync=app.config.get('PRESENCA_WAL_FSYNC', True)
+    )
+    tarefas_do_processo.adicionar(
+        'a recuperação das presenças',
+        lambda: app.extensions['fila_presencas'].retomar()
+    )
+    
+    # Ocupação atual, montada com as presenças do dia
+    from .ocupacao import ContadorOcupacao, sincronizar_periodicamente
+    app.extensions['ocupacao'] = ContadorOcupacao(fuso_horas=app.config.get('OCUPACAO_FUSO_HORAS', -3))
+    
+    def iniciar_ocupacao():
+        """Inicia a sincronização periódica e monta o contador."""
+        ocupacao = app.extensions['ocupacao']
+        if app.config.get('OCUPACAO_RESYNC'):
+            sincronizar_periodicamente(app, ocupacao, app.config['OCUPACAO_RESYNC'])
+        ocupacao.carregar()
+    
+    tarefas_do_processo.adicionar('a ocupação', iniciar_ocupacao)
+    
     # Configura função de carregamento de usuário
-    from .models import Usuario
+    from .autenticacao import (
+        CacheUsuarios, carregar_usuario_da_sessao, carregar_usuario_do_token
+    )
+    
+    usuarios_cache = CacheUsuarios(
+        tamanho_maximo=app.config.get('USER_CACHE_SIZE', 1024),
+        ttl=app.config.get('USER_CACHE_TTL', 30)
+    )
+    app.extensions['usuarios_cache'] = usuarios_cache
     
     @login_manager.user_loader
     def load_user(user_id):
-        """Carrega usuário pelo ID."""
-        return Usuario.query.get(int(user_id))
+        """Carrega usuário pelo ID, usando o cache de usuários."""
+        return usuarios_cache.obter(int(user_id), carregar_usuario_da_sessao)
+    
+    @login_manager.request_loader
+    def load_user_from_request(request):
+        """Autentica chamadas à API pelo token Bearer, sem consultar o banco."""
+        return carregar_usuario_do_token(request)
     
     # Adiciona contexto global para templates
     @app.context_processor
@@ -84,6 +157,14 @@ def create_app(config_name=None):
     from .routes import rotas
     app.register_blueprint(rotas)
     
+    # Registra comandos de linha de comando
+    from .comandos import gymflow
+    app.cli.add_command(gymflow)
+    
+    # Índice de autocompletar dos alunos ativos, carregado na primeira busca
+    from .autocompletar import IndiceAutocompletar
+    app.extensions['autocompletar'] = IndiceAutocompletar(ttl=app.config.get('AUTOCOMPLETE_TTL', 300))
+    
     # Configura handlers de erro
     @app.errorhandler(404)
     def not_found_error(error):
@@ -96,21 +177,4 @@ def create_app(config_name=None):
         db.session.rollback()
         return {'erro': 'Erro interno do servidor'}, 500
     
-    # Inicializa banco de dados
-    with app.app_context():
-        from .models import init_db
-        init_db()
-        
-        # Cria um usuário gerente padrão se não existir
-        if not Usuario.query.filter_by(email='admin@gymflow.com').first():
-            gerente = Usuario(
-                nome='Administrador',
-                email='admin@gymflow.com',
-                tipo='gerente',
-                status='ativo'
-            )
-            gerente.senha = 'admin123'  # Será hasheada automaticamente
-            db.session.add(gerente)
-            db.session.commit()
-    
     return app 
\ No newline at end of file
@@ -0,0 +1,293 @@
+"""Autenticação por email e senha do sistema GymFlow.
+
+A verificação da senha (scrypt/pbkdf2) é o passo mais caro do login.
+Ela roda em um pool de threads de tamanho fixo (PASSWORD_HASH_WORKERS):
+no máximo esse número de hashes é calculado ao mesmo tempo por
+processo, e no máximo PASSWORD_HASH_QUEUE logins aguardam na fila.
+Com a fila cheia, o login é recusado na entrada (503), antes de qualquer
+hash; um login aceito sempre espera o seu hash terminar, então a CPU
+não é gasta em verificações cujo resultado seria descartado. As funções
+de hash do hashlib liberam o GIL, então as threads do pool não bloqueiam
+as demais requisições.
+
+Chamadas à API com ``Authorization: Bearer <token>`` são autenticadas
+pelos dados do próprio token (id, nome, tipo e versão), sem carregar o
+usuário do banco. Para que alterações e inativações revoguem tokens já
+emitidos, a versão e o status atuais de cada usuário ficam no ``cache``
+por TOKEN_CACHE_TIMEOUT segundos e são removidos quando o usuário muda.
+
+Para sessões do navegador, o user_loader do Flask-Login usa um
+CacheUsuarios (LRU com expiração, local ao processo) com cópias
+somente leitura dos usuários, evitando consultar a tabela de usuários
+a cada página e a cada chamada fetch feita pelos templates.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from flask import Request, current_app
+from flask_login import UserMixin
+from . import db, cache
+from .models import Usuario
+from .utils import verificar_token
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+# Vagas de verificação: hashes em cálculo mais logins aguardando na fila
+_vagas: Optional[threading.BoundedSemaphore] = None
+_executor_lock = threading.Lock()
+
+
+class VerificacaoIndisponivel(Exception):
+    """A fila de verificação de senhas está cheia; tente novamente."""
+
+
+class UsuarioAutenticado(UserMixin):
+    """Usuário somente leitura montado a partir das claims de um token."""
+
+    def __init__(self, dados: Dict[str, Any]):
+        self.id = dados['user_id']
+        self.nome = dados.get('nome')
+        self.email = dados.get('email')
+        self.tipo = dados.get('tipo')
+        self.status = dados.get('status')
+
+    @classmethod
+    def de_usuario(cls, usuario: Usuario) -> 'UsuarioAutenticado':
+        """Cria uma cópia desvinculada da sessão do banco."""
+        return cls({
+            'user_id': usuario.id,
+            'nome': usuario.nome,
+            'email': usuario.email,
+            'tipo': usuario.tipo,
+            'status': usuario.status
+        })
+
+    def __repr__(self):
+        return f'<UsuarioAutenticado {self.id}>'
+
+
+class CacheUsuarios:
+    """
+    Cache LRU com expiração de usuários, seguro entre threads.
+
+    Args:
+        tamanho_maximo: Quantidade máxima de usuários mantidos
+        ttl: Segundos até uma entrada expirar
+    """
+
+    def __init__(self, tamanho_maximo: int = 1024, ttl: float = 30):
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl = ttl
+        self.acertos = 0
+        self.falhas = 0
+        self._itens: 'OrderedDict[int, Tuple[float, UsuarioAutenticado]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(
+        self,
+        usuario_id: int,
+        carregar: Callable[[int], Optional[UsuarioAutenticado]]
+    ) -> Optional[UsuarioAutenticado]:
+        """
+        Retorna o usuário do cache ou o carrega com a função informada.
+
+        Args:
+            usuario_id: Id do usuário
+            carregar: Função que busca o usuário no banco
+
+        Returns:
+            Optional[UsuarioAutenticado]: O usuário, ou None se não existir
+        """
+        agora = time.monotonic()
+        with self._lock:
+            item = self._itens.get(usuario_id)
+            if item is not None and item[0] > agora:
+                self._itens.move_to_end(usuario_id)
+                self.acertos += 1
+                return item[1]
+            self.falhas += 1
+
+        usuario = carregar(usuario_id)
+        if usuario is not None:
+            with self._lock:
+                self._itens[usuario_id] = (agora + self.ttl, usuario)
+                self._itens.move_to_end(usuario_id)
+                while len(self._itens) > self.tamanho_maximo:
+                    self._itens.popitem(last=False)
+        return usuario
+
+    def invalidar(self, usuario_id: int) -> None:
+        """Remove um usuário do cache."""
+        with self._lock:
+            self._itens.pop(usuario_id, None)
+
+    def limpar(self) -> None:
+        """Remove todos os usuários do cache."""
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Retorna tamanho atual, acertos, falhas e taxa de acerto."""
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                'tamanho': len(self._itens),
+                'tamanho_maximo': self.tamanho_maximo,
+                'ttl': self.ttl,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': round(self.acertos / total, 4) if total else 0.0
+            }
+
+
+def carregar_usuario_da_sessao(usuario_id: int) -> Optional[UsuarioAutenticado]:
+    """Busca o usuário no banco e retorna uma cópia somente leitura."""
+    usuario = db.session.get(Usuario, usuario_id)
+    return UsuarioAutenticado.de_usuario(usuario) if usuario else None
+
+
+def _obter_executor() -> Tuple[ThreadPoolExecutor, threading.BoundedSemaphore]:
+    """Cria o pool de verificação de senhas e suas vagas no primeiro uso."""
+    global _executor, _vagas
+    with _executor_lock:
+        if _executor is None:
+            workers = current_app.config.get('PASSWORD_HASH_WORKERS', 4)
+            _executor = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix='hash-senha'
+            )
+            _vagas = threading.BoundedSemaphore(
+                workers + current_app.config.get('PASSWORD_HASH_QUEUE', 16)
+            )
+    return _executor, _vagas
+
+
+def verificar_senha(usuario: Usuario, senha: str) -> bool:
+    """
+    Verifica a senha do usuário no pool de hash.
+
+    Args:
+        usuario: Usuário já carregado
+        senha: Senha informada no login
+
+    Returns:
+        bool: True se a senha está correta
+
+    Raises:
+        VerificacaoIndisponivel: Se o pool e a fila de espera estiverem cheios
+    """
+    executor, vagas = _obter_executor()
+    if not vagas.acquire(blocking=False):
+        raise VerificacaoIndisponivel('Muitos logins simultâneos, tente novamente')
+    try:
+        futuro = executor.submit(usuario.verificar_senha, senha)
+    except BaseException:
+        vagas.release()
+        raise
+    # A vaga é liberada quando o hash termina, mesmo que o login já tenha desistido
+    futuro.add_done_callback(lambda _: vagas.release())
+    return futuro.result()
+
+
+def autenticar(email: str, senha: str) -> Optional[Usuario]:
+    """
+    Autentica um usuário por email e senha.
+
+    Se a senha estiver correta mas o hash gravado usar parâmetros
+    antigos, a senha é refeita com os parâmetros atuais.
+
+    Args:
+        email: Email do usuário
+        senha: Senha informada
+
+    Returns:
+        Optional[Usuario]: O usuário autenticado ou None
+
+    Raises:
+        VerificacaoIndisponivel: Se a fila de verificação estiver cheia
+    """
+    usuario = Usuario.query.filter_by(email=email).first()
+    if not usuario or not verificar_senha(usuario, senha):
+        return None
+
+    if usuario.precisa_rehash():
+        usuario.senha = senha
+        db.session.commit()
+    return usuario
+
+
+def _chave_cache(usuario_id: int) -> str:
+    """Chave do estado do usuário no cache."""
+    return f'usuario:token:{usuario_id}'
+
+
+def _estado_usuario(usuario_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Retorna a versão de token e o status atuais do usuário.
+
+    Lê do cache e, na falta, do banco (uma consulta por chave primária).
+
+    Args:
+        usuario_id: Id do usuário
+
+    Returns:
+        Optional[Dict[str, Any]]: 'versao' e 'status', ou None se o
+        usuário não existir
+    """
+    chave = _chave_cache(usuario_id)
+    estado = cache.get(chave)
+    if estado is None:
+        linha = db.session.query(
+            Usuario.versao_token,
+            Usuario.status
+        ).filter(Usuario.id == usuario_id).first()
+        if linha is None:
+            return None
+        estado = {'versao': linha.versao_token, 'status': linha.status}
+        cache.set(
+            chave,
+            estado,
+            timeout=current_app.config.get('TOKEN_CACHE_TIMEOUT', 60)
+        )
+    return estado
+
+
+def invalidar_usuario(usuario_id: int) -> None:
+    """Remove o usuário dos caches de token e de sessão (chamar após alterá-lo)."""
+    cache.delete(_chave_cache(usuario_id))
+    usuarios_cache = current_app.extensions.get('usuarios_cache')
+    if usuarios_cache is not None:
+        usuarios_cache.invalidar(usuario_id)
+
+
+def carregar_usuario_do_token(request: Request) -> Optional[UsuarioAutenticado]:
+    """
+    Autentica a requisição pelo token Bearer do cabeçalho Authorization.
+
+    Args:
+        request: Requisição atual
+
+    Returns:
+        Optional[UsuarioAutenticado]: Usuário do token, ou None se não
+        houver token válido, o usuário estiver inativo ou o token tiver
+        sido revogado
+    """
+    esquema, _, token = request.headers.get('Authorization', '').partition(' ')
+    if esquema.lower() != 'bearer' or not token:
+        return None
+
+    dados = verificar_token(token.strip())
+    if not dados or 'user_id' not in dados:
+        return None
+
+    estado = _estado_usuario(dados['user_id'])
+    if (
+        estado is None
+        or estado['status'] != 'ativo'
+        or estado['versao'] != dados.get('versao')
+    ):
+        return None
+    return UsuarioAutenticado(dados)
@@ -0,0 +1,298 @@
+"""Autocompletar de alunos ativos na catraca (nome e CPF).
+
+O índice fica na memória do processo, em vetores ordenados consultados
+com ``bisect``:
+
+- cada palavra do nome normalizado (sem acentos, minúsculas), com o id
+  do aluno em um ``array`` paralelo, ordenados por (palavra, id). As
+  palavras são internadas, então nomes e sobrenomes repetidos ocupam
+  memória uma única vez;
+- os CPFs como inteiros de 11 dígitos em um ``array('q')``, também com
+  os ids em paralelo. Um prefixo de CPF vira um intervalo de inteiros.
+
+Um prefixo de palavra ou de CPF é um intervalo contíguo dos vetores,
+encontrado em O(log n), e a leitura para assim que o limite de
+resultados é atingido.
+
+O índice é montado com uma única consulta na primeira busca de cada
+processo e atualizado incrementalmente pelas rotas que criam, alteram ou
+excluem alunos (``atualizar_autocompletar`` e ``remover_do_autocompletar``).
+Como cada processo tem o seu índice, ele é recarregado do banco a cada
+AUTOCOMPLETE_TTL segundos para incorporar alterações feitas por outros
+processos ou fora das rotas; durante a recarga as consultas continuam
+usando o índice anterior. Uma carga que falha é registrada no log e
+tentada de novo na busca seguinte, sem interromper a requisição.
+"""
+
+import logging
+import re
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from flask import current_app
+from sqlalchemy import select
+from . import db
+from .formatacao import formatar_cpf, normalizar_texto
+from .models import Aluno
+
+logger = logging.getLogger(__name__)
+
+# Maior caractere possível: limite superior de um intervalo de prefixo
+_FIM_PREFIXO = chr(0x10FFFF)
+
+_PALAVRAS = re.compile(r'\w+')
+_NAO_DIGITOS = re.compile(r'\D')
+
+DIGITOS_CPF = 11
+
+# Nome, CPF como inteiro e palavras do nome normalizado de um aluno, cada
+# uma precedida de espaço (' joao silva'), para conferir prefixos com ``in``
+_Entrada = Tuple[str, Optional[int], str]
+
+
+def _palavras_do_nome(nome: str) -> Tuple[str, ...]:
+    """Palavras do nome normalizado, internadas e sem repetição."""
+    return tuple(
+        sys.intern(palavra)
+        for palavra in dict.fromkeys(_PALAVRAS.findall(normalizar_texto(nome or '')))
+    )
+
+
+def _cpf_como_inteiro(cpf: Optional[str]) -> Optional[int]:
+    """CPF como inteiro, ou None se não tiver 11 dígitos."""
+    digitos = _NAO_DIGITOS.sub('', cpf or '')
+    return int(digitos) if len(digitos) == DIGITOS_CPF else None
+
+
+class IndiceAutocompletar:
+    """
+    Índice em memória de nomes e CPFs de alunos ativos, seguro entre threads.
+
+    Args:
+        ttl: Segundos até o índice ser recarregado do banco (0 desativa a
+            recarga; a primeira carga acontece na primeira busca)
+    """
+
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl
+        self.carregado_em: Optional[float] = None
+        self._lock = threading.Lock()
+        self._recarregando = False
+        self._montar([])
+
+    def _montar(self, linhas: Iterable[Tuple[int, str, Optional[str]]]) -> None:
+        """Monta os vetores a partir de (id, nome, cpf) e troca os atuais."""
+        alunos: Dict[int, _Entrada] = {}
+        entradas_palavras = []
+        entradas_cpfs = []
+        for aluno_id, nome, cpf in linhas:
+            cpf = _cpf_como_inteiro(cpf)
+            palavras = _palavras_do_nome(nome)
+            alunos[aluno_id] = (nome, cpf, ' ' + ' '.join(palavras))
+            for palavra in palavras:
+                entradas_palavras.append((palavra, aluno_id))
+            if cpf is not None:
+                entradas_cpfs.append((cpf, aluno_id))
+        entradas_palavras.sort()
+        entradas_cpfs.sort()
+
+        palavras = [palavra for palavra, _ in entradas_palavras]
+        ids_palavras = array('l', [aluno_id for _, aluno_id in entradas_palavras])
+        cpfs = array('q', [cpf for cpf, _ in entradas_cpfs])
+        ids_cpfs = array('l', [aluno_id for _, aluno_id in entradas_cpfs])
+
+        with self._lock:
+            self._alunos = alunos
+            self._palavras = palavras
+            self._ids_palavras = ids_palavras
+            self._cpfs = cpfs
+            self._ids_cpfs = ids_cpfs
+
+    def carregar_linhas(self, linhas: Iterable[Tuple[int, str, Optional[str]]]) -> None:
+        """
+        Substitui o conteúdo do índice.
+
+        Args:
+            linhas: Tuplas (id, nome, cpf) dos alunos ativos
+        """
+        self._montar(linhas)
+        self.carregado_em = time.monotonic()
+
+    def carregar(self) -> int:
+        """
+        Recarrega o índice com os alunos ativos do banco (uma consulta).
+
+        Returns:
+            int: Quantidade de alunos indexados
+        """
+        consulta = select(Aluno.id, Aluno.nome, Aluno.cpf).where(Aluno.status == 'ativo')
+        self.carregar_linhas(db.session.execute(consulta).tuples())
+        return len(self._alunos)
+
+    def _recarregar_se_expirado(self) -> None:
+        """
+        Carrega o índice se ainda não foi carregado ou se o TTL venceu.
+
+        Só uma thread carrega por vez; as demais seguem com o índice atual.
+        """
+        if self.carregado_em is not None and (
+            not self.ttl or time.monotonic() - self.carregado_em < self.ttl
+        ):
+            return
+        with self._lock:
+            if self._recarregando:
+                return
+            self._recarregando = True
+        try:
+            self.carregar()
+        except Exception:
+            db.session.rollback()
+            logger.exception('Erro ao carregar o índice de autocompletar')
+        finally:
+            self._recarregando = False
+
+    def _inserir(self, aluno_id: int, nome: str, cpf: Optional[int]) -> None:
+        """Insere um aluno nos vetores (chamar com o lock)."""
+        palavras = _palavras_do_nome(nome)
+        self._alunos[aluno_id] = (nome, cpf, ' ' + ' '.join(palavras))
+        for palavra in palavras:
+            inicio = bisect_left(self._palavras, palavra)
+            fim = bisect_right(self._palavras, palavra, inicio)
+            posicao = bisect_left(self._ids_palavras, aluno_id, inicio, fim)
+            self._palavras.insert(posicao, palavra)
+            self._ids_palavras.insert(posicao, aluno_id)
+        if cpf is not None:
+            inicio = bisect_left(self._cpfs, cpf)
+            fim = bisect_right(self._cpfs, cpf, inicio)
+            posicao = bisect_left(self._ids_cpfs, aluno_id, inicio, fim)
+            self._cpfs.insert(posicao, cpf)
+            self._ids_cpfs.insert(posicao, aluno_id)
+
+    def _retirar(self, aluno_id: int) -> None:
+        """Retira um aluno dos vetores, se estiver lá (chamar com o lock)."""
+        item = self._alunos.pop(aluno_id, None)
+        if item is None:
+            return
+        _, cpf, palavras = item
+        for palavra in palavras.split():
+            inicio = bisect_left(self._palavras, palavra)
+            fim = bisect_right(self._palavras, palavra, inicio)
+            posicao = bisect_left(self._ids_palavras, aluno_id, inicio, fim)
+            if posicao < fim and self._ids_palavras[posicao] == aluno_id:
+                del self._palavras[posicao]
+                del self._ids_palavras[posicao]
+        if cpf is not None:
+            inicio = bisect_left(self._cpfs, cpf)
+            fim = bisect_right(self._cpfs, cpf, inicio)
+            posicao = bisect_left(self._ids_cpfs, aluno_id, inicio, fim)
+            if posicao < fim and self._ids_cpfs[posicao] == aluno_id:
+                del self._cpfs[posicao]
+                del self._ids_cpfs[posicao]
+
+    def atualizar(self, aluno_id: int, nome: str, cpf: Optional[str], ativo: bool = True) -> None:
+        """
+        Insere, atualiza ou retira um aluno do índice.
+
+        Args:
+            aluno_id: Id do aluno
+            nome: Nome atual
+            cpf: CPF atual (com ou sem máscara)
+            ativo: Se False, o aluno é retirado do índice
+        """
+        with self._lock:
+            self._retirar(aluno_id)
+            if ativo:
+                self._inserir(aluno_id, nome, _cpf_como_inteiro(cpf))
+
+    def remover(self, aluno_id: int) -> None:
+        """Retira um aluno do índice."""
+        with self._lock:
+            self._retirar(aluno_id)
+
+    def _buscar_cpf(self, digitos: str, limite: int) -> List[int]:
+        """Ids dos alunos cujo CPF começa com os dígitos (chamar com o lock)."""
+        escala = 10 ** (DIGITOS_CPF - len(digitos))
+        inicio = bisect_left(self._cpfs, int(digitos) * escala)
+        fim = bisect_left(self._cpfs, (int(digitos) + 1) * escala, inicio)
+        return list(self._ids_cpfs[inicio:min(fim, inicio + limite)])
+
+    def _buscar_nome(self, termos: List[str], limite: int) -> List[int]:
+        """
+        Ids dos alunos com uma palavra começando por cada termo (chamar com o lock).
+
+        O intervalo percorrido é o do termo mais longo (o mais seletivo); os
+        demais termos são conferidos nas palavras do nome de cada candidato.
+        """
+        principal = max(termos, key=len)
+        outros = [' ' + termo for termo in termos if termo != principal]
+        inicio = bisect_left(self._palavras, principal)
+        fim = bisect_left(self._palavras, principal + _FIM_PREFIXO, inicio)
+
+        ids: List[int] = []
+        vistos = set()
+        for posicao in range(inicio, fim):
+            aluno_id = self._ids_palavras[posicao]
+            if aluno_id in vistos:
+                continue
+            vistos.add(aluno_id)
+            if outros:
+                palavras = self._alunos[aluno_id][2]
+                if not all(termo in palavras for termo in outros):
+                    continue
+            ids.append(aluno_id)
+            if len(ids) == limite:
+                break
+        return ids
+
+    def buscar(self, termo: str, limite: int = 10) -> List[Dict[str, Any]]:
+        """
+        Sugere alunos ativos pelo começo do nome (qualquer palavra) ou do CPF.
+
+        Args:
+            termo: Texto digitado; só dígitos e pontuação é tratado como CPF
+            limite: Quantidade máxima de sugestões
+
+        Returns:
+            List[Dict[str, Any]]: 'id', 'nome' e 'cpf' (formatado) de cada aluno
+        """
+        self._recarregar_se_expirado()
+        termos = _PALAVRAS.findall(normalizar_texto(termo))
+        digitos = _NAO_DIGITOS.sub('', termo)
+        if not termos or limite < 1:
+            return []
+
+        with self._lock:
+            if digitos and len(digitos) <= DIGITOS_CPF and all(t.isdigit() for t in termos):
+                ids = self._buscar_cpf(digitos, limite)
+            else:
+                ids = self._buscar_nome(termos, limite)
+            alunos = [(aluno_id, self._alunos[aluno_id]) for aluno_id in ids]
+
+        return [
+            {
+                'id': aluno_id,
+                'nome': nome,
+                'cpf': formatar_cpf(f'{cpf:011d}') if cpf is not None else None
+            }
+            for aluno_id, (nome, cpf, _) in alunos
+        ]
+
+    def __len__(self) -> int:
+        return len(self._alunos)
+
+
+def atualizar_autocompletar(aluno: Aluno) -> None:
+    """Atualiza o aluno no índice de autocompletar (chamar após o commit)."""
+    indice = current_app.extensions.get('autocompletar')
+    if indice is not None:
+        indice.atualizar(aluno.id, aluno.nome, aluno.cpf, ativo=aluno.status == 'ativo')
+
+
+def remover_do_autocompletar(aluno_id: int) -> None:
+    """Retira o aluno do índice de autocompletar (chamar após o commit)."""
+    indice = current_app.extensions.get('autocompletar')
+    if indice is not None:
+        indice.remover(aluno_id)
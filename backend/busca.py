@@ -0,0 +1,211 @@
+"""Busca textual de alunos por nome, email, CPF e telefone.
+
+No SQLite, o índice é a tabela virtual FTS5 ``alunos_busca`` (uma linha
+por aluno, com rowid igual ao id). Triggers na tabela de alunos mantêm o
+índice em sincronia em qualquer escrita (rotas, importação em lote ou
+SQL direto), então criar_aluno, atualizar_aluno e deletar_aluno não
+precisam fazer nada além do commit. O tokenizador remove acentos; CPF e
+telefone são indexados só com os dígitos, e o telefone também sem o DDD,
+para que buscas parciais funcionem como prefixo.
+
+No PostgreSQL, um índice GIN de trigramas (pg_trgm) sobre o nome
+normalizado, email, CPF e telefone atende a mesma busca, ordenada por
+similaridade. Em outros bancos a busca recai em comparações por prefixo.
+
+O índice é criado junto com a tabela de alunos (``db.create_all``) e,
+em bancos existentes, pela migração correspondente.
+"""
+
+import re
+from typing import Any, Dict, List
+from sqlalchemy import DDL, event, text
+from . import db
+from .formatacao import normalizar_texto
+from .models import Aluno
+
+
+# Pesos do bm25 para nome, email, CPF e telefone
+PESOS_COLUNAS = (10.0, 2.0, 5.0, 5.0)
+
+_DIGITOS_CPF = "replace(replace(replace(new.cpf, '.', ''), '-', ''), ' ', '')"
+_DIGITOS_TELEFONE = (
+    "replace(replace(replace(replace(replace(coalesce(new.telefone, ''), "
+    "'(', ''), ')', ''), ' ', ''), '-', ''), '+', '')"
+)
+
+_INSERIR_NO_INDICE = f"""
+    INSERT INTO alunos_busca (rowid, nome, email, cpf, telefone)
+    VALUES (
+        new.id,
+        new.nome,
+        new.email,
+        {_DIGITOS_CPF},
+        {_DIGITOS_TELEFONE} || ' ' || substr({_DIGITOS_TELEFONE}, 3)
+    );
+"""
+
+DDL_SQLITE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS alunos_busca USING fts5(
+        nome, email, cpf, telefone,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3 4'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS alunos_busca_insert AFTER INSERT ON alunos BEGIN
+        {_INSERIR_NO_INDICE}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS alunos_busca_update
+    AFTER UPDATE OF nome, email, cpf, telefone ON alunos BEGIN
+        DELETE FROM alunos_busca WHERE rowid = old.id;
+        {_INSERIR_NO_INDICE}
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS alunos_busca_delete AFTER DELETE ON alunos BEGIN
+        DELETE FROM alunos_busca WHERE rowid = old.id;
+    END
+    """,
+]
+
+# Indexa todos os alunos (bancos criados antes do índice)
+SQL_POPULAR_SQLITE = f"""
+    INSERT INTO alunos_busca (rowid, nome, email, cpf, telefone)
+    SELECT id, nome, email,
+        {_DIGITOS_CPF.replace('new.', '')},
+        {_DIGITOS_TELEFONE.replace('new.', '')} || ' ' ||
+        substr({_DIGITOS_TELEFONE.replace('new.', '')}, 3)
+    FROM alunos
+"""
+
+# Texto indexado no PostgreSQL (o mesmo usado na consulta)
+_TEXTO_POSTGRES = (
+    "(nome_normalizado || ' ' || lower(email) || ' ' || "
+    "translate(cpf, '.- ', '') || ' ' || "
+    "translate(coalesce(telefone, ''), '()- +', ''))"
+)
+
+DDL_POSTGRES = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    f'CREATE INDEX IF NOT EXISTS ix_alunos_busca_trgm ON alunos '
+    f'USING gin ({_TEXTO_POSTGRES} gin_trgm_ops)',
+]
+
+for _comando in DDL_SQLITE:
+    event.listen(Aluno.__table__, 'after_create', DDL(_comando).execute_if(dialect='sqlite'))
+for _comando in DDL_POSTGRES:
+    event.listen(Aluno.__table__, 'after_create', DDL(_comando).execute_if(dialect='postgresql'))
+event.listen(
+    Aluno.__table__,
+    'before_drop',
+    DDL('DROP TABLE IF EXISTS alunos_busca').execute_if(dialect='sqlite')
+)
+
+
+def reconstruir_indice() -> int:
+    """
+    Recria o conteúdo do índice FTS5 a partir da tabela de alunos.
+
+    Returns:
+        int: Quantidade de alunos indexados (0 fora do SQLite)
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return 0
+    db.session.execute(text('DELETE FROM alunos_busca'))
+    db.session.execute(text(SQL_POPULAR_SQLITE))
+    db.session.commit()
+    return db.session.execute(text('SELECT count(*) FROM alunos_busca')).scalar()
+
+
+def _tem_letras(termo: str) -> bool:
+    """Indica se o termo tem letras (senão é CPF ou telefone)."""
+    return re.search(r'[^\W\d_]', termo) is not None
+
+
+def montar_consulta_fts(termo: str) -> str:
+    """
+    Converte o texto digitado em uma consulta FTS5.
+
+    Termos só com dígitos e pontuação (CPF, telefone) viram um único
+    prefixo nas colunas de CPF e telefone; os demais viram prefixos de
+    cada palavra, todos obrigatórios. As palavras são citadas, então
+    operadores do FTS5 digitados pelo usuário não têm efeito.
+
+    Args:
+        termo: Texto digitado na busca
+
+    Returns:
+        str: Consulta MATCH, ou texto vazio se não houver o que buscar
+    """
+    if not _tem_letras(termo):
+        digitos = re.sub(r'\D', '', termo)
+        return f'{{cpf telefone}} : "{digitos}"*' if digitos else ''
+    palavras = re.findall(r'\w+', normalizar_texto(termo))
+    return ' '.join(f'"{palavra}"*' for palavra in palavras)
+
+
+def _resultado(linha) -> Dict[str, Any]:
+    """Converte uma linha da busca em dicionário."""
+    return {
+        'id': linha.id,
+        'nome': linha.nome,
+        'email': linha.email,
+        'cpf': linha.cpf,
+        'telefone': linha.telefone,
+        'status': linha.status
+    }
+
+
+def buscar_alunos(termo: str, limite: int = 10) -> List[Dict[str, Any]]:
+    """
+    Busca alunos por nome, email, CPF ou telefone.
+
+    Args:
+        termo: Texto digitado (parte do nome, do CPF ou do telefone)
+        limite: Quantidade máxima de resultados
+
+    Returns:
+        List[Dict[str, Any]]: Alunos mais relevantes primeiro
+    """
+    termo = termo.strip()
+    if not termo:
+        return []
+
+    dialeto = db.engine.dialect.name
+    if dialeto == 'sqlite':
+        consulta = montar_consulta_fts(termo)
+        if not consulta:
+            return []
+        pesos = ', '.join(str(peso) for peso in PESOS_COLUNAS)
+        linhas = db.session.execute(text(f"""
+            SELECT a.id, a.nome, a.email, a.cpf, a.telefone, a.status
+            FROM alunos_busca
+            JOIN alunos AS a ON a.id = alunos_busca.rowid
+            WHERE alunos_busca MATCH :consulta
+            ORDER BY bm25(alunos_busca, {pesos}), a.id
+            LIMIT :limite
+        """), {'consulta': consulta, 'limite': limite})
+    elif dialeto == 'postgresql':
+        if _tem_letras(termo):
+            normalizado = normalizar_texto(termo)
+        else:
+            normalizado = re.sub(r'\D', '', termo)
+        padrao = re.sub(r'([\\%_])', r'\\\1', normalizado)
+        linhas = db.session.execute(text(f"""
+            SELECT id, nome, email, cpf, telefone, status
+            FROM alunos
+            WHERE {_TEXTO_POSTGRES} ILIKE '%' || :padrao || '%'
+            ORDER BY similarity({_TEXTO_POSTGRES}, :termo) DESC, id
+            LIMIT :limite
+        """), {'padrao': padrao, 'termo': normalizado, 'limite': limite})
+    else:
+        if _tem_letras(termo):
+            filtro = Aluno.nome_normalizado.startswith(normalizar_texto(termo))
+        else:
+            filtro = Aluno.cpf.startswith(termo)
+        linhas = Aluno.query.filter(filtro).order_by(Aluno.nome_normalizado).limit(limite)
+
+    return [_resultado(linha) for linha in linhas]
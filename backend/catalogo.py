@@ -0,0 +1,90 @@
+"""Catálogos em cache do sistema GymFlow (planos e exercícios).
+
+Os catálogos mudam raramente e são lidos em quase toda tela, então
+ficam no ``cache`` da aplicação (Flask-Caching) já serializados, junto
+com um ETag calculado sobre o conteúdo. As rotas que alteram planos ou
+exercícios chamam as funções ``invalidar_*`` após o commit; o tempo de
+expiração do cache (CACHE_DEFAULT_TIMEOUT) limita a defasagem quando
+há vários processos com cache local.
+"""
+
+import hashlib
+import json
+from typing import Any, Callable, Dict, List
+from flask import Response, jsonify, request
+from . import cache
+from .models import Plano, Exercicio
+
+
+CHAVE_PLANOS = 'catalogo:planos_disponiveis'
+CHAVE_EXERCICIOS = 'catalogo:exercicios'
+
+
+def _obter_catalogo(chave: str, carregar: Callable[[], List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Lê um catálogo do cache, carregando do banco se não estiver lá.
+
+    Args:
+        chave: Chave do catálogo no cache
+        carregar: Função que consulta o banco e retorna os itens
+
+    Returns:
+        Dict[str, Any]: Itens do catálogo ('itens') e seu ETag ('etag')
+    """
+    catalogo = cache.get(chave)
+    if catalogo is None:
+        itens = carregar()
+        conteudo = json.dumps(itens, sort_keys=True, default=str)
+        catalogo = {
+            'itens': itens,
+            'etag': hashlib.sha1(conteudo.encode('utf-8')).hexdigest()
+        }
+        cache.set(chave, catalogo)
+    return catalogo
+
+
+def obter_planos_disponiveis() -> Dict[str, Any]:
+    """Retorna o catálogo de planos ativos, ordenados por id."""
+    return _obter_catalogo(CHAVE_PLANOS, lambda: [
+        plano.to_dict()
+        for plano in Plano.query.filter_by(ativo=True).order_by(Plano.id)
+    ])
+
+
+def obter_exercicios() -> Dict[str, Any]:
+    """Retorna o catálogo de exercícios, ordenados por id."""
+    return _obter_catalogo(CHAVE_EXERCICIOS, lambda: [
+        exercicio.to_dict()
+        for exercicio in Exercicio.query.order_by(Exercicio.id)
+    ])
+
+
+def invalidar_planos() -> None:
+    """Remove o catálogo de planos do cache."""
+    cache.delete(CHAVE_PLANOS)
+
+
+def invalidar_exercicios() -> None:
+    """Remove o catálogo de exercícios do cache."""
+    cache.delete(CHAVE_EXERCICIOS)
+
+
+def responder_catalogo(catalogo: Dict[str, Any]) -> Response:
+    """
+    Cria a resposta JSON de um catálogo com suporte a ETag.
+
+    Se o cliente enviar If-None-Match com o ETag atual, a resposta é
+    304 sem corpo.
+
+    Args:
+        catalogo: Catálogo retornado por obter_planos_disponiveis ou
+            obter_exercicios
+
+    Returns:
+        Response: Resposta JSON (ou 304) com ETag
+    """
+    response = jsonify(catalogo['itens'])
+    response.set_etag(catalogo['etag'])
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
@@ -0,0 +1,195 @@
+"""Registro de pagamentos (cobrança) do sistema GymFlow.
+
+As inserções usam a chave única (aluno_id, mes_referencia) do banco:
+um INSERT ... ON CONFLICT DO NOTHING detecta duplicidades no mesmo
+comando, sem consultar antes e sem condição de corrida entre
+atendentes registrando o mesmo pagamento.
+"""
+
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Any, Iterable
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from . import db
+from .models import Aluno, Pagamento
+
+
+CHAVE_UNICA = ['aluno_id', 'mes_referencia']
+
+# Mantém cada INSERT abaixo do limite de 999 parâmetros do SQLite (< 3.32)
+LINHAS_POR_COMANDO = 999 // len(Pagamento.__table__.columns)
+
+PADRAO_MES = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+
+
+def _montar_registro(dados: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normaliza os dados de um pagamento para inserção.
+
+    Args:
+        dados: Dados recebidos (aluno_id, mes_referencia, status,
+            data_pagamento e observacoes)
+
+    Returns:
+        Dict[str, Any]: Valores das colunas de pagamentos
+
+    Raises:
+        ValueError: Se o mês não estiver no formato YYYY-MM ou a data for inválida
+    """
+    mes_referencia = dados['mes_referencia']
+    if not isinstance(mes_referencia, str) or not PADRAO_MES.match(mes_referencia):
+        raise ValueError('Mês de referência deve estar no formato YYYY-MM')
+
+    data_pagamento = dados.get('data_pagamento')
+    if isinstance(data_pagamento, str):
+        data_pagamento = datetime.strptime(data_pagamento, '%Y-%m-%d')
+
+    agora = datetime.utcnow()
+    return {
+        'aluno_id': int(dados['aluno_id']),
+        'mes_referencia': mes_referencia,
+        'status': dados.get('status') or 'pendente',
+        'data_pagamento': data_pagamento or None,
+        'observacoes': dados.get('observacoes'),
+        'data_criacao': agora,
+        'ultima_atualizacao': agora
+    }
+
+
+def _inserir_ignorando_duplicados(registros: List[Dict[str, Any]]) -> int:
+    """
+    Insere registros em um único comando, ignorando os duplicados.
+
+    Args:
+        registros: Valores das colunas de cada pagamento
+
+    Returns:
+        int: Quantidade de linhas efetivamente inseridas
+    """
+    dialeto = db.engine.dialect.name
+    if dialeto == 'sqlite':
+        comando = sqlite.insert(Pagamento).values(registros)
+    elif dialeto == 'postgresql':
+        comando = postgresql.insert(Pagamento).values(registros)
+    else:
+        return _inserir_linha_a_linha(registros)
+
+    comando = comando.on_conflict_do_nothing(index_elements=CHAVE_UNICA)
+    return db.session.execute(comando).rowcount
+
+
+def _inserir_linha_a_linha(registros: List[Dict[str, Any]]) -> int:
+    """Alternativa para bancos sem ON CONFLICT: um savepoint por linha."""
+    inseridos = 0
+    for registro in registros:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(Pagamento).values(registro))
+            inseridos += 1
+        except IntegrityError:
+            pass
+    return inseridos
+
+
+def registrar_pagamento(dados: Dict[str, Any]) -> bool:
+    """
+    Registra um pagamento se ainda não existir um para o aluno no mês.
+
+    Não faz commit; a transação fica a cargo de quem chama.
+
+    Args:
+        dados: Dados do pagamento
+
+    Returns:
+        bool: True se o pagamento foi inserido, False se já existia
+    """
+    return _inserir_ignorando_duplicados([_montar_registro(dados)]) == 1
+
+
+def registrar_pagamentos_em_lote(pagamentos: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Registra vários pagamentos com INSERTs de múltiplas linhas.
+
+    Pagamentos já existentes (mesmo aluno e mês) são ignorados.
+    Não faz commit; a transação fica a cargo de quem chama.
+
+    Args:
+        pagamentos: Dados de cada pagamento
+
+    Returns:
+        Dict[str, int]: Totais de pagamentos inseridos e duplicados
+    """
+    total = 0
+    inseridos = 0
+    lote: List[Dict[str, Any]] = []
+    for dados in pagamentos:
+        lote.append(_montar_registro(dados))
+        if len(lote) == LINHAS_POR_COMANDO:
+            inseridos += _inserir_ignorando_duplicados(lote)
+            total += len(lote)
+            lote = []
+    if lote:
+        inseridos += _inserir_ignorando_duplicados(lote)
+        total += len(lote)
+
+    return {
+        'inseridos': inseridos,
+        'duplicados': total - inseridos
+    }
+
+
+def gerar_cobrancas_mes(mes_referencia: str, tamanho_lote: int = 5000) -> Dict[str, Any]:
+    """
+    Gera os pagamentos pendentes do mês para todos os alunos ativos com plano.
+
+    Os alunos são lidos em lotes por id (keyset) e cada lote é inserido
+    com INSERTs de múltiplas linhas e confirmado em seguida, mantendo as
+    transações curtas. Pagamentos já existentes são ignorados pela chave
+    única, então a execução pode ser repetida com segurança.
+
+    Args:
+        mes_referencia: Mês no formato YYYY-MM
+        tamanho_lote: Quantidade de alunos processados por transação
+
+    Returns:
+        Dict[str, Any]: Totais processados e vazão da execução
+
+    Raises:
+        ValueError: Se o mês não estiver no formato YYYY-MM
+    """
+    if not isinstance(mes_referencia, str) or not PADRAO_MES.match(mes_referencia):
+        raise ValueError('Mês de referência deve estar no formato YYYY-MM')
+
+    inicio = time.perf_counter()
+    resultado = {'alunos': 0, 'inseridos': 0, 'duplicados': 0}
+    ultimo_id = 0
+    while True:
+        ids = [aluno_id for aluno_id, in db.session.query(Aluno.id).filter(
+            Aluno.status == 'ativo',
+            Aluno.plano_id.isnot(None),
+            Aluno.id > ultimo_id
+        ).order_by(Aluno.id).limit(tamanho_lote)]
+        if not ids:
+            break
+
+        lote = registrar_pagamentos_em_lote(
+            {'aluno_id': aluno_id, 'mes_referencia': mes_referencia}
+            for aluno_id in ids
+        )
+        db.session.commit()
+
+        resultado['alunos'] += len(ids)
+        resultado['inseridos'] += lote['inseridos']
+        resultado['duplicados'] += lote['duplicados']
+        ultimo_id = ids[-1]
+
+    segundos = time.perf_counter() - inicio
+    resultado.update({
+        'mes_referencia': mes_referencia,
+        'segundos': round(segundos, 3),
+        'por_segundo': round(resultado['alunos'] / segundos, 1) if segundos else 0.0
+    })
+    return resultado
@@ -0,0 +1,186 @@
+"""Comandos de linha de comando do sistema GymFlow.
+
+Disponíveis como ``flask gymflow <comando>``.
+"""
+
+import csv
+from datetime import datetime
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from flask_migrate import stamp
+from sqlalchemy import inspect, select
+from . import db
+from .busca import reconstruir_indice
+from .cobranca import gerar_cobrancas_mes
+from .fotos import verificar_fotos
+from .frequencia import reconstruir_frequencias
+from .importacao import importar_alunos_csv
+from .models import Aluno, Usuario, criar_gerente_padrao, init_db
+from .utils import validar_cpfs
+
+gymflow = AppGroup('gymflow', help='Comandos administrativos do GymFlow.')
+
+
+@gymflow.command('init-db')
+def init_db_comando():
+    """Cria as tabelas de um banco novo e o usuário gerente padrão."""
+    if inspect(db.engine).has_table(Usuario.__tablename__):
+        click.echo('O banco já tem tabelas; para atualizá-lo use flask db upgrade', err=True)
+        return
+
+    init_db()
+    criar_gerente_padrao()
+    # As tabelas já estão no esquema atual: marca todas as migrações como aplicadas
+    stamp()
+    click.echo('Banco inicializado')
+
+
+@gymflow.command('billing-run')
+@click.option(
+    '--mes',
+    default=lambda: datetime.now().strftime('%Y-%m'),
+    show_default='mês atual',
+    help='Mês de referência no formato YYYY-MM.'
+)
+@click.option(
+    '--lote',
+    default=5000,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help='Alunos processados por transação.'
+)
+def billing_run(mes, lote):
+    """Gera os pagamentos pendentes do mês para os alunos ativos."""
+    try:
+        resultado = gerar_cobrancas_mes(mes, tamanho_lote=lote)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--mes')
+
+    click.echo(
+        f"Cobrança {resultado['mes_referencia']}: "
+        f"{resultado['alunos']} alunos, "
+        f"{resultado['inseridos']} pagamentos gerados, "
+        f"{resultado['duplicados']} já existentes "
+        f"em {resultado['segundos']:.2f}s "
+        f"({resultado['por_segundo']:.0f} alunos/s)"
+    )
+
+
+@gymflow.command('import-alunos')
+@click.argument('arquivo', type=click.File('r', encoding='utf-8-sig'))
+@click.option(
+    '--lote',
+    default=2000,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help='Alunos inseridos por comando.'
+)
+@click.option(
+    '--relatorio',
+    type=click.File('w', encoding='utf-8'),
+    help='Arquivo CSV onde gravar os erros por linha.'
+)
+def import_alunos(arquivo, lote, relatorio):
+    """Importa alunos de um arquivo CSV."""
+    resultado = importar_alunos_csv(arquivo, tamanho_lote=lote)
+
+    if relatorio:
+        escritor = csv.DictWriter(relatorio, fieldnames=['linha', 'erro'])
+        escritor.writeheader()
+        escritor.writerows(resultado['erros'])
+    else:
+        for erro in resultado['erros']:
+            click.echo(f"Linha {erro['linha']}: {erro['erro']}", err=True)
+
+    click.echo(
+        f"{resultado['processados']} linhas processadas, "
+        f"{resultado['inseridos']} alunos importados, "
+        f"{len(resultado['erros'])} com erro"
+    )
+
+
+@gymflow.command('fotos-fsck')
+@click.option(
+    '--remover',
+    is_flag=True,
+    help='Apaga os arquivos órfãos (sem a opção, apenas lista).'
+)
+@click.option(
+    '--idade-minima',
+    default=60,
+    show_default=True,
+    type=click.IntRange(min=0),
+    help='Ignora arquivos modificados há menos minutos que isso.'
+)
+def fotos_fsck(remover, idade_minima):
+    """Verifica as fotos em UPLOAD_FOLDER e recupera o espaço de órfãs."""
+    resultado = verificar_fotos(
+        current_app.extensions['fila_fotos'],
+        remover=remover,
+        idade_minima=idade_minima * 60
+    )
+
+    for caminho in resultado['orfaos']:
+        click.echo(f'órfão: {caminho}')
+    for caminho in resultado['faltando']:
+        click.echo(f'faltando: {caminho}', err=True)
+
+    acao = 'removidos' if remover else 'a remover'
+    click.echo(
+        f"{len(resultado['orfaos'])} arquivos órfãos {acao} "
+        f"({resultado['bytes'] / 1024:.1f} KiB), "
+        f"{len(resultado['faltando'])} fotos referenciadas sem arquivo"
+    )
+
+
+@gymflow.command('audit-cpfs')
+@click.option(
+    '--lote',
+    default=5000,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help='Alunos lidos do banco por vez.'
+)
+def audit_cpfs(lote):
+    """Lista os alunos cadastrados com CPF inválido."""
+    consulta = select(Aluno.id, Aluno.nome, Aluno.cpf).order_by(Aluno.id)
+    resultado = db.session.execute(consulta.execution_options(yield_per=lote))
+
+    total = invalidos = 0
+    for linhas in resultado.partitions():
+        validos, _ = validar_cpfs(linha.cpf for linha in linhas)
+        total += len(linhas)
+        for linha, valido in zip(linhas, validos):
+            if not valido:
+                invalidos += 1
+                click.echo(f'{linha.id}\t{linha.cpf}\t{linha.nome}')
+
+    click.echo(f'{total} alunos verificados, {invalidos} com CPF inválido', err=True)
+
+
+@gymflow.command('reindex-busca')
+def reindex_busca():
+    """Recria o índice de busca de alunos a partir da tabela."""
+    click.echo(f'{reconstruir_indice()} alunos indexados')
+
+
+@gymflow.command('rollup-presencas')
+@click.option(
+    '--desde',
+    type=click.DateTime(formats=['%Y-%m-%d']),
+    help='Primeiro dia a refazer (padrão: todo o histórico).'
+)
+@click.option(
+    '--ate',
+    type=click.DateTime(formats=['%Y-%m-%d']),
+    help='Último dia a refazer (padrão: sem limite).'
+)
+def rollup_presencas(desde, ate):
+    """Refaz os agregados de frequência a partir das presenças."""
+    linhas = reconstruir_frequencias(
+        desde.date() if desde else None,
+        ate.date() if ate else None
+    )
+    for tabela, total in linhas.items():
+        click.echo(f'{tabela}: {total} linhas')
@@ -23,11 +23,33 @@ class Config:
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+    # Threads que geram as variantes das fotos em segundo plano
+    PHOTO_WORKERS = int(os.getenv('PHOTO_WORKERS', 2))
+    # Limites de uma foto enviada: bytes e pixels (largura x altura)
+    PHOTO_MAX_BYTES = int(os.getenv('PHOTO_MAX_BYTES', MAX_CONTENT_LENGTH))
+    PHOTO_MAX_PIXELS = int(os.getenv('PHOTO_MAX_PIXELS', 40_000_000))
+    # Entrega das fotos em /media: X-Sendfile (Apache/lighttpd) ou o prefixo
+    # interno do nginx para X-Accel-Redirect (ex.: /_uploads/)
+    USE_X_SENDFILE = os.getenv('USE_X_SENDFILE', 'false').lower() == 'true'
+    MEDIA_ACCEL_REDIRECT = os.getenv('MEDIA_ACCEL_REDIRECT')
+    
+    # Presenças: log local dos eventos aceitos (padrão: instance/presencas)
+    # e gravação em lote por tamanho ou intervalo (0 desliga a thread)
+    PRESENCA_WAL_FOLDER = os.getenv('PRESENCA_WAL_FOLDER')
+    PRESENCA_BATCH_SIZE = int(os.getenv('PRESENCA_BATCH_SIZE', 500))
+    PRESENCA_FLUSH_INTERVAL = float(os.getenv('PRESENCA_FLUSH_INTERVAL', 1.0))
+    PRESENCA_WAL_FSYNC = os.getenv('PRESENCA_WAL_FSYNC', 'true').lower() == 'true'
+    # Ocupação em tempo real: fuso do dia local em relação ao UTC e
+    # intervalo (s) para remontar o contador do banco (0 desliga)
+    OCUPACAO_FUSO_HORAS = int(os.getenv('OCUPACAO_FUSO_HORAS', -3))
+    OCUPACAO_RESYNC = float(os.getenv('OCUPACAO_RESYNC', 60))
     
     # JWT
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'chave-jwt-padrao')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    # Segundos que a versão/status de um usuário fica em cache para validar tokens
+    TOKEN_CACHE_TIMEOUT = int(os.getenv('TOKEN_CACHE_TIMEOUT', 60))
     
     # Email
     MAIL_SERVER = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
@@ -37,6 +59,10 @@ class Config:
     MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', 'noreply@gymflow.com')
     
+    # Paginação
+    ITEMS_PER_PAGE = int(os.getenv('ITEMS_PER_PAGE', 50))
+    MAX_ITEMS_PER_PAGE = int(os.getenv('MAX_ITEMS_PER_PAGE', 500))
+    
     # Cache
     CACHE_TYPE = os.getenv('CACHE_TYPE', 'simple')
     CACHE_DEFAULT_TIMEOUT = int(os.getenv('CACHE_DEFAULT_TIMEOUT', 300))
@@ -44,11 +70,25 @@ class Config:
     # Session
     SESSION_TYPE = 'filesystem'
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
+    # Cache local (por processo) dos usuários carregados pela sessão
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 1024))
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 30))
+    # Índice de autocompletar de alunos (por processo); recarregado do banco
+    AUTOCOMPLETE_TTL = int(os.getenv('AUTOCOMPLETE_TTL', 300))
     
     # Security
     SECURITY_PASSWORD_SALT = os.getenv('SECURITY_PASSWORD_SALT', 'salt-padrao')
     SECURITY_PASSWORD_HASH = 'bcrypt'
     
+    # Hash de senhas (formato de método do werkzeug, ex.: 'pbkdf2:sha256:600000').
+    # Senhas gravadas com parâmetros diferentes são refeitas no próximo login.
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_SALT_LENGTH = int(os.getenv('PASSWORD_SALT_LENGTH', 16))
+    # Verificações de senha simultâneas e logins que podem aguardar na fila;
+    # com a fila cheia, o login responde 503
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 4))
+    PASSWORD_HASH_QUEUE = int(os.getenv('PASSWORD_HASH_QUEUE', 16))
+    
     # CORS
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*').split(',')
     CORS_METHODS = ['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS']
@@ -70,6 +110,11 @@ class TestingConfig(Config):
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
     MAIL_SUPPRESS_SEND = True
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    # Presenças gravadas só por tamanho ou descarga explícita
+    PRESENCA_FLUSH_INTERVAL = 0
+    PRESENCA_WAL_FSYNC = False
+    OCUPACAO_RESYNC = 0
 
 
 class ProductionConfig(Config):
@@ -94,12 +139,15 @@ config = {
 }
 
 
-def get_config():
+def get_config(config_name=None):
     """
     Retorna a configuração baseada no ambiente.
     
+    Args:
+        config_name: Nome da configuração; se omitido, usa FLASK_ENV
+        
     Returns:
         Config: Classe de configuração apropriada
     """
-    env = os.getenv('FLASK_ENV', 'development')
+    env = config_name or os.getenv('FLASK_ENV', 'development')
     return config.get(env, config['default']) 
\ No newline at end of file
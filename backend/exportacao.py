@@ -0,0 +1,99 @@
+"""Exportação de dados em CSV e NDJSON.
+
+As consultas são executadas com ``yield_per`` e lidas em partições de
+tamanho fixo; cada partição vira um pedaço da resposta, de modo que a
+memória usada não depende do tamanho da tabela. As consultas selecionam
+colunas (e não entidades), evitando o mapa de identidade da sessão.
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Iterator, List, Sequence
+from flask import Response, stream_with_context
+from sqlalchemy import Select
+from . import db
+
+
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson'
+}
+
+# Linhas lidas do banco (e enviadas) por vez
+LINHAS_POR_PARTE = 1000
+
+
+def _valor_json(valor: Any) -> Any:
+    """Converte valores não suportados pelo json (datas)."""
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    raise TypeError(f'Tipo não serializável: {type(valor).__name__}')
+
+
+def _gerar_csv(partes: Iterator[Sequence[Any]], campos: List[str]) -> Iterator[str]:
+    """Gera o CSV, um pedaço por partição de linhas."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+
+    escritor.writerow(campos)
+    yield buffer.getvalue()
+
+    for linhas in partes:
+        buffer.seek(0)
+        buffer.truncate(0)
+        escritor.writerows(
+            [
+                valor.isoformat() if isinstance(valor, (date, datetime)) else valor
+                for valor in linha
+            ]
+            for linha in linhas
+        )
+        yield buffer.getvalue()
+
+
+def _gerar_ndjson(partes: Iterator[Sequence[Any]], campos: List[str]) -> Iterator[str]:
+    """Gera um objeto JSON por linha, um pedaço por partição de linhas."""
+    for linhas in partes:
+        yield ''.join(
+            json.dumps(dict(zip(campos, linha)), default=_valor_json, ensure_ascii=False) + '\n'
+            for linha in linhas
+        )
+
+
+def exportar_consulta(consulta: Select, formato: str, nome: str) -> Response:
+    """
+    Cria uma resposta que transmite o resultado da consulta aos poucos.
+
+    Args:
+        consulta: Consulta de colunas (select) a exportar
+        formato: 'csv' ou 'ndjson'
+        nome: Nome do arquivo sugerido, sem extensão
+
+    Returns:
+        Response: Resposta em streaming com o arquivo exportado
+
+    Raises:
+        ValueError: Se o formato não for suportado
+    """
+    if formato not in FORMATOS:
+        raise ValueError('Formato deve ser csv ou ndjson')
+
+    campos = list(consulta.selected_columns.keys())
+    gerador = _gerar_csv if formato == 'csv' else _gerar_ndjson
+
+    def gerar() -> Iterator[str]:
+        resultado = db.session.execute(
+            consulta.execution_options(yield_per=LINHAS_POR_PARTE)
+        )
+        try:
+            yield from gerador(resultado.partitions(), campos)
+        finally:
+            resultado.close()
+
+    return Response(
+        stream_with_context(gerar()),
+        mimetype=FORMATOS[formato],
+        headers={'Content-Disposition': f'attachment; filename={nome}.{formato}'}
+    )
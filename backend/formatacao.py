@@ -0,0 +1,172 @@
+"""Formatação de valores para exibição (CPF, telefone e moeda) e busca.
+
+Os padrões são compilados uma vez, na importação do módulo, e valores
+que já estão só com dígitos não passam pela regex. As variantes em lote
+(``formatar_cpfs``, ``formatar_moedas``) formatam uma coluna inteira de
+um relatório: os valores são unidos em um único texto (ou bloco de
+bytes), transformados com poucas operações em C e separados de novo.
+"""
+
+import re
+import unicodedata
+from decimal import Decimal
+from itertools import repeat
+from typing import Iterable, List, Optional, Union
+
+Numero = Union[int, float, Decimal]
+
+_NAO_DIGITOS = re.compile(r'[^0-9]')
+
+# Máscara removida dos CPFs no lote (uma tradução sobre o texto inteiro)
+_PONTUACAO_CPF = str.maketrans('', '', '.- ')
+
+# Molde de um CPF formatado e as posições onde vão os 11 dígitos
+_MOLDE_CPF = b'000.000.000-00\n'
+_POSICOES_CPF = (0, 1, 2, 4, 5, 6, 8, 9, 10, 12, 13)
+
+# Milhar com '_' evita a troca em três passos entre ',' e '.' (Decimal
+# só aceita ',' como separador de milhar e usa a tabela de troca)
+_FORMATO_MOEDA = '_.2f'
+_FORMATO_MOEDA_DECIMAL = ',.2f'
+_TROCA_SEPARADORES = str.maketrans(',.', '_,')
+
+
+def _somente_digitos(valor: str) -> str:
+    """Remove tudo que não for dígito, evitando a regex no caso comum."""
+    if valor.isascii() and valor.isdigit():
+        return valor
+    return _NAO_DIGITOS.sub('', valor)
+
+
+def _digitos_cpfs(cpfs: List[str]) -> List[str]:
+    """Remove a máscara de vários CPFs com uma única passada sobre o lote."""
+    bloco = '\n'.join(cpfs).translate(_PONTUACAO_CPF)
+    digitos = bloco.replace('\n', '')
+    if bloco.count('\n') == len(cpfs) - 1 and digitos.isascii() and digitos.isdigit():
+        return bloco.split('\n')
+    return [_somente_digitos(cpf) for cpf in cpfs]
+
+
+def _mascarar_cpfs(cpfs: List[str]) -> List[str]:
+    """Aplica a máscara a CPFs de 11 dígitos, coluna a coluna."""
+    bloco = ''.join(cpfs).encode('ascii')
+    saida = bytearray(_MOLDE_CPF * len(cpfs))
+    largura = len(_MOLDE_CPF)
+    for origem, destino in enumerate(_POSICOES_CPF):
+        saida[destino::largura] = bloco[origem::11]
+    return saida.decode('ascii').split('\n')[:-1]
+
+
+def formatar_cpf(cpf: str) -> str:
+    """
+    Formata um CPF para exibição (XXX.XXX.XXX-XX).
+    
+    Args:
+        cpf: String contendo o CPF a ser formatado
+        
+    Returns:
+        str: CPF formatado, ou apenas os dígitos se não forem 11
+    """
+    cpf = _somente_digitos(cpf)
+    if len(cpf) == 11:
+        return f'{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}'
+    return cpf
+
+
+def formatar_cpfs(cpfs: Iterable[Optional[str]]) -> List[str]:
+    """
+    Formata uma coluna de CPFs.
+    
+    Args:
+        cpfs: CPFs com ou sem máscara (None vira texto vazio)
+        
+    Returns:
+        List[str]: CPFs formatados, na mesma ordem
+    """
+    digitos = _digitos_cpfs([cpf or '' for cpf in cpfs])
+    completos = [cpf for cpf in digitos if len(cpf) == 11]
+    if len(completos) == len(digitos):
+        return _mascarar_cpfs(completos)
+
+    formatados = iter(_mascarar_cpfs(completos))
+    return [next(formatados) if len(cpf) == 11 else cpf for cpf in digitos]
+
+
+def formatar_telefone(telefone: str) -> str:
+    """
+    Formata um telefone para exibição ((XX) XXXXX-XXXX).
+    
+    Args:
+        telefone: String contendo o telefone a ser formatado
+        
+    Returns:
+        str: Telefone formatado
+    """
+    telefone = _somente_digitos(telefone)
+    if len(telefone) == 11:
+        return f'({telefone[:2]}) {telefone[2:7]}-{telefone[7:]}'
+    return telefone
+
+
+def formatar_moeda(valor: Numero) -> str:
+    """
+    Formata um valor monetário para exibição (R$ X.XXX,XX).
+    
+    Args:
+        valor: Valor a ser formatado
+        
+    Returns:
+        str: Valor formatado (negativos como -R$ X,XX)
+    """
+    try:
+        if valor >= 0:
+            return f'R$ {valor:_.2f}'.replace('.', ',').replace('_', '.')
+        return f'-R$ {-valor:_.2f}'.replace('.', ',').replace('_', '.')
+    except ValueError:
+        # Decimal não aceita '_' como separador de milhar
+        texto = format(abs(valor), _FORMATO_MOEDA_DECIMAL).translate(_TROCA_SEPARADORES)
+        return f"{'-' if valor < 0 else ''}R$ {texto.replace('_', '.')}"
+
+
+def formatar_moedas(valores: Iterable[Numero]) -> List[str]:
+    """
+    Formata uma coluna de valores monetários.
+    
+    Args:
+        valores: Valores a serem formatados
+        
+    Returns:
+        List[str]: Valores formatados, na mesma ordem
+    """
+    valores = list(valores)
+    if not valores:
+        return []
+    if any(isinstance(valor, Decimal) for valor in valores):
+        return [formatar_moeda(valor) for valor in valores]
+
+    texto = 'R$ ' + '\nR$ '.join(map(format, valores, repeat(_FORMATO_MOEDA)))
+    return (
+        texto.replace('.', ',')
+        .replace('_', '.')
+        .replace('R$ -', '-R$ ')
+        .split('\n')
+    )
+
+
+def normalizar_texto(texto: str) -> str:
+    """
+    Normaliza um texto para busca e ordenação: sem acentos e em minúsculas.
+    
+    Args:
+        texto: Texto a normalizar (ex.: nome do aluno)
+        
+    Returns:
+        str: Texto normalizado ('João' -> 'joao')
+    """
+    if texto.isascii():
+        return texto.casefold()
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(
+        caractere for caractere in decomposto
+        if not unicodedata.combining(caractere)
+    ).casefold()
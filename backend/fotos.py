@@ -0,0 +1,645 @@
+"""Armazenamento e processamento de fotos.
+
+As fotos são endereçadas pelo conteúdo: o nome é o SHA-256 do arquivo
+enviado, distribuído em subpastas pelos quatro primeiros caracteres
+(``alunos/ab/cd/<sha256>.jpg``). Fotos idênticas ocupam um único
+conjunto de arquivos, e um nome nunca muda de conteúdo.
+
+O upload é gravado como está em uma fila local persistente (a pasta
+``.fila`` dentro de UPLOAD_FOLDER) e a requisição retorna em seguida com
+o caminho definitivo da foto. Um pool de threads gera as variantes fora
+da requisição:
+
+- ``<sha256>.jpg``: até 800x800, o caminho gravado em ``foto_url``
+- ``<sha256>_thumb.jpg``: miniatura de até 200x200
+- ``<sha256>_original.<ext>``: o arquivo enviado, sem alterações
+
+Cada tarefa é um arquivo JSON ao lado do upload bruto; tarefas que
+ficaram na pasta (por exemplo, após reiniciar o servidor) são retomadas
+na primeira requisição de cada processo. Como todos os processos
+retomam a mesma pasta, cada tarefa é travada (``travas.travar``) por
+quem a processa; os demais a ignoram. Tarefas que falham são renomeadas
+para ``.erro`` e mantidas para inspeção.
+
+O upload é lido em blocos de TAMANHO_BLOCO direto para um arquivo
+temporário, sem carregar o arquivo inteiro em memória. O tipo é
+identificado pelo conteúdo (libmagic) no primeiro bloco, e as dimensões
+são lidas do cabeçalho da imagem assim que ele chega, recusando imagens
+com pixels demais antes de qualquer decodificação.
+
+As referências de cada foto são as linhas de alunos e usuários cujo
+``foto_url`` aponta para ela; os arquivos só são apagados quando não
+resta nenhuma (ver ``contar_referencias`` e ``verificar_fotos``).
+
+Um upload idêntico a uma foto existente reaproveita os arquivos e só
+grava a referência depois, em outra transação. Para que uma exclusão
+concorrente não apague a foto nesse intervalo, o reaproveitamento
+atualiza a data de modificação dos arquivos, e a exclusão
+(``FilaFotos.excluir``) e o ``fotos-fsck`` só apagam fotos sem
+referências e sem modificação recente. A verificação e a exclusão, de
+um lado, e o reaproveitamento, do outro, rodam sob a mesma trava de
+arquivo, comum a todos os processos.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Set, Tuple, Union
+import magic
+from PIL import Image, UnidentifiedImageError
+from werkzeug.security import safe_join
+from . import db
+from .models import Aluno, Usuario
+from .travas import travar
+
+logger = logging.getLogger(__name__)
+
+PASTA_FILA = '.fila'
+
+# Trava entre processos do reaproveitamento e da exclusão de fotos
+ARQUIVO_TRAVA = '.trava'
+
+# Uma foto modificada (enviada ou reaproveitada) há menos segundos que
+# isso não é apagada, pois a referência a ela pode ainda não ter sido gravada
+IDADE_MINIMA_EXCLUSAO = 300
+
+# Lado máximo, em pixels, de cada variante JPEG
+TAMANHOS = {
+    'media': 800,
+    'thumb': 200
+}
+
+SUFIXOS = {
+    'media': '',
+    'thumb': '_thumb'
+}
+
+SUFIXO_ORIGINAL = '_original'
+
+QUALIDADE_JPEG = 85
+
+# Bytes lidos do upload por vez
+TAMANHO_BLOCO = 64 * 1024
+
+# Até quantos bytes iniciais se tenta ler o cabeçalho durante o upload
+TAMANHO_MAXIMO_CABECALHO = 1024 * 1024
+
+# Tipos aceitos, identificados pelo conteúdo, e a extensão do original
+TIPOS_PERMITIDOS = {
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+    'image/gif': 'gif'
+}
+
+MODELOS_COM_FOTO = (Aluno, Usuario)
+
+
+class FotoInvalida(ValueError):
+    """O arquivo enviado não é uma imagem aceita."""
+
+
+class FotoGrandeDemais(FotoInvalida):
+    """O arquivo enviado excede o tamanho máximo em bytes."""
+
+
+def _extensao_do_conteudo(bloco: bytes) -> str:
+    """Identifica o tipo da imagem pelos primeiros bytes."""
+    if not bloco:
+        raise FotoInvalida('Arquivo vazio')
+    tipo = magic.from_buffer(bloco, mime=True)
+    if tipo not in TIPOS_PERMITIDOS:
+        raise FotoInvalida(f'Tipo de arquivo não permitido: {tipo}')
+    return TIPOS_PERMITIDOS[tipo]
+
+
+def _ler_dimensoes(origem: Union[str, BinaryIO]) -> Optional[Tuple[int, int]]:
+    """
+    Lê largura e altura do cabeçalho, sem decodificar os pixels.
+
+    Returns:
+        Optional[Tuple[int, int]]: Dimensões, ou None se o cabeçalho
+        estiver incompleto ou não for reconhecido
+    """
+    try:
+        with Image.open(origem) as imagem:
+            return imagem.size
+    except Image.DecompressionBombError:
+        raise FotoInvalida('Imagem com pixels demais')
+    except (UnidentifiedImageError, OSError, SyntaxError, EOFError, ValueError):
+        return None
+
+
+def _verificar_pixels(dimensoes: Tuple[int, int], limite_pixels: Optional[int]) -> None:
+    """Recusa imagens acima do limite de pixels."""
+    largura, altura = dimensoes
+    if limite_pixels and largura * altura > limite_pixels:
+        raise FotoInvalida(
+            f'Imagem com pixels demais: {largura}x{altura} '
+            f'(máximo de {limite_pixels} pixels)'
+        )
+
+
+def caminho_foto(pasta: str, resumo: str) -> str:
+    """
+    Monta o caminho relativo de uma foto a partir do hash do conteúdo.
+
+    Args:
+        pasta: Subpasta de destino (ex.: 'alunos')
+        resumo: SHA-256 do arquivo enviado, em hexadecimal
+
+    Returns:
+        str: Caminho relativo da variante de 800px
+    """
+    return os.path.join(pasta, resumo[:2], resumo[2:4], f'{resumo}.jpg')
+
+
+def caminho_variante(caminho: str, tamanho: str) -> str:
+    """
+    Retorna o caminho relativo de uma variante JPEG da foto.
+
+    Args:
+        caminho: Caminho da foto (o valor de foto_url)
+        tamanho: 'media' ou 'thumb'
+
+    Returns:
+        str: Caminho relativo da variante
+
+    Raises:
+        ValueError: Se o tamanho não existir
+    """
+    if tamanho not in SUFIXOS:
+        raise ValueError(f'Tamanho inválido: {tamanho}')
+    return f'{os.path.splitext(caminho)[0]}{SUFIXOS[tamanho]}.jpg'
+
+
+def _base_da_foto(caminho: str) -> str:
+    """Caminho sem extensão e sem sufixo de variante (identifica o grupo)."""
+    base = os.path.splitext(caminho)[0]
+    for sufixo in ('_thumb', SUFIXO_ORIGINAL):
+        if base.endswith(sufixo):
+            return base[:-len(sufixo)]
+    return base
+
+
+def _arquivos_da_foto(pasta_uploads: str, caminho: str) -> List[str]:
+    """Caminhos absolutos da foto e de suas variantes que existem no disco."""
+    base = os.path.basename(_base_da_foto(caminho))
+    pasta = os.path.join(pasta_uploads, os.path.dirname(caminho))
+    if not os.path.isdir(pasta):
+        return []
+    return [
+        os.path.join(pasta, nome)
+        for nome in os.listdir(pasta)
+        if os.path.splitext(nome)[0] in (base, f'{base}_thumb', f'{base}{SUFIXO_ORIGINAL}')
+    ]
+
+
+def _id_tarefa(caminho: str) -> str:
+    """Identificador da tarefa na fila: pasta e hash da foto."""
+    pasta = caminho.replace(os.sep, '/').split('/', 1)[0]
+    nome = os.path.basename(_base_da_foto(caminho))
+    return f'{pasta}-{nome}'
+
+
+def _gravar_atomico(caminho: str, gravar) -> None:
+    """Grava em um arquivo temporário (único por thread) e o move para o destino."""
+    temporario = f'{caminho}.{os.getpid()}-{threading.get_ident()}.tmp'
+    gravar(temporario)
+    os.replace(temporario, caminho)
+
+
+def gerar_variantes(
+    bruto: str,
+    destino: str,
+    extensao: str,
+    limite_pixels: Optional[int] = None
+) -> List[str]:
+    """
+    Gera as variantes de uma foto.
+
+    Args:
+        bruto: Caminho absoluto do arquivo enviado
+        destino: Caminho absoluto da foto, sem extensão
+        extensao: Extensão do arquivo enviado
+        limite_pixels: Quantidade máxima de pixels aceita
+
+    Returns:
+        List[str]: Caminhos absolutos dos arquivos gerados
+    """
+    gerados = []
+    with Image.open(bruto) as imagem:
+        _verificar_pixels(imagem.size, limite_pixels)
+        # JPEGs são decodificados já reduzidos (escala 1/2, 1/4 ou 1/8)
+        maior = max(TAMANHOS.values())
+        imagem.draft('RGB', (maior, maior))
+        imagem = imagem.convert('RGB')
+        for tamanho, lado in TAMANHOS.items():
+            copia = imagem.copy()
+            copia.thumbnail((lado, lado))
+            caminho = f'{destino}{SUFIXOS[tamanho]}.jpg'
+            _gravar_atomico(
+                caminho,
+                lambda temporario: copia.save(
+                    temporario,
+                    format='JPEG',
+                    optimize=True,
+                    quality=QUALIDADE_JPEG
+                )
+            )
+            gerados.append(caminho)
+
+    original = f'{destino}{SUFIXO_ORIGINAL}.{extensao}'
+    os.replace(bruto, original)
+    gerados.append(original)
+    return gerados
+
+
+class FilaFotos:
+    """
+    Fila persistente de processamento de fotos.
+
+    Args:
+        pasta_uploads: Pasta base dos uploads (UPLOAD_FOLDER)
+        workers: Quantidade de threads de processamento
+        limite_bytes: Tamanho máximo de um upload, em bytes
+        limite_pixels: Quantidade máxima de pixels de uma imagem
+    """
+
+    def __init__(
+        self,
+        pasta_uploads: str,
+        workers: int = 2,
+        limite_bytes: Optional[int] = None,
+        limite_pixels: Optional[int] = None
+    ):
+        self.pasta_uploads = pasta_uploads
+        self.pasta_fila = os.path.join(pasta_uploads, PASTA_FILA)
+        self.workers = workers
+        self.limite_bytes = limite_bytes
+        self.limite_pixels = limite_pixels
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futuros: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _enviar(self, tarefa_id: str) -> Future:
+        """Envia a tarefa ao pool, criando-o no primeiro uso."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix='fotos'
+                )
+            futuro = self._executor.submit(self._processar, tarefa_id)
+            self._futuros[tarefa_id] = futuro
+        futuro.add_done_callback(lambda _: self._futuros.pop(tarefa_id, None))
+        return futuro
+
+    def caminho_tarefa(self, tarefa_id: str, extensao: str = 'json') -> str:
+        """Caminho de um arquivo da tarefa na pasta da fila."""
+        return os.path.join(self.pasta_fila, f'{tarefa_id}.{extensao}')
+
+    def _receber(self, fluxo: BinaryIO, temporario: str) -> Tuple[str, str]:
+        """
+        Copia o upload em blocos para o arquivo temporário, validando-o.
+
+        Args:
+            fluxo: Fluxo binário do upload
+            temporario: Caminho do arquivo temporário
+
+        Returns:
+            Tuple[str, str]: SHA-256 do conteúdo e extensão do original
+
+        Raises:
+            FotoInvalida: Se não for uma imagem aceita ou tiver pixels demais
+            FotoGrandeDemais: Se exceder o limite de bytes
+        """
+        resumo = hashlib.sha256()
+        total = 0
+        cabecalho = b''
+        dimensoes = None
+        with open(temporario, 'wb') as destino:
+            bloco = fluxo.read(TAMANHO_BLOCO)
+            extensao = _extensao_do_conteudo(bloco)
+            while bloco:
+                total += len(bloco)
+                if self.limite_bytes and total > self.limite_bytes:
+                    raise FotoGrandeDemais(
+                        f'Arquivo maior que {self.limite_bytes // (1024 * 1024)}MB'
+                    )
+                if dimensoes is None and len(cabecalho) < TAMANHO_MAXIMO_CABECALHO:
+                    cabecalho += bloco
+                    dimensoes = _ler_dimensoes(io.BytesIO(cabecalho))
+                    if dimensoes:
+                        _verificar_pixels(dimensoes, self.limite_pixels)
+                resumo.update(bloco)
+                destino.write(bloco)
+                bloco = fluxo.read(TAMANHO_BLOCO)
+
+        if dimensoes is None:
+            dimensoes = _ler_dimensoes(temporario)
+            if dimensoes is None:
+                raise FotoInvalida('Imagem corrompida ou incompleta')
+            _verificar_pixels(dimensoes, self.limite_pixels)
+        return resumo.hexdigest(), extensao
+
+    def enfileirar(self, fluxo: BinaryIO, pasta: str) -> str:
+        """
+        Grava o upload na fila e agenda o processamento.
+
+        O upload é copiado em blocos enquanto o hash é calculado. Se a
+        mesma foto já existir (ou já estiver na fila), a cópia é
+        descartada e o caminho existente é retornado.
+
+        Args:
+            fluxo: Fluxo binário do upload (FileStorage.stream ou o
+                corpo da requisição)
+            pasta: Subpasta de destino (ex.: 'alunos')
+
+        Returns:
+            str: Caminho relativo definitivo da foto (disponível quando
+            o processamento terminar)
+
+        Raises:
+            FotoInvalida: Se não for uma imagem aceita ou tiver pixels demais
+            FotoGrandeDemais: Se exceder o limite de bytes
+        """
+        os.makedirs(self.pasta_fila, exist_ok=True)
+        temporario = self.caminho_tarefa(
+            f'{threading.get_ident()}-{time.monotonic_ns()}',
+            'upload.tmp'
+        )
+        try:
+            resumo, extensao = self._receber(fluxo, temporario)
+        except Exception:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+        caminho = caminho_foto(pasta, resumo)
+        tarefa_id = _id_tarefa(caminho)
+        with self._lock, self._travar_fotos():
+            existentes = _arquivos_da_foto(self.pasta_uploads, caminho)
+            if existentes or os.path.exists(self.caminho_tarefa(tarefa_id)):
+                # Marca a foto como em uso, para não ser apagada antes da referência
+                for arquivo in existentes:
+                    os.utime(arquivo)
+                os.remove(temporario)
+                return caminho
+
+            os.replace(temporario, self.caminho_tarefa(tarefa_id, 'upload'))
+            tarefa = {
+                'destino': os.path.splitext(caminho)[0],
+                'extensao': extensao
+            }
+            _gravar_atomico(
+                self.caminho_tarefa(tarefa_id),
+                lambda temporario: _escrever_json(temporario, tarefa)
+            )
+        self._enviar(tarefa_id)
+        return caminho
+
+    @contextmanager
+    def _travar_fotos(self) -> Iterator[None]:
+        """Trava o reaproveitamento e a exclusão de fotos entre processos."""
+        os.makedirs(self.pasta_fila, exist_ok=True)
+        with open(os.path.join(self.pasta_fila, ARQUIVO_TRAVA), 'a') as arquivo:
+            travar(arquivo)
+            yield
+
+    def excluir(self, caminho: str, idade_minima: float = IDADE_MINIMA_EXCLUSAO) -> bool:
+        """
+        Apaga a foto e suas variantes se nada mais a referenciar.
+
+        Chame depois do commit que removeu a referência. Fotos
+        modificadas há menos de ``idade_minima`` segundos são mantidas
+        (podem ter sido reaproveitadas por um upload ainda não gravado);
+        se ficarem sem referência, o ``fotos-fsck`` as remove depois.
+
+        Args:
+            caminho: Caminho relativo da foto (foto_url)
+            idade_minima: Idade mínima, em segundos, dos arquivos apagados
+
+        Returns:
+            bool: True se algum arquivo foi apagado
+        """
+        with self._travar_fotos():
+            arquivos = _arquivos_da_foto(self.pasta_uploads, caminho)
+            limite = time.time() - idade_minima
+            if (
+                not arquivos
+                or any(os.path.getmtime(arquivo) > limite for arquivo in arquivos)
+                or contar_referencias(caminho)
+            ):
+                return False
+            for arquivo in arquivos:
+                os.remove(arquivo)
+        return True
+
+    def retomar(self) -> int:
+        """
+        Reagenda as tarefas que ficaram na pasta da fila.
+
+        Tarefas que outro processo está processando são descartadas
+        quando chegam ao pool (ver ``_processar``).
+
+        Returns:
+            int: Quantidade de tarefas reagendadas
+        """
+        if not os.path.isdir(self.pasta_fila):
+            return 0
+        tarefas = [
+            arquivo[:-len('.json')]
+            for arquivo in sorted(os.listdir(self.pasta_fila))
+            if arquivo.endswith('.json')
+        ]
+        for tarefa_id in tarefas:
+            if tarefa_id not in self._futuros:
+                self._enviar(tarefa_id)
+        return len(tarefas)
+
+    def _processar(self, tarefa_id: str) -> None:
+        """
+        Gera as variantes de uma tarefa e a remove da fila.
+
+        A tarefa fica travada durante o processamento; se outro processo
+        já a tiver, ou já a tiver concluído, nada é feito.
+        """
+        caminho_tarefa = self.caminho_tarefa(tarefa_id)
+        try:
+            arquivo = open(caminho_tarefa, encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with arquivo:
+            if not travar(arquivo, esperar=False):
+                return
+            try:
+                # Concluída e removida por outro processo entre a abertura e a trava
+                if not os.path.samestat(os.fstat(arquivo.fileno()), os.stat(caminho_tarefa)):
+                    return
+            except FileNotFoundError:
+                return
+
+            try:
+                tarefa = json.load(arquivo)
+                destino = os.path.join(self.pasta_uploads, tarefa['destino'])
+                os.makedirs(os.path.dirname(destino), exist_ok=True)
+                gerar_variantes(
+                    self.caminho_tarefa(tarefa_id, 'upload'),
+                    destino,
+                    tarefa['extensao'],
+                    self.limite_pixels
+                )
+                os.remove(caminho_tarefa)
+            except Exception:
+                logger.exception('Erro ao processar foto %s', tarefa_id)
+                if os.path.exists(caminho_tarefa):
+                    os.replace(caminho_tarefa, self.caminho_tarefa(tarefa_id, 'erro'))
+
+    def pendente(self, caminho: str) -> bool:
+        """Indica se a foto ainda está na fila de processamento."""
+        return os.path.exists(self.caminho_tarefa(_id_tarefa(caminho)))
+
+    def status(self, caminho: str) -> str:
+        """
+        Retorna o status de processamento de uma foto.
+
+        Args:
+            caminho: Caminho relativo da foto (foto_url)
+
+        Returns:
+            str: 'pendente', 'pronta', 'erro' ou 'inexistente'
+        """
+        completo = safe_join(self.pasta_uploads, caminho)
+        if not caminho or completo is None:
+            return 'inexistente'
+        if self.pendente(caminho):
+            return 'pendente'
+        if os.path.exists(completo):
+            return 'pronta'
+        if os.path.exists(self.caminho_tarefa(_id_tarefa(caminho), 'erro')):
+            return 'erro'
+        return 'inexistente'
+
+    def aguardar(self, timeout: Optional[float] = None) -> None:
+        """Espera o processamento das tarefas agendadas até o momento."""
+        for futuro in list(self._futuros.values()):
+            futuro.result(timeout=timeout)
+
+
+def _escrever_json(caminho: str, dados: Dict) -> None:
+    """Grava um dicionário como JSON."""
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(dados, arquivo)
+
+
+def contar_referencias(caminho: str) -> int:
+    """
+    Conta alunos e usuários cujo foto_url aponta para a foto.
+
+    Args:
+        caminho: Caminho relativo da foto
+
+    Returns:
+        int: Quantidade de referências
+    """
+    return sum(
+        modelo.query.filter(modelo.foto_url == caminho).count()
+        for modelo in MODELOS_COM_FOTO
+    )
+
+
+def _fotos_referenciadas() -> Set[str]:
+    """Retorna os foto_url distintos gravados em alunos e usuários."""
+    consulta = db.union(*(
+        db.select(modelo.foto_url).where(modelo.foto_url.isnot(None))
+        for modelo in MODELOS_COM_FOTO
+    ))
+    return {caminho for caminho, in db.session.execute(consulta)}
+
+
+def _remover_pastas_vazias(raiz: str) -> None:
+    """Remove subpastas vazias (de baixo para cima), mantendo a raiz."""
+    for pasta, _, _ in os.walk(raiz, topdown=False):
+        if pasta != raiz and not os.listdir(pasta):
+            os.rmdir(pasta)
+
+
+def verificar_fotos(
+    fila: FilaFotos,
+    remover: bool = False,
+    idade_minima: float = 3600
+) -> Dict[str, Any]:
+    """
+    Verifica a consistência entre UPLOAD_FOLDER e as fotos referenciadas.
+
+    Arquivos de fotos sem nenhuma referência, e arquivos de tarefas que
+    falharam, são órfãos. Arquivos mais novos que ``idade_minima`` são
+    ignorados, pois podem pertencer a um upload cujo registro ainda não
+    foi gravado.
+
+    Args:
+        fila: Fila de fotos da aplicação
+        remover: Se True, apaga os arquivos órfãos
+        idade_minima: Idade mínima, em segundos, de um arquivo órfão
+
+    Returns:
+        Dict[str, Any]: Arquivos órfãos, bytes liberáveis (ou liberados)
+        e fotos referenciadas cujos arquivos não existem
+    """
+    pasta_uploads = fila.pasta_uploads
+    referenciadas = _fotos_referenciadas()
+    bases_referenciadas = {_base_da_foto(caminho) for caminho in referenciadas}
+    limite = time.time() - idade_minima
+
+    orfaos = []
+    for pasta, subpastas, arquivos in os.walk(pasta_uploads):
+        if pasta == pasta_uploads and PASTA_FILA in subpastas:
+            subpastas.remove(PASTA_FILA)
+        for nome in arquivos:
+            completo = os.path.join(pasta, nome)
+            relativo = os.path.relpath(completo, pasta_uploads)
+            if _base_da_foto(relativo) in bases_referenciadas or fila.pendente(relativo):
+                continue
+            if os.path.getmtime(completo) <= limite:
+                orfaos.append(completo)
+
+    # Restos de tarefas que falharam (ou de uploads interrompidos)
+    if os.path.isdir(fila.pasta_fila):
+        for nome in os.listdir(fila.pasta_fila):
+            if nome == ARQUIVO_TRAVA:
+                continue
+            completo = os.path.join(fila.pasta_fila, nome)
+            tarefa_id = nome.split('.', 1)[0]
+            if (
+                not os.path.exists(fila.caminho_tarefa(tarefa_id))
+                and os.path.getmtime(completo) <= limite
+            ):
+                orfaos.append(completo)
+
+    if remover:
+        with fila._travar_fotos():
+            # Fotos reaproveitadas desde a listagem deixam de ser órfãs
+            orfaos = [caminho for caminho in orfaos if os.path.getmtime(caminho) <= limite]
+            liberados = sum(os.path.getsize(caminho) for caminho in orfaos)
+            for caminho in orfaos:
+                os.remove(caminho)
+        _remover_pastas_vazias(pasta_uploads)
+    else:
+        liberados = sum(os.path.getsize(caminho) for caminho in orfaos)
+
+    faltando = sorted(
+        caminho for caminho in referenciadas
+        if fila.status(caminho) not in ('pronta', 'pendente')
+    )
+    return {
+        'orfaos': sorted(os.path.relpath(caminho, pasta_uploads) for caminho in orfaos),
+        'bytes': liberados,
+        'removidos': remover,
+        'faltando': faltando
+    }
@@ -0,0 +1,298 @@
+"""Relatórios de frequência e ocupação a partir de agregados de presenças.
+
+Os relatórios não leem ``presencas`` (uma linha por evento), e sim três
+tabelas agregadas, com uma linha por período:
+
+- ``frequencia_turma_dia``: entradas e saídas de cada turma por dia;
+- ``frequencia_aluno_semana``: visitas (entradas) de cada aluno por
+  semana, começando na segunda-feira;
+- ``ocupacao_hora``: entradas e saídas de cada turma por hora do dia.
+
+Os agregados são mantidos de forma incremental na gravação em lote das
+presenças (``acumular_frequencias``, na mesma transação dos INSERTs),
+com um UPSERT que soma as contagens de cada lote. Presenças gravadas
+por outros caminhos entram com a recompactação de um intervalo
+(``reconstruir_frequencias``, comando ``flask gymflow rollup-presencas``),
+que refaz os agregados a partir de ``presencas`` com uma consulta
+agrupada.
+
+As presenças são gravadas em UTC; dias, semanas e horas dos agregados
+seguem o horário local (OCUPACAO_FUSO_HORAS em relação ao UTC, o mesmo
+do contador de ocupação), tanto na soma incremental quanto na
+recompactação.
+"""
+
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from flask import current_app
+from sqlalchemy import (
+    Date, Integer, and_, case, cast, delete, extract, func, insert, select, text, true, update
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from . import db
+from .models import FrequenciaAlunoSemana, FrequenciaTurmaDia, OcupacaoHora, Presenca
+
+
+# Mantém cada UPSERT abaixo do limite de 999 parâmetros do SQLite (< 3.32)
+LINHAS_POR_COMANDO = 999 // max(
+    len(modelo.__table__.columns)
+    for modelo in (FrequenciaTurmaDia, FrequenciaAlunoSemana, OcupacaoHora)
+)
+
+
+def _fuso() -> timedelta:
+    """Diferença do horário local para o UTC (OCUPACAO_FUSO_HORAS)."""
+    return timedelta(hours=current_app.config.get('OCUPACAO_FUSO_HORAS', -3))
+
+
+def inicio_da_semana(dia: date) -> date:
+    """Segunda-feira da semana do dia informado."""
+    return dia - timedelta(days=dia.weekday())
+
+
+def _somar(modelo, linhas: List[Dict[str, Any]]) -> None:
+    """
+    Soma as contagens das linhas às já gravadas (UPSERT).
+
+    Args:
+        modelo: Tabela agregada
+        linhas: Valores da chave primária e das contagens a somar
+    """
+    if not linhas:
+        return
+    tabela = modelo.__table__
+    chaves = [coluna.name for coluna in tabela.primary_key]
+    contagens = [coluna for coluna in linhas[0] if coluna not in chaves]
+
+    dialeto = db.engine.dialect.name
+    if dialeto in ('sqlite', 'postgresql'):
+        dialeto_insert = sqlite.insert if dialeto == 'sqlite' else postgresql.insert
+        for inicio in range(0, len(linhas), LINHAS_POR_COMANDO):
+            comando = dialeto_insert(tabela).values(linhas[inicio:inicio + LINHAS_POR_COMANDO])
+            comando = comando.on_conflict_do_update(
+                index_elements=chaves,
+                set_={coluna: tabela.c[coluna] + comando.excluded[coluna] for coluna in contagens}
+            )
+            db.session.execute(comando)
+        return
+
+    # Bancos sem ON CONFLICT: atualiza e, se a linha não existir, insere
+    for linha in linhas:
+        resultado = db.session.execute(
+            update(tabela)
+            .where(and_(*(tabela.c[chave] == linha[chave] for chave in chaves)))
+            .values({coluna: tabela.c[coluna] + linha[coluna] for coluna in contagens})
+        )
+        if not resultado.rowcount:
+            db.session.execute(insert(tabela).values(linha))
+
+
+def acumular_frequencias(eventos: Iterable[Dict[str, Any]]) -> None:
+    """
+    Soma eventos de presença recém-inseridos aos agregados.
+
+    Não faz commit; deve rodar na mesma transação que inseriu os eventos.
+
+    Args:
+        eventos: Eventos com aluno_id, turma_id, data (UTC) e tipo
+    """
+    fuso = _fuso()
+    por_turma_dia: Counter = Counter()
+    por_aluno_semana: Counter = Counter()
+    por_hora: Counter = Counter()
+    for evento in eventos:
+        local = evento['data'] + fuso
+        dia = local.date()
+        tipo = evento['tipo']
+        por_turma_dia[evento['turma_id'], dia, tipo] += 1
+        por_hora[evento['turma_id'], dia, local.hour, tipo] += 1
+        if tipo == 'entrada':
+            por_aluno_semana[evento['aluno_id'], inicio_da_semana(dia)] += 1
+
+    def entradas_e_saidas(contagens: Counter, nomes: Tuple[str, ...]) -> List[Dict[str, Any]]:
+        linhas: Dict[Tuple, Dict[str, Any]] = {}
+        for (*chave, tipo), total in contagens.items():
+            linha = linhas.setdefault(
+                tuple(chave),
+                {**dict(zip(nomes, chave)), 'entradas': 0, 'saidas': 0}
+            )
+            linha['entradas' if tipo == 'entrada' else 'saidas'] += total
+        return list(linhas.values())
+
+    _somar(FrequenciaTurmaDia, entradas_e_saidas(por_turma_dia, ('turma_id', 'dia')))
+    _somar(OcupacaoHora, entradas_e_saidas(por_hora, ('turma_id', 'dia', 'hora')))
+    _somar(FrequenciaAlunoSemana, [
+        {'aluno_id': aluno_id, 'semana': semana, 'visitas': visitas}
+        for (aluno_id, semana), visitas in por_aluno_semana.items()
+    ])
+
+
+def _periodos(dialeto: str, fuso: timedelta) -> Tuple[Any, Any, Any]:
+    """Expressões SQL de dia, semana (segunda-feira) e hora locais de presencas.data."""
+    data = Presenca.data
+    if dialeto == 'sqlite':
+        deslocamento = f'{int(fuso.total_seconds()) // 60:+d} minutes'
+        return (
+            func.date(data, deslocamento),
+            func.date(data, deslocamento, 'weekday 0', '-6 days'),
+            cast(func.strftime('%H', data, deslocamento), Integer)
+        )
+    if dialeto == 'postgresql':
+        local = data + fuso
+        return (
+            cast(local, Date),
+            cast(func.date_trunc('week', local), Date),
+            cast(extract('hour', local), Integer)
+        )
+    raise ValueError(f'Banco não suportado para agregados de presenças: {dialeto}')
+
+
+def reconstruir_frequencias(
+    inicio: Optional[date] = None,
+    fim: Optional[date] = None
+) -> Dict[str, int]:
+    """
+    Refaz os agregados de um intervalo a partir de ``presencas``.
+
+    O intervalo é ampliado para semanas inteiras (segunda a domingo),
+    para que as visitas semanais não fiquem parciais. Sem intervalo,
+    todos os agregados são refeitos.
+
+    Args:
+        inicio: Primeiro dia local, inclusivo; None para não limitar
+        fim: Último dia local, inclusivo; None para não limitar
+
+    Returns:
+        Dict[str, int]: Linhas gravadas em cada tabela agregada
+    """
+    fuso = _fuso()
+    dia, semana, hora = _periodos(db.engine.dialect.name, fuso)
+    entradas = func.sum(case((Presenca.tipo == 'entrada', 1), else_=0))
+    saidas = func.sum(case((Presenca.tipo == 'saida', 1), else_=0))
+
+    filtro = []
+    if inicio is not None:
+        inicio = inicio_da_semana(inicio)
+        filtro.append(Presenca.data >= datetime.combine(inicio, time()) - fuso)
+    if fim is not None:
+        fim = inicio_da_semana(fim) + timedelta(days=6)
+        filtro.append(Presenca.data < datetime.combine(fim + timedelta(days=1), time()) - fuso)
+
+    def no_intervalo(coluna):
+        condicoes = []
+        if inicio is not None:
+            condicoes.append(coluna >= inicio)
+        if fim is not None:
+            condicoes.append(coluna <= fim)
+        return and_(*condicoes) if condicoes else true()
+
+    if db.engine.dialect.name == 'postgresql':
+        # Bloqueia novas presenças até o commit, para não perder nem contar duas vezes
+        db.session.execute(text('LOCK TABLE presencas IN SHARE MODE'))
+
+    agregados = [
+        (FrequenciaTurmaDia, FrequenciaTurmaDia.dia, select(
+            Presenca.turma_id, dia, entradas, saidas
+        ).where(*filtro).group_by(Presenca.turma_id, dia)),
+        (OcupacaoHora, OcupacaoHora.dia, select(
+            Presenca.turma_id, dia, hora, entradas, saidas
+        ).where(*filtro).group_by(Presenca.turma_id, dia, hora)),
+        (FrequenciaAlunoSemana, FrequenciaAlunoSemana.semana, select(
+            Presenca.aluno_id, semana, func.count()
+        ).where(Presenca.tipo == 'entrada', *filtro).group_by(Presenca.aluno_id, semana)),
+    ]
+
+    linhas = {}
+    for modelo, periodo, consulta in agregados:
+        tabela = modelo.__table__
+        db.session.execute(delete(tabela).where(no_intervalo(periodo)))
+        colunas = [coluna.name for coluna in tabela.columns]
+        resultado = db.session.execute(insert(tabela).from_select(colunas, consulta))
+        linhas[tabela.name] = resultado.rowcount
+
+    db.session.commit()
+    return linhas
+
+
+def relatorio_frequencia(
+    inicio: date,
+    fim: date,
+    turma_id: Optional[int] = None,
+    aluno_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Monta o relatório de frequência e ocupação de um intervalo.
+
+    Args:
+        inicio: Primeiro dia, inclusivo
+        fim: Último dia, inclusivo
+        turma_id: Se informado, considera só a turma
+        aluno_id: Se informado, traz as visitas semanais do aluno em vez
+            do resumo de todos os alunos
+
+    Returns:
+        Dict[str, Any]: 'por_dia' (entradas e saídas por turma e dia),
+        'ocupacao' (por dia e hora, somando as turmas, com a ocupação
+        acumulada no dia) e 'semanas' (visitas por semana)
+    """
+    por_dia = FrequenciaTurmaDia.query.filter(FrequenciaTurmaDia.dia.between(inicio, fim))
+    ocupacao = db.session.query(
+        OcupacaoHora.dia,
+        OcupacaoHora.hora,
+        func.sum(OcupacaoHora.entradas),
+        func.sum(OcupacaoHora.saidas)
+    ).filter(OcupacaoHora.dia.between(inicio, fim))
+    if turma_id is not None:
+        por_dia = por_dia.filter(FrequenciaTurmaDia.turma_id == turma_id)
+        ocupacao = ocupacao.filter(OcupacaoHora.turma_id == turma_id)
+
+    horas = []
+    acumulado: Dict[date, int] = {}
+    for dia, hora, entradas_hora, saidas_hora in ocupacao.group_by(
+        OcupacaoHora.dia, OcupacaoHora.hora
+    ).order_by(OcupacaoHora.dia, OcupacaoHora.hora):
+        acumulado[dia] = max(0, acumulado.get(dia, 0) + entradas_hora - saidas_hora)
+        horas.append({
+            'dia': dia.isoformat(),
+            'hora': hora,
+            'entradas': entradas_hora,
+            'saidas': saidas_hora,
+            'ocupacao': acumulado[dia]
+        })
+
+    semanas = FrequenciaAlunoSemana.semana.between(inicio_da_semana(inicio), fim)
+    if aluno_id is not None:
+        visitas = [
+            linha.to_dict()
+            for linha in FrequenciaAlunoSemana.query.filter(
+                semanas, FrequenciaAlunoSemana.aluno_id == aluno_id
+            ).order_by(FrequenciaAlunoSemana.semana)
+        ]
+    else:
+        visitas = [
+            {
+                'semana': semana.isoformat(),
+                'alunos': alunos,
+                'visitas': total,
+                'media_por_aluno': round(total / alunos, 2)
+            }
+            for semana, alunos, total in db.session.query(
+                FrequenciaAlunoSemana.semana,
+                func.count(),
+                func.sum(FrequenciaAlunoSemana.visitas)
+            ).filter(semanas).group_by(
+                FrequenciaAlunoSemana.semana
+            ).order_by(FrequenciaAlunoSemana.semana)
+        ]
+
+    return {
+        'inicio': inicio.isoformat(),
+        'fim': fim.isoformat(),
+        'por_dia': [
+            linha.to_dict()
+            for linha in por_dia.order_by(FrequenciaTurmaDia.dia, FrequenciaTurmaDia.turma_id)
+        ],
+        'ocupacao': horas,
+        'semanas': visitas
+    }
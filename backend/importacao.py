@@ -0,0 +1,226 @@
+"""Importação em lote de alunos a partir de CSV.
+
+O arquivo é lido linha a linha: cada linha é validada, comparada com os
+emails e CPFs já cadastrados (carregados em memória com uma consulta) e
+acumulada em lotes inseridos com um único comando por lote.
+"""
+
+import csv
+import itertools
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Set, TextIO
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from . import db
+from .models import Aluno, Plano
+from .utils import validar_cpf, validar_email, formatar_cpf
+
+
+CAMPOS_OBRIGATORIOS = ('nome', 'email', 'cpf', 'data_nascimento')
+
+OBJETIVOS = {
+    valor.lower(): valor
+    for valor in Aluno.__table__.c.objetivo.type.enums
+}
+
+STATUS = set(Aluno.__table__.c.status.type.enums)
+
+
+def _somente_digitos(valor: str) -> str:
+    """Remove tudo que não for dígito."""
+    return ''.join(c for c in valor if c.isdigit())
+
+
+def _converter_data(valor: str):
+    """Converte datas nos formatos YYYY-MM-DD ou DD/MM/YYYY."""
+    for formato in ('%Y-%m-%d', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(valor, formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f'Data de nascimento inválida: {valor}')
+
+
+def _converter_decimal(valor: str, campo: str) -> Optional[float]:
+    """Converte números aceitando vírgula decimal; vazio vira None."""
+    if not valor:
+        return None
+    try:
+        return float(valor.replace(',', '.'))
+    except ValueError:
+        raise ValueError(f'{campo.capitalize()} inválido: {valor}')
+
+
+def validar_linha(
+    linha: Dict[str, Optional[str]],
+    emails: Set[str],
+    cpfs: Set[str],
+    planos: Set[int]
+) -> Dict[str, Any]:
+    """
+    Valida e normaliza uma linha do CSV.
+
+    Args:
+        linha: Linha lida pelo csv.DictReader
+        emails: Emails já cadastrados (em minúsculas)
+        cpfs: CPFs já cadastrados (somente dígitos)
+        planos: Ids de planos existentes
+
+    Returns:
+        Dict[str, Any]: Valores das colunas de alunos
+
+    Raises:
+        ValueError: Com a descrição do primeiro problema encontrado
+    """
+    dados = {
+        campo.strip().lower(): (valor or '').strip()
+        for campo, valor in linha.items()
+        if campo
+    }
+
+    for campo in CAMPOS_OBRIGATORIOS:
+        if not dados.get(campo):
+            raise ValueError(f'Campo {campo} é obrigatório')
+
+    email = dados['email'].lower()
+    if not validar_email(email):
+        raise ValueError(f'Email inválido: {dados["email"]}')
+    if email in emails:
+        raise ValueError(f'Email já cadastrado: {email}')
+
+    cpf = _somente_digitos(dados['cpf'])
+    if not validar_cpf(cpf):
+        raise ValueError(f'CPF inválido: {dados["cpf"]}')
+    if cpf in cpfs:
+        raise ValueError(f'CPF já cadastrado: {formatar_cpf(cpf)}')
+
+    objetivo = None
+    if dados.get('objetivo'):
+        objetivo = OBJETIVOS.get(dados['objetivo'].lower())
+        if not objetivo:
+            raise ValueError(f'Objetivo inválido: {dados["objetivo"]}')
+
+    plano_id = None
+    if dados.get('plano_id'):
+        try:
+            plano_id = int(dados['plano_id'])
+        except ValueError:
+            plano_id = None
+        if plano_id not in planos:
+            raise ValueError(f'Plano não encontrado: {dados["plano_id"]}')
+
+    status = dados.get('status') or 'ativo'
+    if status not in STATUS:
+        raise ValueError(f'Status inválido: {status}')
+
+    return {
+        'nome': dados['nome'],
+        'email': email,
+        'cpf': formatar_cpf(cpf),
+        'telefone': dados.get('telefone') or None,
+        'data_nascimento': _converter_data(dados['data_nascimento']),
+        'endereco': dados.get('endereco') or None,
+        'altura': _converter_decimal(dados.get('altura'), 'altura'),
+        'peso': _converter_decimal(dados.get('peso'), 'peso'),
+        'objetivo': objetivo,
+        'observacoes': dados.get('observacoes') or None,
+        'plano_id': plano_id,
+        'status': status
+    }
+
+
+def _inserir_lote(lote: List[Dict[str, Any]], erros: List[Dict[str, Any]]) -> int:
+    """
+    Insere um lote de alunos com um único comando (executemany).
+
+    Se o lote violar alguma restrição (por exemplo, um cadastro feito em
+    paralelo), as linhas são reinseridas uma a uma para identificar as
+    que falharam.
+
+    Args:
+        lote: Pares (número da linha, valores) a inserir
+        erros: Lista onde os erros por linha são acrescentados
+
+    Returns:
+        int: Quantidade de alunos inseridos
+    """
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(Aluno), [valores for _, valores in lote])
+        return len(lote)
+    except IntegrityError:
+        pass
+
+    inseridos = 0
+    for numero, valores in lote:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(Aluno), [valores])
+            inseridos += 1
+        except IntegrityError:
+            erros.append({'linha': numero, 'erro': 'Email ou CPF já cadastrado'})
+    return inseridos
+
+
+def importar_alunos_csv(arquivo: TextIO, tamanho_lote: int = 2000) -> Dict[str, Any]:
+    """
+    Importa alunos de um arquivo CSV lido como fluxo de texto.
+
+    A primeira linha deve conter o cabeçalho com os nomes dos campos
+    (nome, email, cpf, data_nascimento, telefone, endereco, altura, peso,
+    objetivo, observacoes, plano_id, status). Aceita vírgula ou ponto e
+    vírgula como separador. Cada lote é confirmado ao ser inserido.
+
+    Args:
+        arquivo: Arquivo CSV aberto em modo texto
+        tamanho_lote: Quantidade de alunos por comando de inserção
+
+    Returns:
+        Dict[str, Any]: Totais de linhas processadas e inseridas e a
+        lista de erros por linha
+    """
+    cabecalho = arquivo.readline()
+    separador = ';' if cabecalho.count(';') > cabecalho.count(',') else ','
+    leitor = csv.DictReader(
+        itertools.chain([cabecalho], arquivo),
+        delimiter=separador
+    )
+
+    emails: Set[str] = set()
+    cpfs: Set[str] = set()
+    for email, cpf in db.session.query(Aluno.email, Aluno.cpf):
+        emails.add(email.lower())
+        cpfs.add(_somente_digitos(cpf))
+    planos = {plano_id for plano_id, in db.session.query(Plano.id)}
+
+    processados = 0
+    inseridos = 0
+    erros: List[Dict[str, Any]] = []
+    lote: List[Any] = []
+    # A linha 1 é o cabeçalho
+    for numero, linha in enumerate(leitor, start=2):
+        processados += 1
+        try:
+            valores = validar_linha(linha, emails, cpfs, planos)
+        except ValueError as e:
+            erros.append({'linha': numero, 'erro': str(e)})
+            continue
+
+        emails.add(valores['email'])
+        cpfs.add(_somente_digitos(valores['cpf']))
+        lote.append((numero, valores))
+        if len(lote) >= tamanho_lote:
+            inseridos += _inserir_lote(lote, erros)
+            db.session.commit()
+            lote = []
+
+    if lote:
+        inseridos += _inserir_lote(lote, erros)
+        db.session.commit()
+
+    erros.sort(key=lambda erro: erro['linha'])
+    return {
+        'processados': processados,
+        'inseridos': inseridos,
+        'erros': erros
+    }
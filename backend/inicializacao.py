@@ -0,0 +1,54 @@
+"""Inicialização dos serviços de cada processo da aplicação.
+
+Filas, índices em memória e threads em segundo plano pertencem a um
+processo. Eles não são iniciados em ``create_app``, e sim na primeira
+requisição de cada processo:
+
+- comandos como ``flask db upgrade`` criam a aplicação sem consultar o
+  banco nem mexer nas filas, e funcionam em bancos desatualizados;
+- com ``gunicorn --preload`` a aplicação é criada antes do fork, e
+  threads iniciadas nesse momento não existiriam nos workers.
+
+Uma tarefa que falha é registrada no log e não impede as demais nem o
+atendimento da requisição.
+"""
+
+import os
+import threading
+from typing import Callable, List, Optional, Tuple
+from flask import Flask
+from . import db
+
+
+class TarefasDoProcesso:
+    """Tarefas de inicialização executadas uma vez em cada processo."""
+
+    def __init__(self):
+        self._tarefas: List[Tuple[str, Callable[[], object]]] = []
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def adicionar(self, nome: str, tarefa: Callable[[], object]) -> None:
+        """
+        Registra uma tarefa.
+
+        Args:
+            nome: Descrição usada no log em caso de falha
+            tarefa: Função sem argumentos, chamada no contexto da aplicação
+        """
+        self._tarefas.append((nome, tarefa))
+
+    def executar(self, app: Flask) -> None:
+        """Executa as tarefas se ainda não rodaram neste processo."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            for nome, tarefa in self._tarefas:
+                try:
+                    tarefa()
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception('Erro ao iniciar %s', nome)
+            self._pid = os.getpid()
@@ -0,0 +1,170 @@
+"""Métricas agregadas do sistema GymFlow.
+
+Concentra as contagens usadas pelo dashboard e pelo resumo de pagamentos
+em poucas consultas agrupadas, evitando um ``count()`` por indicador.
+"""
+
+from datetime import date, datetime
+from typing import Dict, List, Optional, Any
+from sqlalchemy import func, case
+from . import db
+from .models import Aluno, Pagamento
+
+
+def meses_anteriores(hoje: date, quantidade: int) -> List[date]:
+    """
+    Retorna o primeiro dia dos últimos meses, do mais antigo ao atual.
+
+    Args:
+        hoje: Data de referência
+        quantidade: Quantidade de meses (incluindo o atual)
+
+    Returns:
+        List[date]: Primeiro dia de cada mês em ordem cronológica
+    """
+    meses = []
+    for i in range(quantidade - 1, -1, -1):
+        ano, mes = divmod(hoje.year * 12 + hoje.month - 1 - i, 12)
+        meses.append(date(ano, mes + 1, 1))
+    return meses
+
+
+def contar_pagamentos_por_mes(
+    mes_inicio: Optional[str] = None,
+    mes_fim: Optional[str] = None
+) -> Dict[str, Dict[str, int]]:
+    """
+    Conta pagamentos agrupados por mês de referência e status.
+
+    Executa uma única consulta (GROUP BY mes_referencia, status) sobre o
+    intervalo informado.
+
+    Args:
+        mes_inicio: Primeiro mês (YYYY-MM), inclusivo; None para não limitar
+        mes_fim: Último mês (YYYY-MM), inclusivo; None para não limitar
+
+    Returns:
+        Dict[str, Dict[str, int]]: Contagens no formato {mes: {status: total}}
+    """
+    query = db.session.query(
+        Pagamento.mes_referencia,
+        Pagamento.status,
+        func.count(Pagamento.id)
+    )
+    if mes_inicio:
+        query = query.filter(Pagamento.mes_referencia >= mes_inicio)
+    if mes_fim:
+        query = query.filter(Pagamento.mes_referencia <= mes_fim)
+
+    contagens: Dict[str, Dict[str, int]] = {}
+    for mes, status, total in query.group_by(
+        Pagamento.mes_referencia,
+        Pagamento.status
+    ):
+        contagens.setdefault(mes, {})[status] = total
+    return contagens
+
+
+def contar_alunos(hoje: date) -> Dict[str, int]:
+    """
+    Conta alunos ativos e novos no mês em uma única consulta.
+
+    Args:
+        hoje: Data de referência
+
+    Returns:
+        Dict[str, int]: Totais de alunos ativos e de alunos novos no mês
+    """
+    inicio_mes = hoje.replace(day=1)
+    total, novos = db.session.query(
+        func.count(Aluno.id),
+        func.sum(case(
+            (
+                (Aluno.data_matricula >= inicio_mes) &
+                (Aluno.data_matricula <= hoje),
+                1
+            ),
+            else_=0
+        ))
+    ).filter(Aluno.status == 'ativo').one()
+
+    return {
+        'total_alunos': total or 0,
+        'alunos_novos': novos or 0
+    }
+
+
+def obter_metricas_dashboard(
+    hoje: Optional[date] = None,
+    quantidade_meses: int = 6
+) -> Dict[str, Any]:
+    """
+    Reúne as métricas exibidas no dashboard.
+
+    Usa duas consultas: uma para os alunos e outra, agrupada, para os
+    pagamentos de todo o intervalo do gráfico.
+
+    Args:
+        hoje: Data de referência (padrão: data atual)
+        quantidade_meses: Quantidade de meses exibidos no gráfico de receita
+
+    Returns:
+        Dict[str, Any]: Métricas no formato esperado por dashboard.html
+    """
+    hoje = hoje or datetime.now().date()
+    meses = meses_anteriores(hoje, quantidade_meses)
+    mes_atual = hoje.strftime('%Y-%m')
+
+    pagamentos = contar_pagamentos_por_mes(
+        meses[0].strftime('%Y-%m'),
+        mes_atual
+    )
+    atual = pagamentos.get(mes_atual, {})
+
+    metricas = contar_alunos(hoje)
+    metricas.update({
+        'pagamentos_mes': atual.get('pago', 0),
+        'pagamentos_pendentes': atual.get('pendente', 0),
+        'labels_meses': [mes.strftime('%b/%Y') for mes in meses],
+        'dados_pagamentos': [
+            pagamentos.get(mes.strftime('%Y-%m'), {}).get('pago', 0)
+            for mes in meses
+        ]
+    })
+    return metricas
+
+
+def calcular_resumo_pagamentos(hoje: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Calcula o resumo de pagamentos do mês atual.
+
+    Args:
+        hoje: Data de referência (padrão: data atual)
+
+    Returns:
+        Dict[str, Any]: Totais pagos, pendentes, atrasados e inadimplência
+    """
+    hoje = hoje or datetime.now().date()
+    mes_atual = hoje.strftime('%Y-%m')
+
+    pagamentos = contar_pagamentos_por_mes(mes_fim=mes_atual)
+    atual = pagamentos.get(mes_atual, {})
+
+    total_pagos = atual.get('pago', 0)
+    total_pendentes = atual.get('pendente', 0)
+    total_atrasados = sum(
+        contagem.get('pendente', 0)
+        for mes, contagem in pagamentos.items()
+        if mes < mes_atual
+    )
+
+    total_pagamentos = total_pagos + total_pendentes
+    taxa_inadimplencia = (total_pendentes / total_pagamentos * 100) if total_pagamentos > 0 else 0
+
+    return {
+        'total_pagos': total_pagos,
+        'total_pendentes': total_pendentes,
+        'total_atrasados': total_atrasados,
+        'taxa_inadimplencia': float(taxa_inadimplencia)
+    }
+
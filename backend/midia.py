@@ -0,0 +1,110 @@
+"""Entrega das fotos enviadas em ``/media/<caminho>``.
+
+Fotos endereçadas pelo conteúdo (``alunos/ab/cd/<sha256>.jpg`` e suas
+variantes) nunca mudam de conteúdo: o ETag forte é o próprio nome do
+arquivo e a resposta pode ficar no cache do navegador por um ano
+(``immutable``). Um If-None-Match com esse ETag é respondido com 304
+sem tocar no disco.
+
+Fotos com nomes antigos (anteriores ao endereçamento por conteúdo) são
+entregues com o ETag do ``send_file`` e revalidadas a cada uso.
+
+A leitura do arquivo pode ser delegada ao servidor web: com
+USE_X_SENDFILE o ``send_file`` responde com X-Sendfile, e com
+MEDIA_ACCEL_REDIRECT a resposta leva X-Accel-Redirect apontando para
+o prefixo interno configurado no nginx. Requisições Range são atendidas
+pelo ``send_file`` (ou pelo servidor web, quando delegadas).
+"""
+
+import mimetypes
+import os
+import re
+from typing import Optional
+from flask import Response, abort, current_app, request, send_file
+from werkzeug.security import safe_join
+from .fotos import caminho_variante
+
+
+# Um ano, o máximo recomendado para respostas imutáveis
+MAX_AGE_IMUTAVEL = 365 * 24 * 3600
+
+_ENDERECADA = re.compile(
+    r'^[\w-]+/([0-9a-f]{2})/([0-9a-f]{2})/(\1\2[0-9a-f]{60}(?:_thumb|_original)?)'
+    r'\.(?:jpg|png|gif)$'
+)
+
+
+def etag_enderecada(caminho: str) -> Optional[str]:
+    """
+    Retorna o ETag de uma foto endereçada pelo conteúdo.
+
+    Args:
+        caminho: Caminho relativo da foto
+
+    Returns:
+        Optional[str]: Hash e sufixo da variante, ou None se o caminho
+        não for endereçado pelo conteúdo
+    """
+    encontrado = _ENDERECADA.match(caminho)
+    return encontrado.group(3) if encontrado else None
+
+
+def _cache_imutavel(response: Response, etag: str) -> Response:
+    """Aplica ETag e cache de longa duração."""
+    response.set_etag(etag)
+    response.cache_control.no_cache = None
+    response.cache_control.public = None
+    response.cache_control.private = True
+    response.cache_control.max_age = MAX_AGE_IMUTAVEL
+    response.cache_control.immutable = True
+    response.expires = None
+    return response
+
+
+def responder_midia(caminho: str, tamanho: Optional[str] = None) -> Response:
+    """
+    Cria a resposta com o arquivo de uma foto.
+
+    Args:
+        caminho: Caminho relativo da foto em UPLOAD_FOLDER
+        tamanho: 'media' ou 'thumb' para entregar a variante da foto
+
+    Returns:
+        Response: Arquivo, 304 ou resposta vazia para o servidor web
+
+    Raises:
+        NotFound: Se o caminho for inválido ou o arquivo não existir
+            (inclusive fotos ainda em processamento)
+    """
+    if tamanho:
+        try:
+            caminho = caminho_variante(caminho, tamanho)
+        except ValueError:
+            abort(404)
+    if any(parte.startswith('.') for parte in caminho.split('/')):
+        abort(404)
+
+    etag = etag_enderecada(caminho)
+    if etag and request.if_none_match.contains(etag):
+        return _cache_imutavel(Response(status=304), etag)
+
+    arquivo = safe_join(current_app.config['UPLOAD_FOLDER'], caminho)
+    if arquivo is None or not os.path.isfile(arquivo):
+        abort(404)
+
+    prefixo = current_app.config.get('MEDIA_ACCEL_REDIRECT')
+    if prefixo:
+        response = Response(mimetype=mimetypes.guess_type(arquivo)[0])
+        response.headers['X-Accel-Redirect'] = f"{prefixo.rstrip('/')}/{caminho}"
+    else:
+        response = send_file(
+            os.path.abspath(arquivo),
+            conditional=True,
+            etag=etag or True
+        )
+
+    if etag:
+        return _cache_imutavel(response, etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
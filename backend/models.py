@@ -1,13 +1,44 @@
 """Modelos do sistema GymFlow."""
 
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import joinedload, selectinload, validates
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from functools import lru_cache
 import jwt
 from . import db
-from typing import Dict, Any
+from .formatacao import normalizar_texto
+from typing import Dict, Any, Tuple
+from flask import current_app, has_app_context
 from flask_login import UserMixin
 
+
+METODO_HASH_PADRAO = 'scrypt:32768:8:1'
+TAMANHO_SALT_PADRAO = 16
+
+
+def _parametros_hash() -> Tuple[str, int]:
+    """Retorna o método de hash e o tamanho do salt configurados."""
+    if not has_app_context():
+        return METODO_HASH_PADRAO, TAMANHO_SALT_PADRAO
+    return (
+        current_app.config.get('PASSWORD_HASH_METHOD', METODO_HASH_PADRAO),
+        current_app.config.get('PASSWORD_SALT_LENGTH', TAMANHO_SALT_PADRAO)
+    )
+
+
+@lru_cache(maxsize=None)
+def _prefixo_hash(metodo: str) -> str:
+    """
+    Retorna o prefixo que o werkzeug grava para o método informado.
+
+    O werkzeug completa os parâmetros omitidos (por exemplo, 'pbkdf2'
+    vira 'pbkdf2:sha256:600000'), então o prefixo é obtido gerando um
+    hash uma única vez por método.
+    """
+    return generate_password_hash('', method=metodo, salt_length=1).split('$', 1)[0]
+
+
 class Usuario(db.Model, UserMixin):
     """Modelo para usuários do sistema."""
     __tablename__ = 'usuarios'
@@ -15,7 +46,7 @@ class Usuario(db.Model, UserMixin):
     id: int = db.Column(db.Integer, primary_key=True)
     nome: str = db.Column(db.String(100), nullable=False)
     email: str = db.Column(db.String(120), unique=True, nullable=False)
-    _senha_hash: str = db.Column(db.String(128), nullable=False)
+    _senha_hash: str = db.Column(db.String(255), nullable=False)
     tipo: str = db.Column(
         db.Enum('gerente', 'professor', 'recepcionista', name='tipo_usuario'),
         nullable=False
@@ -26,6 +57,13 @@ class Usuario(db.Model, UserMixin):
         nullable=False
     )
     foto_url: str = db.Column(db.String(200))
+    # Incrementada quando tipo, status, email ou senha mudam; invalida tokens antigos
+    versao_token: int = db.Column(
+        db.Integer,
+        default=0,
+        server_default='0',
+        nullable=False
+    )
     data_criacao: datetime = db.Column(
         db.DateTime,
         default=datetime.utcnow,
@@ -48,18 +86,44 @@ class Usuario(db.Model, UserMixin):
     
     @senha.setter
     def senha(self, senha: str) -> None:
-        """Define a senha do usuário."""
-        self._senha_hash = generate_password_hash(senha)
+        """Define a senha do usuário com o método de hash configurado."""
+        metodo, tamanho_salt = _parametros_hash()
+        self._senha_hash = generate_password_hash(
+            senha,
+            method=metodo,
+            salt_length=tamanho_salt
+        )
     
     def verificar_senha(self, senha: str) -> bool:
         """Verifica se a senha está correta."""
         return check_password_hash(self._senha_hash, senha)
     
+    def precisa_rehash(self) -> bool:
+        """Indica se o hash gravado usa parâmetros diferentes dos configurados."""
+        metodo, tamanho_salt = _parametros_hash()
+        prefixo, _, resto = self._senha_hash.partition('$')
+        salt = resto.partition('$')[0]
+        return prefixo != _prefixo_hash(metodo) or len(salt) != tamanho_salt
+    
+    def revogar_tokens(self) -> None:
+        """Invalida os tokens já emitidos para o usuário."""
+        self.versao_token = (self.versao_token or 0) + 1
+    
     def gerar_token(self) -> str:
-        """Gera um token JWT para o usuário."""
+        """Gera um token JWT com os dados necessários para autenticar sem consultar o banco."""
+        agora = datetime.utcnow()
         return jwt.encode(
-            {'user_id': self.id, 'email': self.email},
-            Config.SECRET_KEY,
+            {
+                'user_id': self.id,
+                'email': self.email,
+                'nome': self.nome,
+                'tipo': self.tipo,
+                'status': self.status,
+                'versao': self.versao_token or 0,
+                'iat': agora,
+                'exp': agora + current_app.config['JWT_ACCESS_TOKEN_EXPIRES']
+            },
+            current_app.config['SECRET_KEY'],
             algorithm='HS256'
         )
     
@@ -145,12 +209,30 @@ class Professor(db.Model):
         }
 
 
+def _nome_normalizado_padrao(contexto) -> str:
+    """Preenche nome_normalizado em inserções que não passam pelo ORM."""
+    return normalizar_texto(contexto.get_current_parameters().get('nome') or '')
+
+
 class Aluno(db.Model):
     """Modelo para alunos da academia."""
     __tablename__ = 'alunos'
+    __table_args__ = (
+        db.Index('ix_alunos_status_data_matricula', 'status', 'data_matricula'),
+        db.Index('ix_alunos_data_matricula', 'data_matricula'),
+        db.Index('ix_alunos_nome_normalizado', 'nome_normalizado'),
+        db.Index('ix_alunos_plano_id', 'plano_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String(100), nullable=False)
+    # Nome sem acentos e em minúsculas, para busca por prefixo e ordenação
+    nome_normalizado = db.Column(
+        db.String(100),
+        default=_nome_normalizado_padrao,
+        server_default='',
+        nullable=False
+    )
     email = db.Column(db.String(120), unique=True, nullable=False)
     cpf = db.Column(db.String(14), unique=True, nullable=False)
     telefone = db.Column(db.String(20))
@@ -200,6 +282,12 @@ class Aluno(db.Model):
         lazy=True
     )
     
+    @validates('nome')
+    def _atualizar_nome_normalizado(self, chave: str, nome: str) -> str:
+        """Mantém nome_normalizado em sincronia com o nome."""
+        self.nome_normalizado = normalizar_texto(nome or '')
+        return nome
+    
     def to_dict(self) -> Dict[str, Any]:
         """Converte o objeto para dicionário."""
         return {
@@ -340,6 +428,22 @@ class Treino(db.Model):
     # Relacionamentos
     treinos_exercicios = db.relationship('TreinoExercicio', backref='treino', lazy=True)
     
+    @classmethod
+    def consulta_listagem(cls):
+        """
+        Retorna uma query que já carrega tudo o que to_dict utiliza.
+        
+        Aluno e professor (com o usuário) vêm no mesmo SELECT via JOIN;
+        os exercícios de todos os treinos vêm em um único SELECT extra.
+        """
+        return cls.query.options(
+            joinedload(cls.aluno),
+            joinedload(cls.professor).joinedload(Professor.usuario),
+            selectinload(cls.treinos_exercicios).joinedload(
+                TreinoExercicio.exercicio
+            )
+        )
+    
     def to_dict(self) -> Dict[str, Any]:
         """Converte o objeto para dicionário."""
         return {
@@ -477,6 +581,10 @@ class Turma(db.Model):
 class MatriculaTurma(db.Model):
     """Modelo para matrículas em turmas."""
     __tablename__ = 'matriculas_turmas'
+    __table_args__ = (
+        db.Index('ix_matriculas_turmas_turma_aluno', 'turma_id', 'aluno_id'),
+        db.Index('ix_matriculas_turmas_aluno', 'aluno_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     aluno_id = db.Column(
@@ -521,6 +629,16 @@ class MatriculaTurma(db.Model):
 class Pagamento(db.Model):
     """Modelo para pagamentos dos alunos."""
     __tablename__ = 'pagamentos'
+    __table_args__ = (
+        # Um pagamento por aluno e mês; também atende filtros por aluno
+        db.Index(
+            'uq_pagamentos_aluno_mes',
+            'aluno_id',
+            'mes_referencia',
+            unique=True
+        ),
+        db.Index('ix_pagamentos_mes_status', 'mes_referencia', 'status'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     aluno_id = db.Column(
@@ -571,6 +689,11 @@ class Pagamento(db.Model):
 class Presenca(db.Model):
     """Modelo para presenças dos alunos nas turmas."""
     __tablename__ = 'presencas'
+    __table_args__ = (
+        db.Index('ix_presencas_turma_data', 'turma_id', 'data'),
+        db.Index('ix_presencas_aluno_data', 'aluno_id', 'data'),
+        db.Index('ix_presencas_data', 'data'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     aluno_id = db.Column(
@@ -600,6 +723,56 @@ class Presenca(db.Model):
         }
 
 
+class FrequenciaTurmaDia(db.Model):
+    """Entradas e saídas de cada turma por dia (agregado de presencas)."""
+    __tablename__ = 'frequencia_turma_dia'
+    
+    turma_id = db.Column(db.Integer, db.ForeignKey('turmas.id'), primary_key=True)
+    dia = db.Column(db.Date, primary_key=True)
+    entradas = db.Column(db.Integer, default=0, nullable=False)
+    saidas = db.Column(db.Integer, default=0, nullable=False)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Converte o objeto para dicionário."""
+        return {
+            'turma_id': self.turma_id,
+            'dia': self.dia.isoformat(),
+            'entradas': self.entradas,
+            'saidas': self.saidas
+        }
+
+
+class FrequenciaAlunoSemana(db.Model):
+    """Visitas (entradas) de cada aluno por semana, a partir da segunda-feira."""
+    __tablename__ = 'frequencia_aluno_semana'
+    
+    aluno_id = db.Column(db.Integer, db.ForeignKey('alunos.id'), primary_key=True)
+    semana = db.Column(db.Date, primary_key=True)
+    visitas = db.Column(db.Integer, default=0, nullable=False)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Converte o objeto para dicionário."""
+        return {
+            'aluno_id': self.aluno_id,
+            'semana': self.semana.isoformat(),
+            'visitas': self.visitas
+        }
+
+
+class OcupacaoHora(db.Model):
+    """Entradas e saídas de cada turma por hora do dia."""
+    __tablename__ = 'ocupacao_hora'
+    __table_args__ = (
+        db.Index('ix_ocupacao_hora_dia', 'dia', 'hora'),
+    )
+    
+    turma_id = db.Column(db.Integer, db.ForeignKey('turmas.id'), primary_key=True)
+    dia = db.Column(db.Date, primary_key=True)
+    hora = db.Column(db.Integer, primary_key=True)  # 0 a 23
+    entradas = db.Column(db.Integer, default=0, nullable=False)
+    saidas = db.Column(db.Integer, default=0, nullable=False)
+
+
 def init_db():
     """Inicializa o banco de dados."""
     db.create_all()
@@ -630,4 +803,18 @@ def init_db():
             print('Banco de dados inicializado com sucesso!')
     except Exception as e:
         db.session.rollback()
-        print(f'Erro ao inicializar banco de dados: {e}') 
\ No newline at end of file
+        print(f'Erro ao inicializar banco de dados: {e}')
+
+
+def criar_gerente_padrao():
+    """Cria o usuário gerente padrão (admin@gymflow.com) se não existir."""
+    if not Usuario.query.filter_by(email='admin@gymflow.com').first():
+        gerente = Usuario(
+            nome='Administrador',
+            email='admin@gymflow.com',
+            tipo='gerente',
+            status='ativo'
+        )
+        gerente.senha = 'admin123'  # Será hasheada automaticamente
+        db.session.add(gerente)
+        db.session.commit()
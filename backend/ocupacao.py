@@ -0,0 +1,203 @@
+"""Ocupação atual da academia e das turmas, em memória.
+
+O contador guarda, para cada par (turma, aluno), o último evento de
+presença do dia. Um aluno está presente na turma se esse evento for uma
+entrada; a academia conta os alunos presentes em pelo menos uma turma.
+Cada evento atualiza os totais em O(1), e eventos mais antigos que o
+último já aplicado para o par são ignorados, então entradas repetidas e
+lotes fora de ordem das leitoras não distorcem a contagem.
+
+O contador é montado na primeira requisição de cada processo com as
+presenças do dia (uma consulta pelo índice de data) e recebe os eventos
+de presença logo depois do commit da gravação em lote (ver
+``presencas``), então só conta o que está no banco. A leitura
+(``situacao``) não consulta o banco.
+
+O dia segue o horário local (OCUPACAO_FUSO_HORAS em relação ao UTC em
+que as presenças são gravadas); na virada do dia os contadores zeram.
+Como cada processo conta os eventos que recebeu, com vários processos
+o contador é remontado do banco a cada OCUPACAO_RESYNC segundos por uma
+thread em segundo plano, e os eventos aplicados nos últimos minutos
+(que podem ter sido gravados depois da consulta) são reaplicados sobre o
+resultado. A versão, usada no ETag, só muda quando a contagem muda.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter, deque
+from datetime import date, datetime, timedelta
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
+from flask import Flask, current_app
+from sqlalchemy import select
+from . import db
+from .models import Presenca
+
+logger = logging.getLogger(__name__)
+
+# Eventos locais reaplicados após remontar do banco (cobrem gravações
+# concluídas durante a consulta)
+JANELA_EVENTOS_RECENTES = timedelta(minutes=2)
+
+
+class ContadorOcupacao:
+    """
+    Ocupação atual por turma e da academia, segura entre threads.
+
+    Args:
+        fuso_horas: Diferença do horário local para o UTC (ex.: -3)
+    """
+
+    def __init__(self, fuso_horas: int = -3):
+        self.fuso = timedelta(hours=fuso_horas)
+        self._lock = threading.Lock()
+        self._recentes: Deque[Tuple[float, Dict[str, Any]]] = deque()
+        self._zerar(self.hoje())
+
+    def hoje(self) -> date:
+        """Dia local atual."""
+        return self._dia_local(datetime.utcnow())
+
+    def _dia_local(self, data: datetime) -> date:
+        """Dia local de um horário em UTC."""
+        return (data + self.fuso).date()
+
+    def inicio_do_dia(self, dia: date) -> datetime:
+        """Início do dia local, em UTC."""
+        return datetime.combine(dia, datetime.min.time()) - self.fuso
+
+    def _zerar(self, dia: date) -> None:
+        """Começa um novo dia sem ninguém presente (chamar com o lock)."""
+        self.dia = dia
+        self.versao = 0
+        self._ultimos: Dict[Tuple[int, int], Tuple[datetime, str]] = {}
+        self._por_turma: Counter = Counter()
+        self._turmas_do_aluno: Counter = Counter()
+
+    def _aplicar(self, evento: Dict[str, Any]) -> None:
+        """Aplica um evento em O(1) (chamar com o lock)."""
+        dia = self._dia_local(evento['data'])
+        if dia < self.dia:
+            return
+        if dia > self.dia:
+            self._zerar(dia)
+
+        chave = (evento['turma_id'], evento['aluno_id'])
+        anterior = self._ultimos.get(chave)
+        if anterior is not None and anterior[0] >= evento['data']:
+            return
+        self._ultimos[chave] = (evento['data'], evento['tipo'])
+
+        estava = anterior is not None and anterior[1] == 'entrada'
+        esta = evento['tipo'] == 'entrada'
+        if estava == esta:
+            return
+        turma_id, aluno_id = chave
+        delta = 1 if esta else -1
+        self._por_turma[turma_id] += delta
+        self._turmas_do_aluno[aluno_id] += delta
+        if not self._por_turma[turma_id]:
+            del self._por_turma[turma_id]
+        if not self._turmas_do_aluno[aluno_id]:
+            del self._turmas_do_aluno[aluno_id]
+        self.versao += 1
+
+    def registrar(self, eventos: Iterable[Dict[str, Any]]) -> None:
+        """
+        Aplica eventos de presença recém-gravados.
+
+        Args:
+            eventos: Eventos com aluno_id, turma_id, data (UTC) e tipo
+        """
+        agora = time.monotonic()
+        with self._lock:
+            for evento in eventos:
+                self._aplicar(evento)
+                self._recentes.append((agora, evento))
+            limite = agora - JANELA_EVENTOS_RECENTES.total_seconds()
+            while self._recentes and self._recentes[0][0] < limite:
+                self._recentes.popleft()
+
+    def carregar(self) -> int:
+        """
+        Remonta o contador com as presenças do dia gravadas no banco.
+
+        Os eventos registrados neste processo nos últimos minutos são
+        reaplicados, pois podem ter sido gravados depois da consulta. A
+        versão só muda se a contagem mudou.
+
+        Returns:
+            int: Quantidade de eventos do dia lidos do banco
+        """
+        dia = self.hoje()
+        consulta = select(
+            Presenca.aluno_id, Presenca.turma_id, Presenca.data, Presenca.tipo
+        ).where(Presenca.data >= self.inicio_do_dia(dia))
+        linhas = db.session.execute(consulta).mappings().all()
+
+        with self._lock:
+            anterior = (self.dia, self._por_turma, self._turmas_do_aluno)
+            versao = self.versao
+            self._zerar(dia)
+            for linha in linhas:
+                self._aplicar(linha)
+            for _, evento in self._recentes:
+                self._aplicar(evento)
+            # A versão só cresce, para o ETag dos clientes mudar com a contagem
+            if (self.dia, self._por_turma, self._turmas_do_aluno) == anterior:
+                self.versao = versao
+            else:
+                self.versao = versao + 1
+        return len(linhas)
+
+    def situacao(self) -> Dict[str, Any]:
+        """
+        Retorna a ocupação atual, sem consultar o banco.
+
+        Returns:
+            Dict[str, Any]: 'dia', 'total' (alunos na academia), 'turmas'
+            ({turma_id: alunos presentes}) e 'versao'
+        """
+        with self._lock:
+            hoje = self.hoje()
+            if hoje != self.dia:
+                self._zerar(hoje)
+            return {
+                'dia': self.dia.isoformat(),
+                'total': len(self._turmas_do_aluno),
+                'turmas': {str(turma_id): total for turma_id, total in sorted(self._por_turma.items())},
+                'versao': self.versao
+            }
+
+
+def sincronizar_periodicamente(app: Flask, contador: ContadorOcupacao, intervalo: float) -> threading.Thread:
+    """
+    Inicia uma thread que remonta o contador do banco a cada intervalo.
+
+    Args:
+        app: Aplicação cujo banco é consultado
+        contador: Contador a remontar
+        intervalo: Segundos entre remontagens
+
+    Returns:
+        threading.Thread: A thread iniciada
+    """
+    def executar():
+        while True:
+            time.sleep(intervalo)
+            try:
+                with app.app_context():
+                    contador.carregar()
+            except Exception:
+                logger.exception('Erro ao sincronizar a ocupação')
+
+    thread = threading.Thread(target=executar, name='ocupacao', daemon=True)
+    thread.start()
+    return thread
+
+
+def registrar_ocupacao(eventos: Iterable[Dict[str, Any]]) -> None:
+    """Aplica eventos gravados ao contador de ocupação (chamar após o commit)."""
+    contador: Optional[ContadorOcupacao] = current_app.extensions.get('ocupacao')
+    if contador is not None:
+        contador.registrar(eventos)
@@ -0,0 +1,413 @@
+"""Registro de presenças (entradas e saídas) em lote.
+
+As leitoras de cartão enviam eventos em rajadas nos horários de pico.
+Em vez de um INSERT e um commit por evento, os eventos aceitos são:
+
+1. validados e anexados a um arquivo de log local (write-ahead log),
+   com um único ``fsync`` por requisição, e só então confirmados ao
+   cliente;
+2. acumulados em memória e gravados em ``presencas`` com INSERTs de
+   várias linhas quando o lote atinge PRESENCA_BATCH_SIZE eventos ou a
+   cada PRESENCA_FLUSH_INTERVAL segundos, por uma thread em segundo
+   plano. Na mesma transação, o lote é somado aos agregados de
+   frequência (ver ``frequencia``); depois do commit, é aplicado ao
+   contador de ocupação (ver ``ocupacao``).
+
+Cada processo escreve em seu próprio segmento de log
+(``<pid>-<ns>.wal`` em PRESENCA_WAL_FOLDER), travado (ver ``travas``)
+enquanto está em uso. A cada descarga o segmento atual é trocado por
+um novo e apagado depois do commit. Segmentos que sobram no disco (o
+processo terminou antes da descarga) são regravados na primeira
+requisição de qualquer processo; como o commit pode ter acontecido
+antes da remoção do arquivo, os eventos que já estão no banco são
+ignorados nessa recuperação.
+
+Eventos recusados pelo banco (por exemplo, aluno inexistente) são
+anexados a ``erros.jsonl`` na mesma pasta, para inspeção. Linhas
+ilegíveis de um segmento recuperado vão para ``corrompidos.jsonl``,
+com o nome do segmento, e não impedem a recuperação das demais.
+
+Presenças aceitas aparecem nas consultas e na ocupação depois da
+descarga, com atraso de no máximo PRESENCA_FLUSH_INTERVAL segundos.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, IO, Iterable, List, Optional, Tuple
+from flask import Flask
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.exc import DataError, IntegrityError
+from . import db
+from .frequencia import acumular_frequencias
+from .models import Presenca
+from .ocupacao import registrar_ocupacao
+from .travas import travar
+
+logger = logging.getLogger(__name__)
+
+TIPOS = set(Presenca.__table__.c.tipo.type.enums)
+
+# Mantém cada INSERT abaixo do limite de 999 parâmetros do SQLite (< 3.32)
+LINHAS_POR_COMANDO = 999 // len(Presenca.__table__.columns)
+
+EXTENSAO_SEGMENTO = '.wal'
+ARQUIVO_ERROS = 'erros.jsonl'
+ARQUIVO_CORROMPIDOS = 'corrompidos.jsonl'
+
+# Maior valor de uma coluna INTEGER (64 bits com sinal)
+ID_MAXIMO = 2 ** 63 - 1
+
+# Erros de uma linha específica (valor recusado), e não do banco como um
+# todo: só esses levam as linhas ao arquivo de erros
+_ERROS_DE_LINHA = (IntegrityError, DataError, OverflowError)
+
+
+class EventoInvalido(ValueError):
+    """Um evento de presença tem dados inválidos."""
+
+
+def validar_evento(dados: Any) -> Dict[str, Any]:
+    """
+    Valida e normaliza um evento de presença.
+
+    Args:
+        dados: Evento recebido (aluno_id, turma_id, tipo e, opcionalmente,
+            data em ISO 8601; sem data, vale o horário do recebimento)
+
+    Returns:
+        Dict[str, Any]: Valores das colunas de presencas
+
+    Raises:
+        EventoInvalido: Se faltar algum campo ou houver valor inválido
+    """
+    if not isinstance(dados, dict):
+        raise EventoInvalido('O evento deve ser um objeto')
+    try:
+        aluno_id = int(dados['aluno_id'])
+        turma_id = int(dados['turma_id'])
+    except KeyError as e:
+        raise EventoInvalido(f'Campo obrigatório ausente: {e.args[0]}')
+    except (TypeError, ValueError):
+        raise EventoInvalido('aluno_id e turma_id devem ser inteiros')
+    if aluno_id < 1 or turma_id < 1:
+        raise EventoInvalido('aluno_id e turma_id devem ser positivos')
+    if aluno_id > ID_MAXIMO or turma_id > ID_MAXIMO:
+        raise EventoInvalido('aluno_id e turma_id fora do intervalo permitido')
+
+    tipo = dados.get('tipo')
+    if tipo not in TIPOS:
+        raise EventoInvalido(f'Tipo inválido: {tipo}')
+
+    data = dados.get('data')
+    if data:
+        try:
+            data = datetime.fromisoformat(data)
+        except (TypeError, ValueError):
+            raise EventoInvalido(f'Data inválida: {data}')
+        if data.tzinfo is not None:
+            raise EventoInvalido('A data deve estar em UTC, sem fuso horário')
+    else:
+        data = datetime.utcnow()
+
+    return {'aluno_id': aluno_id, 'turma_id': turma_id, 'data': data, 'tipo': tipo}
+
+
+def _serializar(evento: Dict[str, Any]) -> str:
+    """Linha do log de um evento."""
+    return json.dumps({**evento, 'data': evento['data'].isoformat()}) + '\n'
+
+
+def _desserializar(linha: str) -> Dict[str, Any]:
+    """Evento de uma linha do log."""
+    evento = json.loads(linha)
+    evento['data'] = datetime.fromisoformat(evento['data'])
+    return evento
+
+
+def _ler_segmento(arquivo: IO[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Lê os eventos de um segmento, ignorando uma última linha incompleta.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], List[str]]: Eventos lidos e linhas
+        que não puderam ser lidas
+    """
+    arquivo.seek(0)
+    eventos = []
+    corrompidas = []
+    for linha in arquivo:
+        if not linha.endswith('\n'):
+            break
+        try:
+            evento = _desserializar(linha)
+            if not all(0 < evento[campo] <= ID_MAXIMO for campo in ('aluno_id', 'turma_id')):
+                raise ValueError('id fora do intervalo')
+            _chave(evento)
+        except (KeyError, TypeError, ValueError):
+            corrompidas.append(linha)
+            continue
+        eventos.append(evento)
+    return eventos, corrompidas
+
+
+def _chave(evento: Dict[str, Any]) -> Tuple:
+    """Identifica um evento ao recuperar um segmento."""
+    return (evento['aluno_id'], evento['turma_id'], evento['data'], evento['tipo'])
+
+
+def _ja_gravados(eventos: List[Dict[str, Any]]) -> set:
+    """Chaves dos eventos que já estão no banco."""
+    gravados = set()
+    colunas = (Presenca.aluno_id, Presenca.turma_id, Presenca.data, Presenca.tipo)
+    for inicio in range(0, len(eventos), LINHAS_POR_COMANDO):
+        chaves = [_chave(evento) for evento in eventos[inicio:inicio + LINHAS_POR_COMANDO]]
+        consulta = select(*colunas).where(tuple_(*colunas).in_(chaves))
+        gravados.update(tuple(linha) for linha in db.session.execute(consulta))
+    return gravados
+
+
+class FilaPresencas:
+    """
+    Buffer de eventos de presença com log local e gravação em lote.
+
+    Args:
+        app: Aplicação cujo banco recebe as presenças
+        pasta: Pasta dos segmentos de log
+        tamanho_lote: Eventos acumulados que disparam uma descarga
+        intervalo: Segundos entre descargas da thread em segundo plano;
+            None desliga a thread (descarga só por tamanho ou manual)
+        fsync: Se True, cada registro só retorna depois do fsync do log
+    """
+
+    def __init__(
+        self,
+        app: Flask,
+        pasta: str,
+        tamanho_lote: int = 500,
+        intervalo: Optional[float] = 1.0,
+        fsync: bool = True
+    ):
+        self.app = app
+        self.pasta = pasta
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.fsync = fsync
+        self._eventos: List[Dict[str, Any]] = []
+        self._segmento: Optional[IO[str]] = None
+        # Lotes já retirados do buffer cuja gravação ainda não terminou
+        self._lotes: List[Tuple[IO[str], List[Dict[str, Any]]]] = []
+        self._lock = threading.Lock()
+        self._lock_descarga = threading.Lock()
+        self._acordar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        os.makedirs(pasta, exist_ok=True)
+
+    @property
+    def pendentes(self) -> int:
+        """Eventos aceitos que ainda não foram gravados no banco."""
+        with self._lock:
+            return len(self._eventos) + sum(len(eventos) for _, eventos in self._lotes)
+
+    def _abrir_segmento(self) -> IO[str]:
+        """Cria e trava um novo segmento de log deste processo."""
+        nome = f'{os.getpid()}-{time.time_ns()}{EXTENSAO_SEGMENTO}'
+        arquivo = open(os.path.join(self.pasta, nome), 'a+', encoding='utf-8')
+        travar(arquivo)
+        return arquivo
+
+    def _iniciar_thread(self) -> None:
+        """Inicia a thread de descarga no primeiro registro."""
+        if self.intervalo is None or self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._executar,
+            name='presencas',
+            daemon=True
+        )
+        self._thread.start()
+
+    def registrar(self, eventos: Iterable[Dict[str, Any]]) -> int:
+        """
+        Grava eventos já validados no log e os acumula para o banco.
+
+        Args:
+            eventos: Eventos retornados por validar_evento
+
+        Returns:
+            int: Quantidade de eventos aceitos
+        """
+        eventos = list(eventos)
+        if not eventos:
+            return 0
+        with self._lock:
+            if self._segmento is None:
+                self._segmento = self._abrir_segmento()
+            self._segmento.write(''.join(_serializar(evento) for evento in eventos))
+            self._segmento.flush()
+            if self.fsync:
+                os.fsync(self._segmento.fileno())
+            self._eventos.extend(eventos)
+            cheio = len(self._eventos) >= self.tamanho_lote
+            self._iniciar_thread()
+
+        if cheio:
+            if self._thread is not None:
+                self._acordar.set()
+            else:
+                try:
+                    self.descarregar()
+                except Exception:
+                    # Os eventos já estão no log; a próxima descarga tenta de novo
+                    logger.exception('Erro ao gravar presenças')
+        return len(eventos)
+
+    def _executar(self) -> None:
+        """Laço da thread: descarrega por tamanho ou a cada intervalo."""
+        while True:
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+            try:
+                with self.app.app_context():
+                    self.descarregar()
+            except Exception:
+                logger.exception('Erro ao gravar presenças')
+
+    def descarregar(self) -> int:
+        """
+        Grava no banco os eventos acumulados e apaga o segmento de log.
+
+        Deve ser chamada dentro de um contexto da aplicação. Se o banco
+        falhar, o lote (e seu segmento) fica guardado e é gravado antes
+        dos próximos na descarga seguinte.
+
+        Returns:
+            int: Quantidade de presenças inseridas
+        """
+        with self._lock_descarga:
+            with self._lock:
+                if self._segmento is not None:
+                    self._lotes.append((self._segmento, self._eventos))
+                    self._segmento, self._eventos = None, []
+
+            inseridos = 0
+            while self._lotes:
+                segmento, eventos = self._lotes[0]
+                try:
+                    inseridos += self._inserir(eventos)
+                except Exception:
+                    db.session.rollback()
+                    raise
+                self._apagar(segmento)
+                self._lotes.pop(0)
+            return inseridos
+
+    def _apagar(self, segmento: IO[str]) -> None:
+        """
+        Remove um segmento do disco e libera a trava.
+
+        O Windows não remove arquivos abertos; lá o segmento é fechado
+        antes. Se outro processo o recuperar nesse intervalo, encontra os
+        eventos já no banco e não os insere de novo.
+        """
+        try:
+            os.remove(segmento.name)
+        except PermissionError:
+            segmento.close()
+            try:
+                os.remove(segmento.name)
+            except FileNotFoundError:
+                pass
+        segmento.close()
+
+    def _inserir(self, eventos: List[Dict[str, Any]]) -> int:
+        """
+        Insere eventos com INSERTs de várias linhas e os soma aos agregados.
+
+        Os eventos inseridos são aplicados ao contador de ocupação depois
+        do commit.
+
+        Se um comando for recusado pelo banco (restrição violada ou valor
+        fora do intervalo da coluna), as linhas daquele comando são
+        inseridas uma a uma e as recusadas vão para o arquivo de erros, para
+        que um evento ruim não trave a fila. Outras falhas do banco
+        interrompem a descarga e o lote é tentado de novo na seguinte.
+
+        Returns:
+            int: Quantidade de presenças inseridas
+        """
+        inseridos = []
+        recusados = []
+        for inicio in range(0, len(eventos), LINHAS_POR_COMANDO):
+            lote = eventos[inicio:inicio + LINHAS_POR_COMANDO]
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(Presenca).values(lote))
+                inseridos.extend(lote)
+            except _ERROS_DE_LINHA:
+                for evento in lote:
+                    try:
+                        with db.session.begin_nested():
+                            db.session.execute(insert(Presenca).values(evento))
+                        inseridos.append(evento)
+                    except _ERROS_DE_LINHA as e:
+                        recusados.append({**evento, 'erro': str(getattr(e, 'orig', e))})
+        acumular_frequencias(inseridos)
+        db.session.commit()
+        registrar_ocupacao(inseridos)
+
+        if recusados:
+            with open(os.path.join(self.pasta, ARQUIVO_ERROS), 'a', encoding='utf-8') as arquivo:
+                arquivo.writelines(_serializar(evento) for evento in recusados)
+        return len(inseridos)
+
+    def retomar(self) -> int:
+        """
+        Grava no banco os segmentos deixados por processos encerrados.
+
+        Segmentos travados pertencem a processos em execução e são
+        ignorados. Eventos que já estão no banco não são inseridos de novo.
+        Linhas ilegíveis são anexadas a ARQUIVO_CORROMPIDOS e puladas.
+        Deve ser chamada dentro de um contexto da aplicação.
+
+        Returns:
+            int: Quantidade de presenças recuperadas
+        """
+        recuperados = 0
+        for nome in sorted(os.listdir(self.pasta)):
+            if not nome.endswith(EXTENSAO_SEGMENTO):
+                continue
+            # Bytes inválidos viram U+FFFD e a linha é separada como ilegível
+            arquivo = open(os.path.join(self.pasta, nome), 'r+', encoding='utf-8', errors='replace')
+            if not travar(arquivo, esperar=False):
+                arquivo.close()
+                continue
+
+            try:
+                eventos, corrompidas = _ler_segmento(arquivo)
+                gravados = _ja_gravados(eventos)
+                recuperados += self._inserir(
+                    [evento for evento in eventos if _chave(evento) not in gravados]
+                )
+                if corrompidas:
+                    self._separar_corrompidas(nome, corrompidas)
+            except Exception:
+                db.session.rollback()
+                arquivo.close()
+                raise
+            self._apagar(arquivo)
+        return recuperados
+
+    def _separar_corrompidas(self, segmento: str, linhas: List[str]) -> None:
+        """Anexa linhas ilegíveis de um segmento ao arquivo de corrompidos."""
+        logger.warning(
+            'Segmento %s: %d linha(s) ilegível(is) separada(s) em %s',
+            segmento, len(linhas), ARQUIVO_CORROMPIDOS
+        )
+        with open(os.path.join(self.pasta, ARQUIVO_CORROMPIDOS), 'a', encoding='utf-8') as arquivo:
+            arquivo.writelines(
+                json.dumps({'segmento': segmento, 'linha': linha}) + '\n' for linha in linhas
+            )
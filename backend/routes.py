@@ -1,5 +1,6 @@
 """Rotas da aplicação."""
 
+import io
 import os
 from datetime import datetime, timedelta
 from functools import wraps
@@ -8,8 +9,27 @@ from flask import (
     request, jsonify, current_app, send_from_directory
 )
 from flask_login import login_user, logout_user, login_required, current_user
+from sqlalchemy import select
 from werkzeug.utils import secure_filename
-from .models import db, Usuario, Aluno, Professor, Plano, Treino, Turma, Pagamento, Exercicio, MatriculaTurma
+from .models import db, Usuario, Aluno, Professor, Plano, Treino, Turma, Pagamento, Exercicio, MatriculaTurma, Presenca
+from .autenticacao import autenticar, invalidar_usuario, VerificacaoIndisponivel
+from .autocompletar import atualizar_autocompletar, remover_do_autocompletar
+from .busca import buscar_alunos
+from .catalogo import (
+    obter_planos_disponiveis, obter_exercicios, invalidar_planos,
+    invalidar_exercicios, responder_catalogo
+)
+from .cobranca import registrar_pagamento, registrar_pagamentos_em_lote, gerar_cobrancas_mes
+from .exportacao import exportar_consulta
+from .formatacao import normalizar_texto
+from .frequencia import relatorio_frequencia
+from .fotos import FotoInvalida, FotoGrandeDemais
+from .importacao import importar_alunos_csv
+from .midia import responder_midia
+from .presencas import EventoInvalido, validar_evento
+from .metricas import obter_metricas_dashboard, calcular_resumo_pagamentos
+from .serializadores import serializar_turmas
+from .utils import obter_parametros_paginacao, paginar_por_cursor, filtrar_query, excluir_foto
 
 rotas = Blueprint('rotas', __name__)
 
@@ -53,9 +73,12 @@ def login():
         return render_template('login.html')
     
     dados = request.get_json()
-    usuario = Usuario.query.filter_by(email=dados['email']).first()
+    try:
+        usuario = autenticar(dados['email'], dados['senha'])
+    except VerificacaoIndisponivel as e:
+        return jsonify({'erro': str(e)}), 503, {'Retry-After': '1'}
     
-    if usuario and usuario.verificar_senha(dados['senha']):
+    if usuario:
         login_user(usuario)
         return jsonify({
             'token': usuario.gerar_token(),
@@ -85,51 +108,7 @@ def dashboard():
     if current_user.tipo not in ['gerente', 'recepcionista']:
         return redirect(url_for('rotas.index'))
     
-    hoje = datetime.now().date()
-    mes_atual = hoje.strftime('%Y-%m')
-    
-    # Métricas para o dashboard
-    metricas = {
-        # Total de alunos ativos
-        'total_alunos': Aluno.query.filter_by(status='ativo').count(),
-        
-        # Total de alunos novos no mês
-        'alunos_novos': Aluno.query.filter(
-            Aluno.status == 'ativo',
-            Aluno.data_matricula >= hoje.replace(day=1),
-            Aluno.data_matricula <= hoje
-        ).count(),
-        
-        # Total de pagamentos do mês
-        'pagamentos_mes': Pagamento.query.filter(
-            Pagamento.mes_referencia == mes_atual,
-            Pagamento.status == 'pago'
-        ).count(),
-        
-        # Total de pagamentos pendentes
-        'pagamentos_pendentes': Pagamento.query.filter(
-            Pagamento.mes_referencia == mes_atual,
-            Pagamento.status == 'pendente'
-        ).count(),
-        
-        # Dados para o gráfico de receita mensal (últimos 6 meses)
-        'labels_meses': [],
-        'dados_pagamentos': []
-    }
-    
-    # Prepara dados para o gráfico de receita mensal
-    for i in range(5, -1, -1):
-        data = hoje - timedelta(days=hoje.day-1) - timedelta(days=30*i)
-        mes = data.strftime('%Y-%m')
-        metricas['labels_meses'].append(data.strftime('%b/%Y'))
-        
-        total_pagos = Pagamento.query.filter(
-            Pagamento.mes_referencia == mes,
-            Pagamento.status == 'pago'
-        ).count()
-        
-        metricas['dados_pagamentos'].append(total_pagos)
-    
+    metricas = obter_metricas_dashboard()
     return render_template('dashboard.html', metricas=metricas)
 
 
@@ -143,7 +122,7 @@ def alunos():
         return redirect(url_for('rotas.index'))
     
     # Busca apenas planos ativos
-    planos_disponiveis = Plano.query.filter_by(ativo=True).all()
+    planos_disponiveis = obter_planos_disponiveis()['itens']
     return render_template('cadastro_alunos.html', planos=planos_disponiveis)
 
 
@@ -206,9 +185,12 @@ def api_login():
     API para login
     """
     dados = request.get_json()
-    usuario = Usuario.query.filter_by(email=dados['email']).first()
+    try:
+        usuario = autenticar(dados['email'], dados['senha'])
+    except VerificacaoIndisponivel as e:
+        return jsonify({'mensagem': str(e)}), 503, {'Retry-After': '1'}
     
-    if usuario and usuario.verificar_senha(dados['senha']):
+    if usuario:
         login_user(usuario, remember=dados.get('lembrar', False))
         return jsonify({
             'token': usuario.gerar_token(),
@@ -296,6 +278,13 @@ def atualizar_usuario(usuario_id):
             if Usuario.query.filter_by(email=dados['email']).first():
                 return jsonify({'erro': 'Email já cadastrado'}), 400
         
+        # Mudanças de acesso invalidam os tokens já emitidos
+        if any(
+            campo in dados and dados[campo] != getattr(usuario, campo)
+            for campo in ('email', 'tipo', 'status')
+        ) or dados.get('senha'):
+            usuario.revogar_tokens()
+        
         # Atualiza os dados do usuário
         if 'nome' in dados:
             usuario.nome = dados['nome']
@@ -309,6 +298,7 @@ def atualizar_usuario(usuario_id):
             usuario.status = dados['status']
         
         db.session.commit()
+        invalidar_usuario(usuario_id)
         return jsonify({'mensagem': 'Usuário atualizado com sucesso'})
         
     except Exception as e:
@@ -329,7 +319,9 @@ def deletar_usuario(usuario_id):
             return jsonify({'erro': 'Não é possível inativar seu próprio usuário'}), 400
         
         usuario.status = 'inativo'
+        usuario.revogar_tokens()
         db.session.commit()
+        invalidar_usuario(usuario_id)
         return jsonify({'mensagem': 'Usuário inativado com sucesso'})
         
     except Exception as e:
@@ -337,6 +329,14 @@ def deletar_usuario(usuario_id):
         return jsonify({'erro': str(e)}), 400
 
 
+@rotas.route('/api/usuarios/cache', methods=['GET'])
+@login_required
+@gerente_required
+def obter_estatisticas_cache_usuarios():
+    """Retorna acertos e falhas do cache de usuários deste processo."""
+    return jsonify(current_app.extensions['usuarios_cache'].estatisticas())
+
+
 @rotas.route('/api/planos', methods=['POST'])
 @login_required
 @gerente_required
@@ -355,6 +355,7 @@ def criar_plano():
         
         db.session.add(plano)
         db.session.commit()
+        invalidar_planos()
         
         return jsonify(plano.to_dict()), 201
         
@@ -379,6 +380,7 @@ def atualizar_plano(plano_id):
         plano.ativo = dados.get('ativo', plano.ativo)
         
         db.session.commit()
+        invalidar_planos()
         return jsonify(plano.to_dict())
         
     except Exception as e:
@@ -396,6 +398,7 @@ def deletar_plano(plano_id):
     try:
         db.session.delete(plano)
         db.session.commit()
+        invalidar_planos()
         return '', 204
         
     except Exception as e:
@@ -415,23 +418,113 @@ def obter_plano(plano_id):
 @rotas.route('/api/planos/disponiveis', methods=['GET'])
 @login_required
 def listar_planos_disponiveis():
-    """API para listar planos disponíveis."""
-    planos = Plano.query.filter_by(ativo=True).all()
-    return jsonify([plano.to_dict() for plano in planos])
+    """API para listar planos disponíveis (em cache, com ETag)."""
+    return responder_catalogo(obter_planos_disponiveis())
+
+
+# Filtros de /api/alunos e as colunas (indexadas) correspondentes
+FILTROS_ALUNOS = {
+    'status': Aluno.status,
+    'plano_id': Aluno.plano_id,
+    'objetivo': Aluno.objetivo,
+    'nome': (Aluno.nome_normalizado, 'prefixo'),
+    'matriculado_de': (Aluno.data_matricula, '>='),
+    'matriculado_ate': (Aluno.data_matricula, '<')
+}
+
+# Ordenações aceitas em /api/alunos (?ordenar=nome, ?ordenar=-data_matricula)
+ORDENACOES_ALUNOS = {
+    'data_matricula': (Aluno.data_matricula, Aluno.id),
+    'nome': (Aluno.nome_normalizado, Aluno.id),
+    'id': (Aluno.id,)
+}
+
+
+def ler_data_parametro(nome):
+    """Lê um parâmetro de data (YYYY-MM-DD) da query string."""
+    valor = request.args.get(nome)
+    if not valor:
+        return None
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f'{nome} deve estar no formato YYYY-MM-DD')
+
+
+def filtrar_alunos(query):
+    """
+    Aplica à consulta os filtros de alunos da query string.
+    
+    Aceita status, plano_id, objetivo, nome (prefixo, sem diferenciar
+    acentos e maiúsculas) e o intervalo de matrícula matriculado_de e
+    matriculado_ate (inclusive).
+    
+    Raises:
+        ValueError: Se plano_id ou alguma data for inválida
+    """
+    plano_id = request.args.get('plano_id')
+    if plano_id and not plano_id.isdigit():
+        raise ValueError('plano_id deve ser um número')
+    matriculado_ate = ler_data_parametro('matriculado_ate')
+    
+    return filtrar_query(query, {
+        'status': request.args.get('status'),
+        'plano_id': int(plano_id) if plano_id else None,
+        'objetivo': request.args.get('objetivo'),
+        'nome': normalizar_texto(request.args.get('nome', '').strip()),
+        'matriculado_de': ler_data_parametro('matriculado_de'),
+        'matriculado_ate': matriculado_ate + timedelta(days=1) if matriculado_ate else None
+    }, FILTROS_ALUNOS)
 
 
 @rotas.route('/api/alunos', methods=['GET'])
 @login_required
 def listar_alunos():
-    """API para listar alunos."""
+    """
+    API para listar alunos, paginada por cursor.
+    
+    Os filtros são os de filtrar_alunos; ?ordenar= aceita data_matricula
+    (padrão), nome ou id, com '-' na frente para ordem decrescente.
+    """
     try:
-        alunos = Aluno.query.all()
-        return jsonify([aluno.to_dict() for aluno in alunos])
+        ordenar = request.args.get('ordenar', '-data_matricula')
+        chave = ordenar.lstrip('-')
+        if chave not in ORDENACOES_ALUNOS:
+            raise ValueError(f'ordenar deve ser um de: {", ".join(ORDENACOES_ALUNOS)}')
+        
+        cursor, limite, incluir_total = obter_parametros_paginacao()
+        return jsonify(paginar_por_cursor(
+            filtrar_alunos(Aluno.query),
+            ORDENACOES_ALUNOS[chave],
+            cursor=cursor,
+            limite=limite,
+            incluir_total=incluir_total,
+            decrescente=ordenar.startswith('-')
+        ))
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
     except Exception as e:
         print(f"Erro ao listar alunos: {str(e)}")  # Log do erro
         return jsonify({'erro': str(e)}), 500
 
 
+@rotas.route('/api/alunos/busca', methods=['GET'])
+@login_required
+def buscar_alunos_api():
+    """API de busca de alunos por parte do nome, email, CPF ou telefone (?q=)."""
+    limite = max(1, min(request.args.get('limite', 10, type=int), 50))
+    return jsonify({'items': buscar_alunos(request.args.get('q', ''), limite)})
+
+
+@rotas.route('/api/alunos/autocomplete', methods=['GET'])
+@login_required
+def autocompletar_alunos():
+    """API de sugestões de alunos ativos pelo começo do nome ou do CPF (?q=)."""
+    limite = max(1, min(request.args.get('limite', 10, type=int), 50))
+    indice = current_app.extensions['autocompletar']
+    return jsonify({'items': indice.buscar(request.args.get('q', ''), limite)})
+
+
 @rotas.route('/api/alunos', methods=['POST'])
 @login_required
 def criar_aluno():
@@ -459,6 +552,7 @@ def criar_aluno():
         
         db.session.add(aluno)
         db.session.commit()
+        atualizar_autocompletar(aluno)
         
         return jsonify(aluno.to_dict()), 201
         
@@ -467,6 +561,44 @@ def criar_aluno():
         return jsonify({'erro': str(e)}), 400
 
 
+@rotas.route('/api/alunos/import', methods=['POST'])
+@login_required
+def importar_alunos():
+    """
+    API para importar alunos de um CSV.
+    
+    Aceita o arquivo no campo 'arquivo' (multipart) ou o CSV no corpo.
+    """
+    arquivo = request.files.get('arquivo')
+    fluxo = arquivo.stream if arquivo else request.stream
+    texto = io.TextIOWrapper(fluxo, encoding='utf-8-sig', newline='')
+    
+    try:
+        resultado = importar_alunos_csv(texto)
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({'erro': 'O arquivo deve estar codificado em UTF-8'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'erro': str(e)}), 500
+    
+    if resultado['inseridos']:
+        current_app.extensions['autocompletar'].carregar()
+    return jsonify(resultado), 201
+
+
+@rotas.route('/api/alunos/export', methods=['GET'])
+@login_required
+def exportar_alunos():
+    """API para exportar os alunos em CSV ou NDJSON (streaming), com os filtros da listagem."""
+    colunas = [coluna for coluna in Aluno.__table__.columns if coluna.key != 'nome_normalizado']
+    try:
+        consulta = filtrar_alunos(select(*colunas)).order_by(Aluno.id)
+        return exportar_consulta(consulta, request.args.get('format', 'csv'), 'alunos')
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+
+
 @rotas.route('/api/alunos/<int:aluno_id>', methods=['PUT'])
 @login_required
 def atualizar_aluno(aluno_id):
@@ -501,6 +633,7 @@ def atualizar_aluno(aluno_id):
             aluno.status = dados['status']
         
         db.session.commit()
+        atualizar_autocompletar(aluno)
         return jsonify(aluno.to_dict())
     
     except Exception as e:
@@ -513,10 +646,14 @@ def atualizar_aluno(aluno_id):
 def deletar_aluno(aluno_id):
     """API para deletar um aluno."""
     aluno = Aluno.query.get_or_404(aluno_id)
+    foto_url = aluno.foto_url
     
     try:
         db.session.delete(aluno)
         db.session.commit()
+        remover_do_autocompletar(aluno_id)
+        if foto_url:
+            excluir_foto(foto_url)
         return '', 204
         
     except Exception as e:
@@ -532,18 +669,99 @@ def obter_aluno(aluno_id):
     return jsonify(aluno.to_dict())
 
 
-@rotas.route('/api/pagamentos', methods=['GET'])
+# Cabeçalhos e delimitadores de um envio multipart, além da própria imagem
+FOLGA_MULTIPART = 16 * 1024
+
+
+def trocar_foto(entidade, pasta):
+    """
+    Substitui a foto de um aluno ou usuário pela imagem enviada.
+    
+    A imagem pode vir no campo multipart 'foto' ou como corpo da
+    requisição (Content-Type image/*); em ambos os casos é lida em
+    blocos, sem carregar o arquivo inteiro em memória. Um corpo cujo
+    Content-Length já excede o limite de fotos é recusado com 413 antes
+    de ser lido; sem Content-Length, o limite é conferido durante a
+    leitura. A foto é processada em segundo plano; a resposta traz o
+    caminho definitivo e o status 'pendente'.
+    """
+    fila_fotos = current_app.extensions['fila_fotos']
+    if fila_fotos.limite_bytes and request.content_length:
+        folga = 0 if request.mimetype.startswith('image/') else FOLGA_MULTIPART
+        if request.content_length > fila_fotos.limite_bytes + folga:
+            return jsonify({
+                'erro': f'Arquivo maior que {fila_fotos.limite_bytes // (1024 * 1024)}MB'
+            }), 413
+    
+    if request.mimetype.startswith('image/'):
+        fluxo = request.stream
+    else:
+        arquivo = request.files.get('foto')
+        fluxo = arquivo.stream if arquivo else None
+    if fluxo is None:
+        return jsonify({'erro': 'Envie uma imagem PNG, JPG ou GIF no campo foto'}), 400
+    
+    try:
+        caminho = fila_fotos.enfileirar(fluxo, pasta)
+    except FotoGrandeDemais as e:
+        return jsonify({'erro': str(e)}), 413
+    except FotoInvalida as e:
+        return jsonify({'erro': str(e)}), 400
+    
+    foto_anterior = entidade.foto_url
+    try:
+        entidade.foto_url = caminho
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        excluir_foto(caminho)
+        return jsonify({'erro': str(e)}), 500
+    
+    excluir_foto(foto_anterior)
+    return jsonify({'foto_url': caminho, 'status': 'pendente'}), 202
+
+
+@rotas.route('/api/alunos/<int:aluno_id>/foto', methods=['POST'])
 @login_required
-def listar_pagamentos():
-    """Lista pagamentos com filtros opcionais."""
+def enviar_foto_aluno(aluno_id):
+    """API para enviar a foto de um aluno."""
+    return trocar_foto(Aluno.query.get_or_404(aluno_id), 'alunos')
+
+
+@rotas.route('/api/usuarios/<int:usuario_id>/foto', methods=['POST'])
+@login_required
+def enviar_foto_usuario(usuario_id):
+    """API para enviar a foto de um usuário (o próprio ou, para gerentes, qualquer um)."""
+    if current_user.id != usuario_id and current_user.tipo != 'gerente':
+        return jsonify({'erro': 'Acesso negado'}), 403
+    return trocar_foto(Usuario.query.get_or_404(usuario_id), 'usuarios')
+
+
+@rotas.route('/media/<path:caminho>', methods=['GET'])
+@login_required
+def servir_midia(caminho):
+    """Entrega uma foto enviada (?tamanho=thumb ou media para as variantes)."""
+    return responder_midia(caminho, request.args.get('tamanho'))
+
+
+@rotas.route('/api/fotos/status', methods=['GET'])
+@login_required
+def obter_status_foto():
+    """API para consultar o processamento de uma foto (?caminho=<foto_url>)."""
+    caminho = request.args.get('caminho', '')
+    return jsonify({
+        'foto_url': caminho,
+        'status': current_app.extensions['fila_fotos'].status(caminho)
+    })
+
+
+def filtrar_pagamentos(query):
+    """Aplica à consulta os filtros de pagamentos da query string."""
     # Obtém parâmetros da query
     aluno_id = request.args.get('aluno_id', type=int)
     mes_referencia = request.args.get('mes_referencia')
     status = request.args.get('status')
     
-    # Inicia a query base
-    query = Pagamento.query
-    
     # Aplica filtros se fornecidos
     if aluno_id:
         query = query.filter(Pagamento.aluno_id == aluno_id)
@@ -551,15 +769,18 @@ def listar_pagamentos():
         query = query.filter(Pagamento.mes_referencia == mes_referencia)
     if status:
         query = query.filter(Pagamento.status == status)
-        
-    # Executa a query
-    pagamentos = query.all()
+    return query
+
+
+@rotas.route('/api/pagamentos', methods=['GET'])
+@login_required
+def listar_pagamentos():
+    """Lista pagamentos com filtros opcionais."""
+    query = filtrar_pagamentos(Pagamento.query)
     
-    # Formata o resultado
-    resultado = []
-    for pagamento in pagamentos:
+    def formatar(pagamento):
         aluno = pagamento.aluno
-        resultado.append({
+        return {
             'id': pagamento.id,
             'aluno': {
                 'id': aluno.id,
@@ -570,9 +791,21 @@ def listar_pagamentos():
             'status': pagamento.status,
             'data_pagamento': pagamento.data_pagamento.strftime('%Y-%m-%d') if pagamento.data_pagamento else None,
             'observacoes': pagamento.observacoes
-        })
+        }
     
-    return jsonify(resultado)
+    # Executa a query paginada por cursor
+    try:
+        cursor, limite, incluir_total = obter_parametros_paginacao()
+        return jsonify(paginar_por_cursor(
+            query,
+            (Pagamento.id,),
+            cursor=cursor,
+            limite=limite,
+            incluir_total=incluir_total,
+            serializar=formatar
+        ))
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
 
 
 @rotas.route('/api/pagamentos', methods=['POST'])
@@ -581,35 +814,169 @@ def criar_pagamento():
     """Cria um novo registro de pagamento."""
     dados = request.get_json()
     
-    # Verifica se já existe pagamento para este aluno/mês
-    pagamento_existente = Pagamento.query.filter_by(
-        aluno_id=dados['aluno_id'],
-        mes_referencia=dados['mes_referencia']
-    ).first()
-    
-    if pagamento_existente:
-        return jsonify({
-            'erro': 'Já existe um pagamento registrado para este aluno neste mês'
-        }), 400
-    
-    # Cria o novo pagamento
-    pagamento = Pagamento(
-        aluno_id=dados['aluno_id'],
-        mes_referencia=dados['mes_referencia'],
-        status=dados['status'],
-        data_pagamento=datetime.strptime(dados['data_pagamento'], '%Y-%m-%d') if dados.get('data_pagamento') else None,
-        observacoes=dados.get('observacoes')
-    )
-    
     try:
-        db.session.add(pagamento)
+        # A chave única (aluno, mês) detecta duplicidade no próprio INSERT
+        if not registrar_pagamento(dados):
+            db.session.rollback()
+            return jsonify({
+                'erro': 'Já existe um pagamento registrado para este aluno neste mês'
+            }), 400
+        
         db.session.commit()
         return jsonify({'mensagem': 'Pagamento registrado com sucesso'})
+    except (KeyError, TypeError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({'erro': f'Dados inválidos: {e}'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'erro': str(e)}), 500
+
+
+@rotas.route('/api/pagamentos/lote', methods=['POST'])
+@login_required
+def criar_pagamentos_em_lote():
+    """Registra os pagamentos de um mês para vários alunos de uma vez."""
+    dados = request.get_json()
+    
+    try:
+        mes_referencia = dados['mes_referencia']
+        resultado = registrar_pagamentos_em_lote(
+            dict(pagamento, mes_referencia=mes_referencia)
+            for pagamento in dados['pagamentos']
+        )
+        db.session.commit()
+        return jsonify(resultado), 201
+    except (KeyError, TypeError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({'erro': f'Dados inválidos: {e}'}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'erro': str(e)}), 500
 
 
+@rotas.route('/api/pagamentos/cobranca', methods=['POST'])
+@login_required
+@gerente_required
+def gerar_cobranca_mes():
+    """Gera os pagamentos pendentes do mês para todos os alunos ativos."""
+    dados = request.get_json(silent=True) or {}
+    mes_referencia = dados.get('mes_referencia', datetime.now().strftime('%Y-%m'))
+    
+    try:
+        return jsonify(gerar_cobrancas_mes(mes_referencia)), 201
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'erro': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'erro': str(e)}), 500
+
+
+@rotas.route('/api/pagamentos/export', methods=['GET'])
+@login_required
+def exportar_pagamentos():
+    """API para exportar pagamentos em CSV ou NDJSON, com os filtros da listagem."""
+    consulta = filtrar_pagamentos(
+        select(*Pagamento.__table__.columns, Aluno.nome.label('aluno_nome'))
+        .join(Aluno, Aluno.id == Pagamento.aluno_id)
+        .order_by(Pagamento.id)
+    )
+    try:
+        return exportar_consulta(consulta, request.args.get('format', 'csv'), 'pagamentos')
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+
+
+@rotas.route('/api/presencas', methods=['POST'])
+@login_required
+def registrar_presencas():
+    """
+    API para registrar entradas e saídas (leitoras de cartão).
+    
+    Aceita um evento (objeto) ou um lote (lista). Os eventos são gravados
+    no log local e inseridos no banco em lote logo depois.
+    """
+    dados = request.get_json(silent=True)
+    eventos = dados if isinstance(dados, list) else [dados]
+    validados = []
+    for posicao, evento in enumerate(eventos):
+        try:
+            validados.append(validar_evento(evento))
+        except EventoInvalido as e:
+            prefixo = f'Evento {posicao}: ' if isinstance(dados, list) else ''
+            return jsonify({'erro': f'{prefixo}{e}'}), 400
+    
+    current_app.extensions['fila_presencas'].registrar(validados)
+    if isinstance(dados, list):
+        return jsonify({'aceitos': len(validados)}), 201
+    evento = validados[0]
+    return jsonify({**evento, 'data': evento['data'].isoformat()}), 201
+
+
+@rotas.route('/api/presencas/export', methods=['GET'])
+@login_required
+def exportar_presencas():
+    """API para exportar presenças em CSV ou NDJSON, por aluno ou turma."""
+    consulta = select(*Presenca.__table__.columns).order_by(Presenca.id)
+    aluno_id = request.args.get('aluno_id', type=int)
+    turma_id = request.args.get('turma_id', type=int)
+    if aluno_id:
+        consulta = consulta.filter(Presenca.aluno_id == aluno_id)
+    if turma_id:
+        consulta = consulta.filter(Presenca.turma_id == turma_id)
+    try:
+        return exportar_consulta(consulta, request.args.get('format', 'csv'), 'presencas')
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+
+
+@rotas.route('/api/ocupacao', methods=['GET'])
+@login_required
+def obter_ocupacao():
+    """
+    API da ocupação atual da academia e das turmas (painel da recepção).
+    
+    Lida da memória, sem consultar o banco; responde 304 se nada mudou
+    desde o ETag enviado em If-None-Match.
+    """
+    situacao = current_app.extensions['ocupacao'].situacao()
+    response = jsonify(situacao)
+    response.set_etag(f"{situacao['dia']}-{situacao['versao']}")
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+@rotas.route('/api/relatorios/frequencia', methods=['GET'])
+@login_required
+def obter_relatorio_frequencia():
+    """
+    API do relatório de frequência e ocupação (agregados de presenças).
+    
+    Parâmetros: inicio e fim (YYYY-MM-DD; padrão, os últimos 30 dias),
+    turma_id e aluno_id (opcionais).
+    """
+    try:
+        fim = ler_data_parametro('fim')
+        inicio = ler_data_parametro('inicio')
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    
+    fim = fim.date() if fim else datetime.utcnow().date()
+    inicio = inicio.date() if inicio else fim - timedelta(days=29)
+    if inicio > fim:
+        return jsonify({'erro': 'inicio deve ser anterior a fim'}), 400
+    if (fim - inicio).days > 366:
+        return jsonify({'erro': 'O intervalo máximo é de um ano'}), 400
+    
+    return jsonify(relatorio_frequencia(
+        inicio,
+        fim,
+        turma_id=request.args.get('turma_id', type=int),
+        aluno_id=request.args.get('aluno_id', type=int)
+    ))
+
+
 @rotas.route('/api/pagamentos/<int:pagamento_id>', methods=['PUT'])
 @login_required
 def atualizar_pagamento(pagamento_id):
@@ -668,45 +1035,24 @@ def obter_pagamento(pagamento_id):
 @login_required
 def obter_resumo_pagamentos():
     """API para obter resumo dos pagamentos."""
-    hoje = datetime.now().date()
-    mes_atual = hoje.strftime('%Y-%m')
-    
-    # Total de pagamentos do mês
-    total_pagos = Pagamento.query.filter(
-        Pagamento.mes_referencia == mes_atual,
-        Pagamento.status == 'pago'
-    ).count()
-    
-    # Total de pagamentos pendentes
-    total_pendentes = Pagamento.query.filter(
-        Pagamento.mes_referencia == mes_atual,
-        Pagamento.status == 'pendente'
-    ).count()
-    
-    # Total de pagamentos atrasados (meses anteriores)
-    total_atrasados = Pagamento.query.filter(
-        Pagamento.mes_referencia < mes_atual,
-        Pagamento.status == 'pendente'
-    ).count()
-    
-    # Taxa de inadimplência
-    total_pagamentos = total_pagos + total_pendentes
-    taxa_inadimplencia = (total_pendentes / total_pagamentos * 100) if total_pagamentos > 0 else 0
-    
-    return jsonify({
-        'total_pagos': total_pagos,
-        'total_pendentes': total_pendentes,
-        'total_atrasados': total_atrasados,
-        'taxa_inadimplencia': float(taxa_inadimplencia)
-    })
+    return jsonify(calcular_resumo_pagamentos())
 
 
 @rotas.route('/api/treinos', methods=['GET'])
 @login_required
 def listar_treinos():
-    """API para listar treinos."""
-    treinos = Treino.query.all()
-    return jsonify([treino.to_dict() for treino in treinos])
+    """API para listar treinos, paginada por cursor."""
+    try:
+        cursor, limite, incluir_total = obter_parametros_paginacao()
+        return jsonify(paginar_por_cursor(
+            Treino.consulta_listagem(),
+            (Treino.id,),
+            cursor=cursor,
+            limite=limite,
+            incluir_total=incluir_total
+        ))
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
 
 
 @rotas.route('/api/treinos', methods=['POST'])
@@ -787,17 +1133,18 @@ def deletar_treino(treino_id):
 @login_required
 def obter_treino(treino_id):
     """API para obter detalhes de um treino específico."""
-    treino = Treino.query.get_or_404(treino_id)
+    treino = Treino.consulta_listagem().filter(
+        Treino.id == treino_id
+    ).first_or_404()
     return jsonify(treino.to_dict())
 
 
 @rotas.route('/api/exercicios', methods=['GET'])
 @login_required
 def listar_exercicios():
-    """API para listar exercícios."""
+    """API para listar exercícios (em cache, com ETag)."""
     try:
-        exercicios = Exercicio.query.all()
-        return jsonify([exercicio.to_dict() for exercicio in exercicios])
+        return responder_catalogo(obter_exercicios())
     except Exception as e:
         print(f"Erro ao listar exercícios: {str(e)}")  # Log do erro
         return jsonify({'erro': str(e)}), 500
@@ -820,6 +1167,7 @@ def criar_exercicio():
         
         db.session.add(exercicio)
         db.session.commit()
+        invalidar_exercicios()
         
         return jsonify(exercicio.to_dict()), 201
         
@@ -922,6 +1270,10 @@ def atualizar_professor(professor_id):
     dados = request.get_json()
     
     try:
+        # Mudanças de acesso invalidam os tokens já emitidos
+        if dados['email'] != professor.usuario.email or dados.get('senha'):
+            professor.usuario.revogar_tokens()
+        
         # Atualiza os dados do usuário
         professor.usuario.nome = dados['nome']
         professor.usuario.email = dados['email']
@@ -933,6 +1285,7 @@ def atualizar_professor(professor_id):
         professor.especialidades = dados['especialidades']
         
         db.session.commit()
+        invalidar_usuario(professor.usuario_id)
         return jsonify({'mensagem': 'Professor atualizado com sucesso'})
         
     except Exception as e:
@@ -957,8 +1310,10 @@ def deletar_professor(professor_id):
         # Inativa o professor e seu usuário
         professor.status = 'inativo'
         professor.usuario.status = 'inativo'
+        professor.usuario.revogar_tokens()
         
         db.session.commit()
+        invalidar_usuario(professor.usuario_id)
         return jsonify({'mensagem': 'Professor inativado com sucesso'})
         
     except Exception as e:
@@ -971,28 +1326,7 @@ def deletar_professor(professor_id):
 def listar_turmas():
     """Lista todas as turmas cadastradas."""
     turmas = Turma.query.all()
-    return jsonify([{
-        'id': turma.id,
-        'modalidade': turma.modalidade,
-        'professor_id': turma.professor_id,
-        'professor': {
-            'id': turma.professor.id,
-            'nome': turma.professor.nome
-        },
-        'dia_semana': turma.dia_semana,
-        'horario_inicio': turma.horario_inicio,
-        'horario_fim': turma.horario_fim,
-        'capacidade_maxima': turma.capacidade_maxima,
-        'nivel': turma.nivel,
-        'descricao': turma.descricao,
-        'matriculas': [{
-            'id': matricula.id,
-            'aluno': {
-                'id': matricula.aluno.id,
-                'nome': matricula.aluno.nome
-            }
-        } for matricula in turma.matriculas]
-    } for turma in turmas])
+    return jsonify(serializar_turmas(turmas))
 
 
 @rotas.route('/api/turmas/<int:turma_id>', methods=['GET'])
@@ -1000,28 +1334,7 @@ def listar_turmas():
 def obter_turma(turma_id):
     """Obtém os detalhes de uma turma específica."""
     turma = Turma.query.get_or_404(turma_id)
-    return jsonify({
-        'id': turma.id,
-        'modalidade': turma.modalidade,
-        'professor_id': turma.professor_id,
-        'professor': {
-            'id': turma.professor.id,
-            'nome': turma.professor.nome
-        },
-        'dia_semana': turma.dia_semana,
-        'horario_inicio': turma.horario_inicio,
-        'horario_fim': turma.horario_fim,
-        'capacidade_maxima': turma.capacidade_maxima,
-        'nivel': turma.nivel,
-        'descricao': turma.descricao,
-        'matriculas': [{
-            'id': matricula.id,
-            'aluno': {
-                'id': matricula.aluno.id,
-                'nome': matricula.aluno.nome
-            }
-        } for matricula in turma.matriculas]
-    })
+    return jsonify(serializar_turmas([turma])[0])
 
 
 @rotas.route('/api/turmas', methods=['POST'])
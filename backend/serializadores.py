@@ -0,0 +1,78 @@
+"""Serializadores em lote do sistema GymFlow.
+
+Convertem coleções de modelos em dicionários buscando os dados
+relacionados com um número fixo de consultas (chaves em listas IN),
+em vez de acessar relacionamentos preguiçosos objeto a objeto.
+"""
+
+from typing import Dict, List, Any, Sequence
+from . import db
+from .models import Usuario, Professor, Aluno, Turma, MatriculaTurma
+
+
+def serializar_turmas(turmas: Sequence[Turma]) -> List[Dict[str, Any]]:
+    """
+    Serializa turmas com professor e lista de alunos matriculados.
+
+    Além das turmas já carregadas, executa duas consultas: uma para os
+    nomes dos professores e outra para as matrículas com o nome do aluno.
+
+    Args:
+        turmas: Turmas a serializar
+
+    Returns:
+        List[Dict[str, Any]]: Turmas no formato da API de turmas
+    """
+    if not turmas:
+        return []
+
+    professor_ids = {turma.professor_id for turma in turmas}
+    turma_ids = [turma.id for turma in turmas]
+
+    professores = {
+        professor_id: nome
+        for professor_id, nome in db.session.query(
+            Professor.id,
+            Usuario.nome
+        ).join(
+            Usuario, Professor.usuario_id == Usuario.id
+        ).filter(Professor.id.in_(professor_ids))
+    }
+
+    matriculas: Dict[int, List[Dict[str, Any]]] = {
+        turma_id: [] for turma_id in turma_ids
+    }
+    for matricula_id, turma_id, aluno_id, aluno_nome in db.session.query(
+        MatriculaTurma.id,
+        MatriculaTurma.turma_id,
+        Aluno.id,
+        Aluno.nome
+    ).join(
+        Aluno, MatriculaTurma.aluno_id == Aluno.id
+    ).filter(
+        MatriculaTurma.turma_id.in_(turma_ids)
+    ).order_by(MatriculaTurma.id):
+        matriculas[turma_id].append({
+            'id': matricula_id,
+            'aluno': {
+                'id': aluno_id,
+                'nome': aluno_nome
+            }
+        })
+
+    return [{
+        'id': turma.id,
+        'modalidade': turma.modalidade,
+        'professor_id': turma.professor_id,
+        'professor': {
+            'id': turma.professor_id,
+            'nome': professores.get(turma.professor_id)
+        },
+        'dia_semana': turma.dia_semana,
+        'horario_inicio': turma.horario_inicio.strftime('%H:%M'),
+        'horario_fim': turma.horario_fim.strftime('%H:%M'),
+        'capacidade_maxima': turma.capacidade_maxima,
+        'nivel': turma.nivel,
+        'descricao': turma.descricao,
+        'matriculas': matriculas[turma.id]
+    } for turma in turmas]
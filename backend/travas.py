@@ -0,0 +1,46 @@
+"""Travas exclusivas de arquivo entre processos.
+
+Usa ``flock`` no Linux e no macOS e ``msvcrt.locking`` no Windows. Nos
+dois casos a trava é liberada quando o arquivo é fechado ou o processo
+termina, então um processo encerrado no meio de um trabalho não deixa
+a trava para trás.
+"""
+
+from typing import IO
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def travar(arquivo: IO, esperar: bool = True) -> bool:
+    """
+    Trava o arquivo com exclusividade.
+
+    Args:
+        arquivo: Arquivo aberto
+        esperar: Se False, não espera caso outro processo tenha a trava
+
+    Returns:
+        bool: True se a trava foi obtida; False se já estava com outro
+        processo (só quando ``esperar`` é False)
+    """
+    if fcntl is not None:
+        try:
+            fcntl.flock(arquivo, fcntl.LOCK_EX | (0 if esperar else fcntl.LOCK_NB))
+        except BlockingIOError:
+            return False
+        return True
+
+    # No Windows a trava cobre um intervalo de bytes: o primeiro do arquivo
+    posicao = arquivo.tell()
+    arquivo.seek(0)
+    try:
+        msvcrt.locking(arquivo.fileno(), msvcrt.LK_LOCK if esperar else msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    finally:
+        arquivo.seek(posicao)
+    return True
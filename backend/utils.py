@@ -8,15 +8,107 @@ Repositório: https://github.com/KerubinDev/GymFlow
 
 import os
 import re
+import sys
+import json
+import base64
+from array import array
 from datetime import datetime, date
-from typing import Optional, List, Dict, Any, Union
+from operator import eq, ge, gt, le, lt, mul
+from typing import Optional, List, Dict, Any, Union, Callable, Iterable, Sequence, Tuple
 from werkzeug.utils import secure_filename
-from PIL import Image
 from flask import current_app
 import jwt
 from functools import wraps
 from flask import jsonify, request
 from flask_login import current_user
+from sqlalchemy import and_, or_
+# Formatadores reexportados (antes definidos neste módulo)
+from .formatacao import formatar_cpf, formatar_telefone, formatar_moeda
+from .fotos import IDADE_MINIMA_EXCLUSAO
+
+
+# Caracteres removidos antes de validar (a máscara XXX.XXX.XXX-XX)
+_PONTUACAO_CPF = str.maketrans('', '', '.- ')
+_NAO_DIGITOS = re.compile(r'[^0-9]')
+
+# Pesos dos dígitos verificadores
+_PESOS_DV1 = tuple(range(10, 1, -1))
+_PESOS_DV2 = tuple(range(11, 1, -1))
+
+
+def _tabela_digito_verificador(pesos: Sequence[int]) -> bytes:
+    """
+    Código ASCII do dígito verificador esperado para cada soma ponderada.
+    
+    As somas são feitas direto sobre os códigos ASCII dos dígitos; a
+    tabela já desconta ord('0') de cada um.
+    """
+    ajuste = ord('0') * sum(pesos)
+    return bytes(
+        ord('0') + ((soma - ajuste) * 10 % 11) % 10 if soma >= ajuste else 0
+        for soma in range(ord('9') * sum(pesos) + 1)
+    )
+
+
+_DV1_POR_SOMA = _tabela_digito_verificador(_PESOS_DV1)
+_DV2_POR_SOMA = _tabela_digito_verificador(_PESOS_DV2)
+
+_CPFS_REPETIDOS = frozenset(str(digito) * 11 for digito in range(10))
+
+_PADRAO_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+
+def _normalizar_cpf(cpf: str) -> str:
+    """Remove a máscara do CPF, deixando apenas os dígitos."""
+    digitos = cpf.translate(_PONTUACAO_CPF)
+    if digitos.isascii() and digitos.isdigit():
+        return digitos
+    return _NAO_DIGITOS.sub('', cpf)
+
+
+def _normalizar_cpfs(cpfs: List[str]) -> List[str]:
+    """Remove a máscara de vários CPFs com uma única passada em C."""
+    bloco = '\n'.join(cpfs).translate(_PONTUACAO_CPF)
+    normalizados = bloco.split('\n')
+    digitos = bloco.replace('\n', '')
+    if len(normalizados) == len(cpfs) and digitos.isascii() and digitos.isdigit():
+        return normalizados
+    return [_normalizar_cpf(cpf) for cpf in cpfs]
+
+
+def _somas_ponderadas(colunas: Sequence[bytes], pesos: Sequence[int]) -> List[int]:
+    """
+    Soma ponderada, linha a linha, de colunas de dígitos ASCII.
+    
+    Equivale a ``[sum(map(mul, pesos, linha)) for linha in zip(*colunas)]``,
+    mas com uma multiplicação por coluna em vez de uma por dígito: cada
+    coluna é lida como um inteiro little-endian com 16 bits por linha (o
+    byte da linha seguido de um zero), e somar ``peso * inteiro`` soma as
+    linhas de todas as faixas ao mesmo tempo. Como a maior soma possível,
+    ord('9') * 65, cabe em 16 bits, nenhuma faixa transborda para a
+    próxima, e o resultado é lido de volta como inteiros de 16 bits
+    little-endian, em qualquer plataforma.
+    """
+    faixas = bytearray(2 * len(colunas[0]))
+    total = 0
+    for coluna, peso in zip(colunas, pesos):
+        faixas[0::2] = coluna
+        total += peso * int.from_bytes(faixas, 'little')
+    somas = array('H', total.to_bytes(len(faixas), 'little'))
+    if sys.byteorder == 'big':
+        somas.byteswap()
+    return somas.tolist()
+
+
+def _digitos_cpf_validos(digitos: str) -> bool:
+    """Confere tamanho e dígitos verificadores de um CPF já normalizado."""
+    if len(digitos) != 11 or digitos in _CPFS_REPETIDOS:
+        return False
+    codigos = digitos.encode('ascii')
+    return (
+        _DV1_POR_SOMA[sum(map(mul, _PESOS_DV1, codigos))] == codigos[9]
+        and _DV2_POR_SOMA[sum(map(mul, _PESOS_DV2, codigos))] == codigos[10]
+    )
 
 
 def validar_cpf(cpf: str) -> bool:
@@ -29,33 +121,45 @@ def validar_cpf(cpf: str) -> bool:
     Returns:
         bool: True se o CPF é válido, False caso contrário
     """
-    # Remove caracteres não numéricos
-    cpf = re.sub(r'[^0-9]', '', cpf)
-    
-    if len(cpf) != 11:
-        return False
-    
-    # Verifica se todos os dígitos são iguais
-    if len(set(cpf)) == 1:
-        return False
-    
-    # Calcula primeiro dígito verificador
-    soma = sum(int(cpf[i]) * (10 - i) for i in range(9))
-    resto = (soma * 10) % 11
-    if resto == 10:
-        resto = 0
-    if resto != int(cpf[9]):
-        return False
+    return _digitos_cpf_validos(_normalizar_cpf(cpf))
+
+
+def validar_cpfs(cpfs: Iterable[Optional[str]]) -> Tuple[List[bool], List[str]]:
+    """
+    Valida vários CPFs de uma vez (importações, auditorias).
     
-    # Calcula segundo dígito verificador
-    soma = sum(int(cpf[i]) * (11 - i) for i in range(10))
-    resto = (soma * 10) % 11
-    if resto == 10:
-        resto = 0
-    if resto != int(cpf[10]):
-        return False
+    Equivale a chamar validar_cpf para cada valor, mas calcula os
+    dígitos verificadores por coluna: os CPFs são concatenados em um
+    bloco de bytes, cada posição vira uma coluna e as somas ponderadas
+    de todas as linhas saem de poucas operações sobre inteiros grandes.
     
-    return True
+    Args:
+        cpfs: CPFs com ou sem máscara (None é tratado como vazio)
+        
+    Returns:
+        Tuple[List[bool], List[str]]: Máscara de validade, na ordem de
+        entrada, e os CPFs normalizados (somente dígitos)
+    """
+    normalizados = _normalizar_cpfs([cpf or '' for cpf in cpfs])
+    validos = [False] * len(normalizados)
+    candidatos = [
+        indice for indice, digitos in enumerate(normalizados)
+        if len(digitos) == 11 and digitos not in _CPFS_REPETIDOS
+    ]
+    if not candidatos:
+        return validos, normalizados
+
+    bloco = ''.join([normalizados[indice] for indice in candidatos]).encode('ascii')
+    colunas = [bloco[posicao::11] for posicao in range(11)]
+    dv1 = bytes(map(_DV1_POR_SOMA.__getitem__, _somas_ponderadas(colunas, _PESOS_DV1)))
+    dv2 = bytes(map(_DV2_POR_SOMA.__getitem__, _somas_ponderadas(colunas, _PESOS_DV2)))
+    for indice, dv1_ok, dv2_ok in zip(
+        candidatos,
+        map(eq, dv1, colunas[9]),
+        map(eq, dv2, colunas[10])
+    ):
+        validos[indice] = dv1_ok and dv2_ok
+    return validos, normalizados
 
 
 def validar_email(email: str) -> bool:
@@ -68,8 +172,7 @@ def validar_email(email: str) -> bool:
     Returns:
         bool: True se o email é válido, False caso contrário
     """
-    padrao = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(padrao, email))
+    return _PADRAO_EMAIL.match(email) is not None
 
 
 def calcular_idade(data_nascimento: date) -> int:
@@ -92,114 +195,55 @@ def calcular_idade(data_nascimento: date) -> int:
     return idade
 
 
-def formatar_cpf(cpf: str) -> str:
-    """
-    Formata um CPF para exibição (XXX.XXX.XXX-XX).
-    
-    Args:
-        cpf: String contendo o CPF a ser formatado
-        
-    Returns:
-        str: CPF formatado
-    """
-    cpf = re.sub(r'[^0-9]', '', cpf)
-    return f'{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}'
-
-
-def formatar_telefone(telefone: str) -> str:
-    """
-    Formata um telefone para exibição ((XX) XXXXX-XXXX).
-    
-    Args:
-        telefone: String contendo o telefone a ser formatado
-        
-    Returns:
-        str: Telefone formatado
-    """
-    telefone = re.sub(r'[^0-9]', '', telefone)
-    if len(telefone) == 11:
-        return f'({telefone[:2]}) {telefone[2:7]}-{telefone[7:]}'
-    return telefone
-
-
-def formatar_moeda(valor: float) -> str:
-    """
-    Formata um valor monetário para exibição (R$ X.XXX,XX).
-    
-    Args:
-        valor: Valor a ser formatado
-        
-    Returns:
-        str: Valor formatado
-    """
-    return f'R$ {valor:,.2f}'.replace(',', '_').replace('.', ',').replace('_', '.')
-
-
 def salvar_foto(arquivo, pasta: str) -> Optional[str]:
     """
-    Salva uma foto no sistema de arquivos.
+    Agenda o processamento de uma foto enviada.
+    
+    O arquivo é gravado na fila de fotos e as variantes (800px,
+    miniatura e original) são geradas em segundo plano; a função
+    retorna sem esperar o processamento. O tipo é verificado pelo
+    conteúdo, não pela extensão do nome.
     
     Args:
-        arquivo: Arquivo de imagem enviado
+        arquivo: Arquivo de imagem enviado (FileStorage) ou fluxo binário
         pasta: Nome da pasta onde salvar o arquivo
         
     Returns:
-        Optional[str]: Caminho do arquivo salvo ou None se houver erro
+        Optional[str]: Caminho que a foto terá ou None se houver erro
     """
     if not arquivo:
         return None
     
-    # Verifica extensão
-    extensoes_permitidas = {'png', 'jpg', 'jpeg', 'gif'}
-    if not arquivo.filename.lower().endswith(tuple(extensoes_permitidas)):
-        return None
-    
     try:
-        # Gera nome seguro
-        nome_arquivo = secure_filename(arquivo.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        nome_final = f'{timestamp}_{nome_arquivo}'
-        
-        # Cria pasta se não existir
-        caminho_pasta = os.path.join(current_app.config['UPLOAD_FOLDER'], pasta)
-        os.makedirs(caminho_pasta, exist_ok=True)
-        
-        # Salva arquivo
-        caminho_arquivo = os.path.join(caminho_pasta, nome_final)
-        arquivo.save(caminho_arquivo)
-        
-        # Redimensiona imagem
-        with Image.open(caminho_arquivo) as img:
-            # Mantém proporção e redimensiona para no máximo 800x800
-            img.thumbnail((800, 800))
-            img.save(caminho_arquivo, optimize=True, quality=85)
-        
-        return os.path.join(pasta, nome_final)
+        fila = current_app.extensions['fila_fotos']
+        return fila.enfileirar(getattr(arquivo, 'stream', arquivo), secure_filename(pasta))
     
     except Exception as e:
         print(f'Erro ao salvar foto: {e}')
         return None
 
 
-def excluir_foto(caminho: str) -> bool:
+def excluir_foto(caminho: str, idade_minima: float = IDADE_MINIMA_EXCLUSAO) -> bool:
     """
-    Exclui uma foto do sistema de arquivos.
+    Exclui uma foto e suas variantes, se nenhum aluno ou usuário a usar.
+    
+    Fotos são compartilhadas por conteúdo; chame após o commit da troca
+    de foto_url, para que a referência antiga já não conte. Fotos
+    modificadas recentemente são mantidas (ver ``FilaFotos.excluir``).
     
     Args:
         caminho: Caminho do arquivo a ser excluído
+        idade_minima: Idade mínima, em segundos, dos arquivos apagados
         
     Returns:
-        bool: True se excluiu com sucesso, False caso contrário
+        bool: True se excluiu com sucesso, False caso contrário (inclusive
+        quando a foto ainda é referenciada ou foi modificada há pouco)
     """
     if not caminho:
         return False
     
     try:
-        caminho_completo = os.path.join(current_app.config['UPLOAD_FOLDER'], caminho)
-        if os.path.exists(caminho_completo):
-            os.remove(caminho_completo)
-            return True
-        return False
+        return current_app.extensions['fila_fotos'].excluir(caminho, idade_minima)
     except Exception as e:
         print(f'Erro ao excluir foto: {e}')
         return False
@@ -277,18 +321,178 @@ def paginar_resultados(
     }
 
 
+def codificar_cursor(valores: Sequence[Any]) -> str:
+    """
+    Codifica os valores da última linha de uma página em um cursor opaco.
+    
+    Args:
+        valores: Valores das colunas de ordenação da última linha
+        
+    Returns:
+        str: Cursor em base64 seguro para URLs
+    """
+    dados = [
+        valor.isoformat() if isinstance(valor, (datetime, date)) else valor
+        for valor in valores
+    ]
+    texto = json.dumps(dados, separators=(',', ':'))
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor: str, colunas: Sequence[Any]) -> List[Any]:
+    """
+    Decodifica um cursor gerado por codificar_cursor.
+    
+    Args:
+        cursor: Cursor recebido do cliente
+        colunas: Colunas de ordenação usadas na paginação
+        
+    Returns:
+        List[Any]: Valores convertidos para os tipos das colunas
+        
+    Raises:
+        ValueError: Se o cursor for inválido
+    """
+    try:
+        texto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        valores = json.loads(texto)
+    except (ValueError, TypeError):
+        raise ValueError('Cursor inválido')
+    
+    if not isinstance(valores, list) or len(valores) != len(colunas):
+        raise ValueError('Cursor inválido')
+    
+    convertidos = []
+    for coluna, valor in zip(colunas, valores):
+        try:
+            tipo = coluna.type.python_type
+            if tipo is datetime:
+                valor = datetime.fromisoformat(valor)
+            elif tipo is date:
+                valor = date.fromisoformat(valor)
+            elif tipo is int:
+                valor = int(valor)
+        except (ValueError, TypeError):
+            raise ValueError('Cursor inválido')
+        convertidos.append(valor)
+    return convertidos
+
+
+def obter_parametros_paginacao() -> Tuple[Optional[str], int, bool]:
+    """
+    Lê os parâmetros de paginação por cursor da requisição atual.
+    
+    Returns:
+        Tuple[Optional[str], int, bool]: Cursor, limite e se o total
+        deve ser calculado
+    """
+    limite = request.args.get(
+        'limite',
+        current_app.config['ITEMS_PER_PAGE'],
+        type=int
+    )
+    limite = max(1, min(limite, current_app.config['MAX_ITEMS_PER_PAGE']))
+    incluir_total = request.args.get('total', '').lower() in ('1', 'true', 'sim')
+    return request.args.get('cursor') or None, limite, incluir_total
+
+
+def paginar_por_cursor(
+    query,
+    colunas: Sequence[Any],
+    cursor: Optional[str] = None,
+    limite: int = 50,
+    incluir_total: bool = False,
+    serializar: Optional[Callable[[Any], Dict[str, Any]]] = None,
+    decrescente: bool = True
+) -> Dict[str, Any]:
+    """
+    Pagina resultados por cursor (keyset), em ordem decrescente ou crescente.
+    
+    Diferente de paginar_resultados, não usa OFFSET nem executa COUNT(*)
+    a cada página: a próxima página começa logo após os valores das
+    colunas de ordenação da última linha entregue. A última coluna deve
+    ser única (normalmente a chave primária) para a ordenação ser estável.
+    
+    Args:
+        query: Query do SQLAlchemy
+        colunas: Colunas de ordenação, da mais significativa à desempate
+        cursor: Cursor retornado na página anterior
+        limite: Quantidade máxima de itens por página
+        incluir_total: Se True, inclui o total de registros (executa COUNT)
+        serializar: Função que converte cada item em dicionário
+        decrescente: Se False, ordena do menor para o maior
+        
+    Returns:
+        Dict[str, Any]: Itens da página, cursor da próxima página e,
+        opcionalmente, o total
+        
+    Raises:
+        ValueError: Se o cursor for inválido
+    """
+    serializar = serializar or (lambda item: item.to_dict())
+    total = query.order_by(None).count() if incluir_total else None
+    
+    if cursor:
+        valores = decodificar_cursor(cursor, colunas)
+        # Expande (a, b) < (x, y) em a < x OR (a = x AND b < y)
+        condicoes = []
+        for i, coluna in enumerate(colunas):
+            termos = [colunas[j] == valores[j] for j in range(i)]
+            termos.append(coluna < valores[i] if decrescente else coluna > valores[i])
+            condicoes.append(and_(*termos))
+        query = query.filter(or_(*condicoes))
+    
+    itens = query.order_by(
+        *[coluna.desc() if decrescente else coluna.asc() for coluna in colunas]
+    ).limit(limite + 1).all()
+    
+    proximo_cursor = None
+    if len(itens) > limite:
+        itens = itens[:limite]
+        proximo_cursor = codificar_cursor(
+            [getattr(itens[-1], coluna.key) for coluna in colunas]
+        )
+    
+    resultado = {
+        'items': [serializar(item) for item in itens],
+        'next_cursor': proximo_cursor
+    }
+    if incluir_total:
+        resultado['total'] = total
+    return resultado
+
+
+# Operadores aceitos por filtrar_query além da igualdade
+OPERADORES_FILTRO = {
+    '==': eq,
+    '>=': ge,
+    '<=': le,
+    '>': gt,
+    '<': lt
+}
+
+# Maior caractere Unicode: limite superior de uma busca por prefixo
+_FIM_PREFIXO = chr(0x10FFFF)
+
+
 def filtrar_query(
     query,
     filtros: Dict[str, Any],
-    mapeamento_campos: Dict[str, str]
+    mapeamento_campos: Dict[str, Any]
 ) -> Any:
     """
     Aplica filtros em uma query do SQLAlchemy.
     
+    Cada filtro é uma comparação direta com a coluna, para que o banco
+    possa usar os índices; o prefixo vira um intervalo
+    (coluna >= 'abc' AND coluna < 'abc' + U+10FFFF) em vez de LIKE.
+    
     Args:
         query: Query base
         filtros: Dicionário com filtros a serem aplicados
-        mapeamento_campos: Mapeamento entre nomes dos filtros e campos do modelo
+        mapeamento_campos: Mapeamento entre nomes dos filtros e campos do
+            modelo; o valor pode ser a coluna ou um par (coluna, operador),
+            com operador '==', '>=', '<=', '>', '<' ou 'prefixo'
         
     Returns:
         Any: Query com filtros aplicados
@@ -296,10 +500,19 @@ def filtrar_query(
     for campo, valor in filtros.items():
         if valor and campo in mapeamento_campos:
             campo_modelo = mapeamento_campos[campo]
-            if isinstance(valor, str) and '%' in valor:
+            operador = '=='
+            if isinstance(campo_modelo, tuple):
+                campo_modelo, operador = campo_modelo
+            
+            if operador == 'prefixo':
+                query = query.filter(
+                    campo_modelo >= valor,
+                    campo_modelo < valor + _FIM_PREFIXO
+                )
+            elif operador == '==' and isinstance(valor, str) and '%' in valor:
                 query = query.filter(campo_modelo.ilike(valor))
             else:
-                query = query.filter(campo_modelo == valor)
+                query = query.filter(OPERADORES_FILTRO[operador](campo_modelo, valor))
     return query
 
 
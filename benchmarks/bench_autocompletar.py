@@ -0,0 +1,99 @@
+"""Memória e latência do índice de autocompletar de alunos.
+
+Uso: ``python benchmarks/bench_autocompletar.py [quantidade]``
+
+Monta o índice com alunos sintéticos (nomes brasileiros comuns, CPFs
+aleatórios) e mede a memória alocada com ``tracemalloc``, o tempo de
+montagem, a latência de consultas típicas da catraca e a de uma
+atualização incremental.
+"""
+
+import os
+import random
+import sys
+import time
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.autocompletar import IndiceAutocompletar  # noqa: E402
+
+PRENOMES = [
+    'Ana', 'Maria', 'João', 'José', 'Pedro', 'Lucas', 'Gabriel', 'Juliana',
+    'Fernanda', 'Carlos', 'Paulo', 'Mariana', 'Rafael', 'Bruna', 'Letícia',
+    'Mateus', 'Camila', 'Thiago', 'Beatriz', 'Gustavo', 'Larissa', 'Felipe',
+    'Amanda', 'Rodrigo', 'Patrícia', 'Diego', 'Vitória', 'Eduardo', 'Aline',
+    'Henrique', 'Natália', 'Vinícius', 'Isabela', 'Leonardo', 'Júlia',
+]
+SOBRENOMES = [
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves',
+    'Pereira', 'Lima', 'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho',
+    'Almeida', 'Lopes', 'Soares', 'Fernandes', 'Vieira', 'Barbosa', 'Rocha',
+    'Dias', 'Nascimento', 'Andrade', 'Moreira', 'Nunes', 'Marques', 'Machado',
+    'Mendes', 'Freitas', 'Cardoso', 'Ramos', 'Gonçalves', 'Santana', 'Teixeira',
+]
+
+
+def gerar_alunos(quantidade, aleatorio):
+    """Tuplas (id, nome, cpf) com nomes de 2 a 4 palavras."""
+    for aluno_id in range(1, quantidade + 1):
+        nome = ' '.join(
+            [aleatorio.choice(PRENOMES)]
+            + aleatorio.sample(SOBRENOMES, aleatorio.randint(1, 3))
+        )
+        cpf = f'{aleatorio.randrange(10**11):011d}'
+        yield aluno_id, nome, cpf
+
+
+def medir_us(funcao, repeticoes=2000):
+    """Melhor média de 5 rodadas, em microssegundos."""
+    return min(timeit.repeat(funcao, number=repeticoes, repeat=5)) / repeticoes * 1e6
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    alunos = list(gerar_alunos(quantidade, random.Random(42)))
+    inicio = time.perf_counter()
+    IndiceAutocompletar(ttl=0).carregar_linhas(alunos)
+    montagem = time.perf_counter() - inicio
+    del alunos
+
+    # Os nomes são criados com o rastreamento ligado, como ao ler do banco
+    tracemalloc.start()
+    indice = IndiceAutocompletar(ttl=0)
+    indice.carregar_linhas(gerar_alunos(quantidade, random.Random(42)))
+    atual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f'{quantidade} alunos, {len(indice._palavras)} palavras indexadas')
+    print(f'montagem          {montagem * 1000:8.1f} ms')
+    print(f'memória do índice {atual / 2**20:8.1f} MiB ({atual / quantidade:.0f} B/aluno)')
+    print(f'pico na montagem  {pico / 2**20:8.1f} MiB')
+
+    cpf = f'{indice._cpfs[len(indice._cpfs) // 2]:011d}'
+    consultas = [
+        ('nome, 1 letra', 'm'),
+        ('nome, 3 letras', 'mar'),
+        ('nome e sobrenome', 'joao sil'),
+        ('sobrenome raro', 'nascimento gon'),
+        ('CPF, 3 dígitos', cpf[:3]),
+        ('CPF completo', f'{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}'),
+        ('sem resultado', 'xyz'),
+    ]
+    for nome, termo in consultas:
+        print(f'{nome:<18}{medir_us(lambda: indice.buscar(termo)):8.1f} µs')
+
+    proximo = [quantidade]
+
+    def inserir_e_remover():
+        proximo[0] += 1
+        indice.atualizar(proximo[0], 'Maria Silva Costa', '52998224725')
+        indice.remover(proximo[0])
+
+    print(f'{"inserir + remover":<18}{medir_us(inserir_e_remover, 200):8.1f} µs')
+
+
+if __name__ == '__main__':
+    main()
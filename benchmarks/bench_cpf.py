@@ -0,0 +1,80 @@
+"""Benchmark da validação de CPFs: individual x em lote.
+
+Uso: ``python benchmarks/bench_cpf.py [quantidade]``
+
+Compara a implementação anterior de ``validar_cpf`` (regex e somas com
+geradores a cada chamada), a atual chamada em laço e ``validar_cpfs``.
+"""
+
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.utils import validar_cpf, validar_cpfs  # noqa: E402
+
+
+def validar_cpf_anterior(cpf: str) -> bool:
+    """Implementação anterior, mantida como referência."""
+    cpf = re.sub(r'[^0-9]', '', cpf)
+    if len(cpf) != 11:
+        return False
+    if len(set(cpf)) == 1:
+        return False
+    soma = sum(int(cpf[i]) * (10 - i) for i in range(9))
+    resto = (soma * 10) % 11
+    if resto == 10:
+        resto = 0
+    if resto != int(cpf[9]):
+        return False
+    soma = sum(int(cpf[i]) * (11 - i) for i in range(10))
+    resto = (soma * 10) % 11
+    if resto == 10:
+        resto = 0
+    return resto == int(cpf[10])
+
+
+def gerar_cpfs(quantidade: int) -> list:
+    """Gera CPFs aleatórios, metade válidos, metade com máscara."""
+    aleatorio = random.Random(42)
+    cpfs = []
+    for _ in range(quantidade):
+        digitos = [aleatorio.randrange(10) for _ in range(9)]
+        for pesos in (range(10, 1, -1), range(11, 1, -1)):
+            soma = sum(p * d for p, d in zip(pesos, digitos))
+            digitos.append((soma * 10 % 11) % 10)
+        if aleatorio.random() < 0.5:
+            digitos[-1] = (digitos[-1] + 1) % 10
+        cpf = ''.join(map(str, digitos))
+        if aleatorio.random() < 0.5:
+            cpf = f'{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}'
+        cpfs.append(cpf)
+    return cpfs
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    cpfs = gerar_cpfs(quantidade)
+    assert validar_cpfs(cpfs)[0] == [validar_cpf_anterior(cpf) for cpf in cpfs]
+
+    casos = {
+        'anterior (laço)': lambda: [validar_cpf_anterior(cpf) for cpf in cpfs],
+        'validar_cpf (laço)': lambda: [validar_cpf(cpf) for cpf in cpfs],
+        'validar_cpfs (lote)': lambda: validar_cpfs(cpfs),
+    }
+    base = None
+    print(f'{quantidade} CPFs, melhor de 5 execuções')
+    for nome, funcao in casos.items():
+        segundos = min(timeit.repeat(funcao, number=1, repeat=5))
+        base = base or segundos
+        print(
+            f'{nome:<22} {segundos * 1000:8.1f} ms '
+            f'{quantidade / segundos:12,.0f} CPFs/s  {base / segundos:5.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
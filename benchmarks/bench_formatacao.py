@@ -0,0 +1,88 @@
+"""Micro-benchmarks dos formatadores de backend.formatacao.
+
+Uso: ``python benchmarks/bench_formatacao.py [quantidade]``
+
+Compara as implementações anteriores (regex e ``replace`` encadeados a
+cada chamada) com as atuais, chamadas em laço e em lote.
+"""
+
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.formatacao import (  # noqa: E402
+    formatar_cpf, formatar_cpfs, formatar_moeda, formatar_moedas, formatar_telefone
+)
+from backend.utils import validar_email  # noqa: E402
+
+
+def formatar_cpf_anterior(cpf):
+    cpf = re.sub(r'[^0-9]', '', cpf)
+    return f'{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}'
+
+
+def formatar_telefone_anterior(telefone):
+    telefone = re.sub(r'[^0-9]', '', telefone)
+    if len(telefone) == 11:
+        return f'({telefone[:2]}) {telefone[2:7]}-{telefone[7:]}'
+    return telefone
+
+
+def formatar_moeda_anterior(valor):
+    return f'R$ {valor:,.2f}'.replace(',', '_').replace('.', ',').replace('_', '.')
+
+
+def validar_email_anterior(email):
+    padrao = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    return bool(re.match(padrao, email))
+
+
+def medir(funcao, quantidade):
+    """Melhor tempo de 5 execuções, em ms."""
+    return min(timeit.repeat(funcao, number=1, repeat=5)) * 1000
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    aleatorio = random.Random(42)
+    cpfs = [''.join(aleatorio.choices('0123456789', k=11)) for _ in range(quantidade)]
+    telefones = [f'(11) 9{aleatorio.randrange(10**8):08d}' for _ in range(quantidade)]
+    valores = [round(aleatorio.uniform(0, 10_000), 2) for _ in range(quantidade)]
+    emails = [f'aluno{i}@gymflow.com' for i in range(quantidade)]
+
+    casos = [
+        ('formatar_cpf', [
+            ('anterior', lambda: [formatar_cpf_anterior(c) for c in cpfs]),
+            ('laço', lambda: [formatar_cpf(c) for c in cpfs]),
+            ('lote', lambda: formatar_cpfs(cpfs)),
+        ]),
+        ('formatar_telefone', [
+            ('anterior', lambda: [formatar_telefone_anterior(t) for t in telefones]),
+            ('laço', lambda: [formatar_telefone(t) for t in telefones]),
+        ]),
+        ('formatar_moeda', [
+            ('anterior', lambda: [formatar_moeda_anterior(v) for v in valores]),
+            ('laço', lambda: [formatar_moeda(v) for v in valores]),
+            ('lote', lambda: formatar_moedas(valores)),
+        ]),
+        ('validar_email', [
+            ('anterior', lambda: [validar_email_anterior(e) for e in emails]),
+            ('laço', lambda: [validar_email(e) for e in emails]),
+        ]),
+    ]
+
+    print(f'{quantidade} valores, melhor de 5 execuções')
+    for nome, variantes in casos:
+        base = None
+        for variante, funcao in variantes:
+            ms = medir(funcao, quantidade)
+            base = base or ms
+            print(f'{nome:<18} {variante:<9} {ms:8.1f} ms  {base / ms:5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""indices de consulta
+
+Índices compostos nas colunas usadas em filtros do dashboard, da
+paginação e dos pagamentos, e unicidade de (aluno_id, mes_referencia).
+
+As tabelas são criadas por db.create_all() em init_db, que já cria os
+índices em bancos novos; por isso só são criados os que faltam.
+
+Revision ID: 4563a8d18f21
+Revises: 
+Create Date: 2026-10-18 20:01:58.999980
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4563a8d18f21'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+INDICES = [
+    ('alunos', 'ix_alunos_status_data_matricula', ['status', 'data_matricula'], False),
+    ('alunos', 'ix_alunos_data_matricula', ['data_matricula'], False),
+    ('matriculas_turmas', 'ix_matriculas_turmas_turma_aluno', ['turma_id', 'aluno_id'], False),
+    ('matriculas_turmas', 'ix_matriculas_turmas_aluno', ['aluno_id'], False),
+    ('pagamentos', 'uq_pagamentos_aluno_mes', ['aluno_id', 'mes_referencia'], True),
+    ('pagamentos', 'ix_pagamentos_mes_status', ['mes_referencia', 'status'], False),
+    ('presencas', 'ix_presencas_turma_data', ['turma_id', 'data'], False),
+    ('presencas', 'ix_presencas_aluno_data', ['aluno_id', 'data'], False),
+]
+
+
+def _indices_existentes(tabela):
+    inspetor = sa.inspect(op.get_bind())
+    return {indice['name'] for indice in inspetor.get_indexes(tabela)}
+
+
+def _verificar_pagamentos_duplicados():
+    """
+    Recusa a migração se houver mais de um pagamento por aluno e mês.
+
+    A cobrança antiga (ler e depois inserir) podia gravar duplicatas, que
+    impedem a criação de uq_pagamentos_aluno_mes. Como não há como saber
+    qual dos pagamentos vale, a migração para antes de criar qualquer
+    índice e lista os pares para correção manual.
+    """
+    if 'uq_pagamentos_aluno_mes' in _indices_existentes('pagamentos'):
+        return
+    duplicados = op.get_bind().execute(sa.text(
+        'SELECT aluno_id, mes_referencia, count(*) FROM pagamentos '
+        'GROUP BY aluno_id, mes_referencia HAVING count(*) > 1 '
+        'ORDER BY aluno_id, mes_referencia'
+    )).fetchall()
+    if duplicados:
+        pares = '\n'.join(
+            f'  aluno_id={aluno_id} mes_referencia={mes} ({total} pagamentos)'
+            for aluno_id, mes, total in duplicados
+        )
+        raise RuntimeError(
+            'Há pagamentos duplicados por aluno e mês; mantenha um pagamento '
+            f'de cada par antes de rodar a migração de novo:\n{pares}'
+        )
+
+
+def upgrade():
+    _verificar_pagamentos_duplicados()
+    for tabela, nome, colunas, unico in INDICES:
+        if nome not in _indices_existentes(tabela):
+            op.create_index(nome, tabela, colunas, unique=unico)
+
+
+def downgrade():
+    for tabela, nome, colunas, unico in reversed(INDICES):
+        if nome in _indices_existentes(tabela):
+            op.drop_index(nome, table_name=tabela)
@@ -0,0 +1,40 @@
+"""senha hash 255
+
+Hashes scrypt do werkzeug têm cerca de 160 caracteres, mais que os 128
+da coluna original; aumenta para 255 para comportar métodos e salts
+configuráveis.
+
+Revision ID: 9b2e61c4d7a3
+Revises: 4563a8d18f21
+Create Date: 2026-10-18 21:40:12.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b2e61c4d7a3'
+down_revision = '4563a8d18f21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('usuarios') as batch_op:
+        batch_op.alter_column(
+            '_senha_hash',
+            existing_type=sa.String(length=128),
+            type_=sa.String(length=255),
+            existing_nullable=False
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('usuarios') as batch_op:
+        batch_op.alter_column(
+            '_senha_hash',
+            existing_type=sa.String(length=255),
+            type_=sa.String(length=128),
+            existing_nullable=False
+        )
@@ -0,0 +1,111 @@
+"""frequencia presencas
+
+Tabelas agregadas de presenças (por turma e dia, por aluno e semana e
+por turma e hora) usadas por /api/relatorios/frequencia, preenchidas a
+partir das presenças existentes. Dias, semanas e horas seguem o horário
+local (OCUPACAO_FUSO_HORAS). O SQL do preenchimento fica nesta migração,
+sem depender de backend.frequencia.
+
+Revision ID: a8d41f6b2c95
+Revises: f7c2e9d03a18
+Create Date: 2026-10-19 02:14:52.607314
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from flask import current_app
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8d41f6b2c95'
+down_revision = 'f7c2e9d03a18'
+branch_labels = None
+depends_on = None
+
+
+def _periodos(dialeto, fuso_horas):
+    """Expressões de dia, semana (segunda-feira) e hora locais de presencas.data."""
+    if dialeto == 'sqlite':
+        deslocamento = f"'{fuso_horas:+d} hours'"
+        return (
+            f'date(data, {deslocamento})',
+            f"date(data, {deslocamento}, 'weekday 0', '-6 days')",
+            f"CAST(strftime('%H', data, {deslocamento}) AS INTEGER)"
+        )
+    local = f"(data + interval '{fuso_horas} hours')"
+    return (
+        f'CAST({local} AS DATE)',
+        f"CAST(date_trunc('week', {local}) AS DATE)",
+        f'CAST(extract(hour FROM {local}) AS INTEGER)'
+    )
+
+
+def _preencher(conexao):
+    """Preenche os agregados com todas as presenças já gravadas."""
+    dialeto = conexao.dialect.name
+    if dialeto not in ('sqlite', 'postgresql'):
+        # Sem expressões de data para o banco: use flask gymflow rollup-presencas
+        return
+    dia, semana, hora = _periodos(dialeto, int(current_app.config.get('OCUPACAO_FUSO_HORAS', -3)))
+    entradas = "sum(CASE WHEN tipo = 'entrada' THEN 1 ELSE 0 END)"
+    saidas = "sum(CASE WHEN tipo = 'saida' THEN 1 ELSE 0 END)"
+    for tabela in ('frequencia_turma_dia', 'frequencia_aluno_semana', 'ocupacao_hora'):
+        op.execute(f'DELETE FROM {tabela}')
+    op.execute(
+        f'INSERT INTO frequencia_turma_dia (turma_id, dia, entradas, saidas) '
+        f'SELECT turma_id, {dia}, {entradas}, {saidas} FROM presencas '
+        f'GROUP BY turma_id, {dia}'
+    )
+    op.execute(
+        f'INSERT INTO ocupacao_hora (turma_id, dia, hora, entradas, saidas) '
+        f'SELECT turma_id, {dia}, {hora}, {entradas}, {saidas} FROM presencas '
+        f'GROUP BY turma_id, {dia}, {hora}'
+    )
+    op.execute(
+        f'INSERT INTO frequencia_aluno_semana (aluno_id, semana, visitas) '
+        f"SELECT aluno_id, {semana}, count(*) FROM presencas WHERE tipo = 'entrada' "
+        f'GROUP BY aluno_id, {semana}'
+    )
+
+
+def upgrade():
+    conexao = op.get_bind()
+    tabelas = set(sa.inspect(conexao).get_table_names())
+
+    if 'frequencia_turma_dia' not in tabelas:
+        op.create_table(
+            'frequencia_turma_dia',
+            sa.Column('turma_id', sa.Integer(), sa.ForeignKey('turmas.id'), nullable=False),
+            sa.Column('dia', sa.Date(), nullable=False),
+            sa.Column('entradas', sa.Integer(), nullable=False),
+            sa.Column('saidas', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('turma_id', 'dia')
+        )
+    if 'frequencia_aluno_semana' not in tabelas:
+        op.create_table(
+            'frequencia_aluno_semana',
+            sa.Column('aluno_id', sa.Integer(), sa.ForeignKey('alunos.id'), nullable=False),
+            sa.Column('semana', sa.Date(), nullable=False),
+            sa.Column('visitas', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('aluno_id', 'semana')
+        )
+    if 'ocupacao_hora' not in tabelas:
+        op.create_table(
+            'ocupacao_hora',
+            sa.Column('turma_id', sa.Integer(), sa.ForeignKey('turmas.id'), nullable=False),
+            sa.Column('dia', sa.Date(), nullable=False),
+            sa.Column('hora', sa.Integer(), nullable=False),
+            sa.Column('entradas', sa.Integer(), nullable=False),
+            sa.Column('saidas', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('turma_id', 'dia', 'hora')
+        )
+        op.create_index('ix_ocupacao_hora_dia', 'ocupacao_hora', ['dia', 'hora'])
+
+    _preencher(conexao)
+
+
+def downgrade():
+    op.drop_index('ix_ocupacao_hora_dia', table_name='ocupacao_hora')
+    op.drop_table('ocupacao_hora')
+    op.drop_table('frequencia_aluno_semana')
+    op.drop_table('frequencia_turma_dia')
@@ -0,0 +1,34 @@
+"""indice data presencas
+
+Índice em presencas.data, usado para montar o contador de ocupação com
+as presenças do dia.
+
+Revision ID: b3e7c05d9f12
+Revises: a8d41f6b2c95
+Create Date: 2026-10-19 03:02:17.845120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e7c05d9f12'
+down_revision = 'a8d41f6b2c95'
+branch_labels = None
+depends_on = None
+
+
+def _indices_existentes():
+    inspetor = sa.inspect(op.get_bind())
+    return {indice['name'] for indice in inspetor.get_indexes('presencas')}
+
+
+def upgrade():
+    if 'ix_presencas_data' not in _indices_existentes():
+        op.create_index('ix_presencas_data', 'presencas', ['data'])
+
+
+def downgrade():
+    if 'ix_presencas_data' in _indices_existentes():
+        op.drop_index('ix_presencas_data', table_name='presencas')
@@ -0,0 +1,36 @@
+"""versao token usuario
+
+Versão dos tokens de cada usuário, gravada nos JWT emitidos e
+incrementada quando tipo, status, email ou senha mudam.
+
+Revision ID: c1f7a9e02b54
+Revises: 9b2e61c4d7a3
+Create Date: 2026-10-18 22:25:47.901126
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c1f7a9e02b54'
+down_revision = '9b2e61c4d7a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    colunas = {coluna['name'] for coluna in sa.inspect(op.get_bind()).get_columns('usuarios')}
+    if 'versao_token' not in colunas:
+        with op.batch_alter_table('usuarios') as batch_op:
+            batch_op.add_column(sa.Column(
+                'versao_token',
+                sa.Integer(),
+                server_default='0',
+                nullable=False
+            ))
+
+
+def downgrade():
+    with op.batch_alter_table('usuarios') as batch_op:
+        batch_op.drop_column('versao_token')
@@ -0,0 +1,75 @@
+"""filtros alunos
+
+Nome normalizado (sem acentos, minúsculo) dos alunos para busca por
+prefixo e ordenação por nome, e índices usados pelos filtros de
+/api/alunos.
+
+Revision ID: e3d5b8a41c76
+Revises: c1f7a9e02b54
+Create Date: 2026-10-19 00:12:09.514237
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from backend.formatacao import normalizar_texto
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3d5b8a41c76'
+down_revision = 'c1f7a9e02b54'
+branch_labels = None
+depends_on = None
+
+
+INDICES = [
+    ('ix_alunos_nome_normalizado', ['nome_normalizado']),
+    ('ix_alunos_plano_id', ['plano_id']),
+]
+
+
+def upgrade():
+    conexao = op.get_bind()
+    inspetor = sa.inspect(conexao)
+    colunas = {coluna['name'] for coluna in inspetor.get_columns('alunos')}
+    if 'nome_normalizado' not in colunas:
+        with op.batch_alter_table('alunos') as batch_op:
+            batch_op.add_column(sa.Column(
+                'nome_normalizado',
+                sa.String(length=100),
+                server_default='',
+                nullable=False
+            ))
+
+    alunos = sa.table(
+        'alunos',
+        sa.column('id', sa.Integer),
+        sa.column('nome', sa.String),
+        sa.column('nome_normalizado', sa.String)
+    )
+    pendentes = conexao.execute(
+        sa.select(alunos.c.id, alunos.c.nome).where(alunos.c.nome_normalizado == '')
+    ).all()
+    if pendentes:
+        conexao.execute(
+            alunos.update()
+            .where(alunos.c.id == sa.bindparam('aluno_id'))
+            .values(nome_normalizado=sa.bindparam('normalizado')),
+            [
+                {'aluno_id': aluno_id, 'normalizado': normalizar_texto(nome or '')}
+                for aluno_id, nome in pendentes
+            ]
+        )
+
+    existentes = {indice['name'] for indice in sa.inspect(conexao).get_indexes('alunos')}
+    for nome, colunas_indice in INDICES:
+        if nome not in existentes:
+            op.create_index(nome, 'alunos', colunas_indice)
+
+
+def downgrade():
+    existentes = {indice['name'] for indice in sa.inspect(op.get_bind()).get_indexes('alunos')}
+    for nome, colunas_indice in reversed(INDICES):
+        if nome in existentes:
+            op.drop_index(nome, table_name='alunos')
+    with op.batch_alter_table('alunos') as batch_op:
+        batch_op.drop_column('nome_normalizado')
@@ -0,0 +1,106 @@
+"""busca alunos
+
+Índice de busca textual de alunos: tabela FTS5 alunos_busca e triggers
+de sincronização no SQLite, índice de trigramas no PostgreSQL.
+
+O SQL é uma cópia do que backend.busca usava nesta revisão, para que a
+migração não mude se o módulo mudar; alterações no índice vão em novas
+migrações.
+
+Revision ID: f7c2e9d03a18
+Revises: e3d5b8a41c76
+Create Date: 2026-10-19 01:03:41.220518
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7c2e9d03a18'
+down_revision = 'e3d5b8a41c76'
+branch_labels = None
+depends_on = None
+
+
+_DIGITOS_CPF = "replace(replace(replace(new.cpf, '.', ''), '-', ''), ' ', '')"
+_DIGITOS_TELEFONE = (
+    "replace(replace(replace(replace(replace(coalesce(new.telefone, ''), "
+    "'(', ''), ')', ''), ' ', ''), '-', ''), '+', '')"
+)
+
+_INSERIR_NO_INDICE = f"""
+    INSERT INTO alunos_busca (rowid, nome, email, cpf, telefone)
+    VALUES (
+        new.id,
+        new.nome,
+        new.email,
+        {_DIGITOS_CPF},
+        {_DIGITOS_TELEFONE} || ' ' || substr({_DIGITOS_TELEFONE}, 3)
+    );
+"""
+
+DDL_SQLITE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS alunos_busca USING fts5(
+        nome, email, cpf, telefone,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3 4'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS alunos_busca_insert AFTER INSERT ON alunos BEGIN
+        {_INSERIR_NO_INDICE}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS alunos_busca_update
+    AFTER UPDATE OF nome, email, cpf, telefone ON alunos BEGIN
+        DELETE FROM alunos_busca WHERE rowid = old.id;
+        {_INSERIR_NO_INDICE}
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS alunos_busca_delete AFTER DELETE ON alunos BEGIN
+        DELETE FROM alunos_busca WHERE rowid = old.id;
+    END
+    """,
+]
+
+SQL_POPULAR_SQLITE = f"""
+    INSERT INTO alunos_busca (rowid, nome, email, cpf, telefone)
+    SELECT id, nome, email,
+        {_DIGITOS_CPF.replace('new.', '')},
+        {_DIGITOS_TELEFONE.replace('new.', '')} || ' ' ||
+        substr({_DIGITOS_TELEFONE.replace('new.', '')}, 3)
+    FROM alunos
+"""
+
+DDL_POSTGRES = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    "CREATE INDEX IF NOT EXISTS ix_alunos_busca_trgm ON alunos USING gin ("
+    "(nome_normalizado || ' ' || lower(email) || ' ' || "
+    "translate(cpf, '.- ', '') || ' ' || "
+    "translate(coalesce(telefone, ''), '()- +', '')) gin_trgm_ops)",
+]
+
+
+def upgrade():
+    dialeto = op.get_bind().dialect.name
+    if dialeto == 'sqlite':
+        for comando in DDL_SQLITE:
+            op.execute(comando)
+        op.execute('DELETE FROM alunos_busca')
+        op.execute(SQL_POPULAR_SQLITE)
+    elif dialeto == 'postgresql':
+        for comando in DDL_POSTGRES:
+            op.execute(comando)
+
+
+def downgrade():
+    dialeto = op.get_bind().dialect.name
+    if dialeto == 'sqlite':
+        for trigger in ('insert', 'update', 'delete'):
+            op.execute(f'DROP TRIGGER IF EXISTS alunos_busca_{trigger}')
+        op.execute('DROP TABLE IF EXISTS alunos_busca')
+    elif dialeto == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_alunos_busca_trgm')
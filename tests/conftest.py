@@ -3,6 +3,7 @@
 import os
 import tempfile
 import pytest
+from sqlalchemy import event
 from backend import create_app
 from backend.models import db
 
@@ -67,6 +68,30 @@ def session(app):
         session.remove()
 
 
+@pytest.fixture(scope='function')
+def contador_queries(app):
+    """Fixture que registra os comandos SQL executados durante o teste."""
+    comandos = []
+    
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        comandos.append(statement)
+    
+    event.listen(db.engine, 'before_cursor_execute', registrar)
+    yield comandos
+    event.remove(db.engine, 'before_cursor_execute', registrar)
+
+
+@pytest.fixture(scope='function')
+def login_sessao(app):
+    """Fixture que autentica clientes de teste pela sessão do Flask-Login."""
+    def autenticar(usuario):
+        client = app.test_client()
+        with client.session_transaction() as sessao:
+            sessao['_user_id'] = str(usuario.id)
+        return client
+    return autenticar
+
+
 @pytest.fixture(scope='function')
 def auth_headers(app, client):
     """Fixture que cria headers de autenticação para testes."""
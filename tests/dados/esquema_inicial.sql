@@ -0,0 +1,145 @@
+-- Esquema criado por db.create_all() antes da primeira migração (revisão inicial).
+CREATE TABLE usuarios (
+	id INTEGER NOT NULL,
+	nome VARCHAR(100) NOT NULL,
+	email VARCHAR(120) NOT NULL,
+	_senha_hash VARCHAR(128) NOT NULL,
+	tipo VARCHAR(13) NOT NULL,
+	status VARCHAR(7) NOT NULL,
+	foto_url VARCHAR(200),
+	data_criacao DATETIME NOT NULL,
+	ultima_atualizacao DATETIME NOT NULL,
+	PRIMARY KEY (id),
+	UNIQUE (email)
+);
+CREATE TABLE planos (
+	id INTEGER NOT NULL,
+	nome VARCHAR(100) NOT NULL,
+	descricao TEXT,
+	valor FLOAT NOT NULL,
+	duracao_meses INTEGER NOT NULL,
+	ativo BOOLEAN,
+	data_criacao DATETIME,
+	data_atualizacao DATETIME,
+	PRIMARY KEY (id)
+);
+CREATE TABLE exercicios (
+	id INTEGER NOT NULL,
+	nome VARCHAR(100) NOT NULL,
+	detalhes TEXT,
+	grupo_muscular VARCHAR(50) NOT NULL,
+	equipamento VARCHAR(100),
+	nivel VARCHAR(13) NOT NULL,
+	data_criacao DATETIME,
+	data_atualizacao DATETIME,
+	PRIMARY KEY (id)
+);
+CREATE TABLE professores (
+	id INTEGER NOT NULL,
+	usuario_id INTEGER NOT NULL,
+	especialidade VARCHAR(50),
+	horario_disponivel VARCHAR(50),
+	status VARCHAR(7) NOT NULL,
+	data_criacao DATETIME NOT NULL,
+	ultima_atualizacao DATETIME NOT NULL,
+	PRIMARY KEY (id),
+	UNIQUE (usuario_id),
+	FOREIGN KEY(usuario_id) REFERENCES usuarios (id)
+);
+CREATE TABLE alunos (
+	id INTEGER NOT NULL,
+	nome VARCHAR(100) NOT NULL,
+	email VARCHAR(120) NOT NULL,
+	cpf VARCHAR(14) NOT NULL,
+	telefone VARCHAR(20),
+	data_nascimento DATE NOT NULL,
+	endereco VARCHAR(200),
+	foto_url VARCHAR(200),
+	altura FLOAT,
+	peso FLOAT,
+	objetivo VARCHAR(15),
+	observacoes TEXT,
+	status VARCHAR(8) NOT NULL,
+	data_matricula DATETIME NOT NULL,
+	ultima_atualizacao DATETIME NOT NULL,
+	plano_id INTEGER,
+	PRIMARY KEY (id),
+	UNIQUE (email),
+	UNIQUE (cpf),
+	FOREIGN KEY(plano_id) REFERENCES planos (id)
+);
+CREATE TABLE treinos (
+	id INTEGER NOT NULL,
+	aluno_id INTEGER NOT NULL,
+	professor_id INTEGER NOT NULL,
+	tipo VARCHAR(10) NOT NULL,
+	observacoes TEXT,
+	status VARCHAR(7) NOT NULL,
+	data_criacao DATETIME NOT NULL,
+	ultima_atualizacao DATETIME NOT NULL,
+	PRIMARY KEY (id),
+	FOREIGN KEY(aluno_id) REFERENCES alunos (id),
+	FOREIGN KEY(professor_id) REFERENCES professores (id)
+);
+CREATE TABLE turmas (
+	id INTEGER NOT NULL,
+	professor_id INTEGER NOT NULL,
+	modalidade VARCHAR(14) NOT NULL,
+	nivel VARCHAR(13) NOT NULL,
+	dia_semana INTEGER NOT NULL,
+	horario_inicio TIME NOT NULL,
+	horario_fim TIME NOT NULL,
+	capacidade_maxima INTEGER NOT NULL,
+	descricao TEXT,
+	status VARCHAR(7) NOT NULL,
+	data_criacao DATETIME NOT NULL,
+	ultima_atualizacao DATETIME NOT NULL,
+	PRIMARY KEY (id),
+	FOREIGN KEY(professor_id) REFERENCES professores (id)
+);
+CREATE TABLE pagamentos (
+	id INTEGER NOT NULL,
+	aluno_id INTEGER NOT NULL,
+	mes_referencia VARCHAR(7) NOT NULL,
+	status VARCHAR(9) NOT NULL,
+	data_pagamento DATETIME,
+	observacoes TEXT,
+	data_criacao DATETIME NOT NULL,
+	ultima_atualizacao DATETIME NOT NULL,
+	PRIMARY KEY (id),
+	FOREIGN KEY(aluno_id) REFERENCES alunos (id)
+);
+CREATE TABLE treino_exercicio (
+	id INTEGER NOT NULL,
+	treino_id INTEGER NOT NULL,
+	exercicio_id INTEGER NOT NULL,
+	series INTEGER NOT NULL,
+	repeticoes INTEGER NOT NULL,
+	carga FLOAT,
+	observacoes TEXT,
+	ordem INTEGER NOT NULL,
+	PRIMARY KEY (id),
+	FOREIGN KEY(treino_id) REFERENCES treinos (id),
+	FOREIGN KEY(exercicio_id) REFERENCES exercicios (id)
+);
+CREATE TABLE matriculas_turmas (
+	id INTEGER NOT NULL,
+	aluno_id INTEGER NOT NULL,
+	turma_id INTEGER NOT NULL,
+	status VARCHAR(7) NOT NULL,
+	data_matricula DATETIME NOT NULL,
+	ultima_atualizacao DATETIME NOT NULL,
+	PRIMARY KEY (id),
+	FOREIGN KEY(aluno_id) REFERENCES alunos (id),
+	FOREIGN KEY(turma_id) REFERENCES turmas (id)
+);
+CREATE TABLE presencas (
+	id INTEGER NOT NULL,
+	aluno_id INTEGER NOT NULL,
+	turma_id INTEGER NOT NULL,
+	data DATETIME NOT NULL,
+	tipo VARCHAR(7) NOT NULL,
+	PRIMARY KEY (id),
+	FOREIGN KEY(aluno_id) REFERENCES alunos (id),
+	FOREIGN KEY(turma_id) REFERENCES turmas (id)
+);
@@ -0,0 +1,115 @@
+"""Testes para o hash de senhas configurável e o login em pool."""
+
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from werkzeug.security import generate_password_hash
+from backend import create_app
+from backend.models import Usuario, db
+from backend.autenticacao import autenticar, VerificacaoIndisponivel
+
+
+@pytest.fixture
+def app():
+    """Fixture que cria uma instância do app para testes."""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def usuario(app):
+    """Fixture que cria um usuário com hash no formato antigo (scrypt)."""
+    usuario = Usuario(nome='Professor', email='prof@teste.com', tipo='professor')
+    usuario._senha_hash = generate_password_hash('senha123', method='scrypt')
+    db.session.add(usuario)
+    db.session.commit()
+    return usuario
+
+
+def test_senha_usa_metodo_configurado(app):
+    """Testa que novas senhas usam o método e salt da configuração."""
+    usuario = Usuario(nome='Teste', email='t@teste.com', tipo='gerente')
+    usuario.senha = 'senha123'
+
+    assert usuario._senha_hash.startswith('pbkdf2:sha256:1000$')
+    assert usuario.verificar_senha('senha123')
+    assert not usuario.precisa_rehash()
+
+    app.config['PASSWORD_SALT_LENGTH'] = 24
+    assert usuario.precisa_rehash()
+
+
+def test_rehash_no_login(usuario):
+    """Testa que o login refaz hashes com parâmetros antigos."""
+    assert usuario.precisa_rehash()
+
+    assert autenticar('prof@teste.com', 'errada') is None
+    assert usuario._senha_hash.startswith('scrypt:')
+
+    assert autenticar('prof@teste.com', 'senha123') is usuario
+    db.session.expire_all()
+    usuario = Usuario.query.filter_by(email='prof@teste.com').one()
+    assert usuario._senha_hash.startswith('pbkdf2:sha256:1000$')
+    assert not usuario.precisa_rehash()
+    assert autenticar('prof@teste.com', 'senha123') is usuario
+
+
+def test_metodo_sem_parametros_nao_causa_rehash(app, usuario):
+    """Testa que 'scrypt' equivale aos parâmetros padrão gravados no hash."""
+    app.config['PASSWORD_HASH_METHOD'] = 'scrypt'
+    assert not usuario.precisa_rehash()
+
+
+def test_login_recusado_com_fila_cheia(app, usuario, login_sessao, monkeypatch):
+    """Testa que, com o pool e a fila ocupados, o login é recusado sem calcular o hash."""
+    pool = mock.Mock(spec=ThreadPoolExecutor)
+    vagas = threading.BoundedSemaphore(1)
+    vagas.acquire()
+    monkeypatch.setattr('backend.autenticacao._executor', pool)
+    monkeypatch.setattr('backend.autenticacao._vagas', vagas)
+
+    with pytest.raises(VerificacaoIndisponivel):
+        autenticar('prof@teste.com', 'senha123')
+
+    client = login_sessao(usuario)
+    response = client.post('/api/login', json={
+        'email': 'prof@teste.com',
+        'senha': 'senha123'
+    })
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    pool.submit.assert_not_called()
+
+
+def test_login_aceito_espera_o_hash(app, usuario, monkeypatch):
+    """Testa que um login aceito termina mesmo com o pool ocupado, e libera a vaga."""
+    pool = ThreadPoolExecutor(max_workers=1)
+    vagas = threading.BoundedSemaphore(2)
+    monkeypatch.setattr('backend.autenticacao._executor', pool)
+    monkeypatch.setattr('backend.autenticacao._vagas', vagas)
+    liberar = threading.Event()
+    pool.submit(liberar.wait)
+    threading.Timer(0.2, liberar.set).start()
+
+    try:
+        assert autenticar('prof@teste.com', 'senha123') is usuario
+        assert vagas.acquire(blocking=False) and vagas.acquire(blocking=False)
+    finally:
+        liberar.set()
+        pool.shutdown()
+
+
+def test_login_com_senha_invalida(usuario, login_sessao):
+    """Testa a resposta 401 para credenciais inválidas."""
+    client = login_sessao(usuario)
+    response = client.post('/api/login', json={
+        'email': 'prof@teste.com',
+        'senha': 'errada'
+    })
+    assert response.status_code == 401
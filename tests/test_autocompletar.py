@@ -0,0 +1,174 @@
+"""Testes para o autocompletar de alunos em memória."""
+
+import io
+import pytest
+from datetime import date
+from backend import create_app
+from backend.autocompletar import IndiceAutocompletar
+from backend.models import Usuario, Aluno, criar_gerente_padrao, db
+
+
+@pytest.fixture
+def app():
+    """Fixture que cria uma instância do app para testes."""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        criar_gerente_padrao()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app, login_sessao):
+    """Fixture com um cliente autenticado como gerente."""
+    return login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+
+
+@pytest.fixture
+def alunos(app):
+    """Fixture que cria alguns alunos e recarrega o índice."""
+    dados = [
+        ('João Silva', '529.982.247-25', 'ativo'),
+        ('Joana Sá', '123.456.789-09', 'ativo'),
+        ('Maria João Costa', '111.444.777-35', 'ativo'),
+        ('Joaquim Inativo', '987.654.321-00', 'inativo'),
+    ]
+    alunos = []
+    for i, (nome, cpf, status) in enumerate(dados):
+        aluno = Aluno(
+            nome=nome,
+            email=f'aluno{i}@teste.com',
+            cpf=cpf,
+            data_nascimento=date(2000, 1, 1),
+            status=status
+        )
+        db.session.add(aluno)
+        alunos.append(aluno)
+    db.session.commit()
+    app.extensions['autocompletar'].carregar()
+    return alunos
+
+
+def ids(resultados):
+    """Ids dos alunos de uma lista de sugestões."""
+    return [resultado['id'] for resultado in resultados]
+
+
+def test_busca_por_prefixo_de_palavra():
+    """Testa prefixos de qualquer palavra do nome, sem acentos."""
+    indice = IndiceAutocompletar(ttl=0)
+    indice.carregar_linhas([
+        (1, 'João Silva', '52998224725'),
+        (2, 'Joana Sá', '12345678909'),
+        (3, 'Maria João Costa', '11144477735'),
+    ])
+
+    assert ids(indice.buscar('jo')) == [2, 1, 3]
+    assert ids(indice.buscar('JOÃO')) == [1, 3]
+    assert ids(indice.buscar('silv')) == [1]
+    assert ids(indice.buscar('joao co')) == [3]
+    assert ids(indice.buscar('jo', limite=1)) == [2]
+    assert indice.buscar('xyz') == []
+    assert indice.buscar(' .- ') == []
+
+
+def test_busca_por_prefixo_de_cpf():
+    """Testa prefixos do CPF, com ou sem máscara."""
+    indice = IndiceAutocompletar(ttl=0)
+    indice.carregar_linhas([
+        (1, 'João Silva', '529.982.247-25'),
+        (2, 'Joana Sá', '052.998.224-70'),
+        (3, 'Sem CPF', '123'),
+    ])
+
+    assert indice.buscar('529.98') == [
+        {'id': 1, 'nome': 'João Silva', 'cpf': '529.982.247-25'}
+    ]
+    assert ids(indice.buscar('05299')) == [2]
+    assert ids(indice.buscar('0')) == [2]
+    assert ids(indice.buscar('52998224725')) == [1]
+    assert indice.buscar('123') == []
+    assert indice.buscar('529982247250') == []
+
+
+def test_atualizacao_incremental():
+    """Testa inserir, renomear, inativar e remover alunos do índice."""
+    indice = IndiceAutocompletar(ttl=0)
+    indice.carregar_linhas([(1, 'Ana Lima', '52998224725')])
+
+    indice.atualizar(2, 'Ana Paula', '12345678909')
+    assert ids(indice.buscar('ana')) == [1, 2]
+
+    indice.atualizar(1, 'Beatriz Lima', '52998224725')
+    assert ids(indice.buscar('ana')) == [2]
+    assert ids(indice.buscar('lima')) == [1]
+
+    indice.atualizar(2, 'Ana Paula', '12345678909', ativo=False)
+    assert indice.buscar('ana') == []
+    assert indice.buscar('123') == []
+
+    indice.remover(1)
+    indice.remover(1)
+    assert len(indice) == 0
+    assert indice.buscar('52') == []
+
+
+def test_recarrega_apos_ttl(app, alunos):
+    """Testa que o índice é recarregado do banco quando o TTL vence."""
+    indice = app.extensions['autocompletar']
+    db.session.delete(alunos[0])
+    db.session.commit()
+    assert alunos[0].id in ids(indice.buscar('joao'))
+
+    indice.carregado_em -= indice.ttl
+    assert alunos[0].id not in ids(indice.buscar('joao'))
+
+
+def test_carrega_na_primeira_busca(app, alunos, monkeypatch, caplog):
+    """Testa a carga na primeira busca e que uma falha vai para o log."""
+    indice = IndiceAutocompletar(ttl=0)
+    assert indice.carregado_em is None
+    assert ids(indice.buscar('joao')) == [alunos[0].id, alunos[2].id]
+
+    def falhar():
+        raise RuntimeError('banco indisponível')
+
+    outro = IndiceAutocompletar(ttl=0)
+    monkeypatch.setattr(outro, 'carregar', falhar)
+    assert outro.buscar('joao') == []
+    assert 'Erro ao carregar o índice de autocompletar' in caplog.text
+
+    monkeypatch.undo()
+    assert ids(outro.buscar('joao')) == [alunos[0].id, alunos[2].id]
+
+
+def test_rota_autocomplete(client, alunos):
+    """Testa a rota e a atualização do índice pelas rotas de alunos."""
+    joao, joana, maria, inativo = alunos
+
+    response = client.get('/api/alunos/autocomplete?q=joa')
+    assert response.status_code == 200
+    assert ids(response.json['items']) == [joana.id, joao.id, maria.id]
+    assert client.get('/api/alunos/autocomplete').json['items'] == []
+
+    client.put(f'/api/alunos/{inativo.id}', json={'status': 'ativo'})
+    client.put(f'/api/alunos/{joana.id}', json={'status': 'inativo'})
+    client.delete(f'/api/alunos/{maria.id}')
+    response = client.get('/api/alunos/autocomplete?q=jo&limite=5')
+    assert ids(response.json['items']) == [joao.id, inativo.id]
+
+    response = client.post('/api/alunos', json={
+        'nome': 'Jonas Novo',
+        'email': 'jonas@teste.com',
+        'cpf': '390.533.447-05',
+        'telefone': '(31) 99999-0000',
+        'data_nascimento': '1990-05-05'
+    })
+    assert ids(client.get('/api/alunos/autocomplete?q=390').json['items']) == [response.json['id']]
+
+    csv = 'nome,email,cpf,data_nascimento\nJoel Lote,joel@teste.com,000.000.001-91,2000-01-01\n'
+    client.post('/api/alunos/import', data=io.BytesIO(csv.encode()), content_type='text/csv')
+    assert [r['nome'] for r in client.get('/api/alunos/autocomplete?q=joel').json['items']] == ['Joel Lote']
@@ -0,0 +1,151 @@
+"""Testes para a busca textual de alunos."""
+
+import pytest
+from datetime import date
+from sqlalchemy import insert, text
+from backend import create_app
+from backend.models import Usuario, Aluno, criar_gerente_padrao, db
+from backend.busca import buscar_alunos, montar_consulta_fts, reconstruir_indice
+from backend.comandos import gymflow
+
+
+@pytest.fixture
+def app():
+    """Fixture que cria uma instância do app para testes."""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        criar_gerente_padrao()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app, login_sessao):
+    """Fixture com um cliente autenticado como gerente."""
+    return login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+
+
+@pytest.fixture
+def alunos(app):
+    """Fixture que cria alguns alunos."""
+    dados = [
+        ('João Silva', 'joao@teste.com', '529.982.247-25', '(11) 98765-4321'),
+        ('Joana Sá', 'joana@teste.com', '123.456.789-09', '(21) 91234-5678'),
+        ('Maria João Costa', 'maria@teste.com', '111.444.777-35', None),
+        ('Pedro Alves', 'pedro.joa@teste.com', '987.654.321-00', '(11) 3333-4444'),
+    ]
+    alunos = []
+    for nome, email, cpf, telefone in dados:
+        aluno = Aluno(
+            nome=nome,
+            email=email,
+            cpf=cpf,
+            telefone=telefone,
+            data_nascimento=date(2000, 1, 1)
+        )
+        db.session.add(aluno)
+        alunos.append(aluno)
+    db.session.commit()
+    return alunos
+
+
+def ids(resultados):
+    """Ids dos alunos de uma lista de resultados."""
+    return [resultado['id'] for resultado in resultados]
+
+
+def test_montar_consulta_fts():
+    """Testa a conversão do texto digitado em consulta FTS5."""
+    assert montar_consulta_fts('João Si') == '"joao"* "si"*'
+    assert montar_consulta_fts('529.982') == '{cpf telefone} : "529982"*'
+    assert montar_consulta_fts('"x" OR nome:*') == '"x"* "or"* "nome"*'
+    assert montar_consulta_fts('.-') == ''
+
+
+def test_busca_por_nome_sem_acentos(app, alunos):
+    """Testa a busca por prefixo do nome, ignorando acentos e maiúsculas."""
+    joao, joana, maria, pedro = alunos
+
+    # Nome pesa mais que email: Pedro (pedro.joa@) vem por último
+    resultado = ids(buscar_alunos('joa'))
+    assert set(resultado) == {joao.id, joana.id, maria.id, pedro.id}
+    assert resultado[-1] == pedro.id
+
+    assert ids(buscar_alunos('JOAO s')) == [joao.id]
+    assert ids(buscar_alunos('sa')) == [joana.id]
+    assert ids(buscar_alunos('joão costa')) == [maria.id]
+    assert buscar_alunos('zzz') == []
+    assert buscar_alunos('   ') == []
+
+
+def test_busca_por_cpf_e_telefone(app, alunos):
+    """Testa a busca pelos dígitos do CPF e do telefone, com ou sem máscara."""
+    joao, joana, maria, pedro = alunos
+
+    assert ids(buscar_alunos('529.982')) == [joao.id]
+    assert ids(buscar_alunos('12345678909')) == [joana.id]
+    assert ids(buscar_alunos('(11) 9876')) == [joao.id]
+    # Telefone sem o DDD
+    assert ids(buscar_alunos('91234')) == [joana.id]
+    assert ids(buscar_alunos('3333-4')) == [pedro.id]
+
+
+def test_indice_acompanha_alteracoes(client, alunos):
+    """Testa que criar, atualizar e excluir alunos atualizam o índice."""
+    joao = alunos[0]
+
+    response = client.post('/api/alunos', json={
+        'nome': 'Ênio Brandão',
+        'email': 'enio@teste.com',
+        'cpf': '390.533.447-05',
+        'telefone': '(31) 99999-0000',
+        'data_nascimento': '1990-05-05'
+    })
+    assert response.status_code == 201
+    novo = response.json['id']
+    assert ids(client.get('/api/alunos/busca?q=enio bran').json['items']) == [novo]
+
+    client.put(f'/api/alunos/{joao.id}', json={
+        'nome': 'Joaquim Silva',
+        'email': 'joaquim@teste.com'
+    })
+    assert ids(client.get('/api/alunos/busca?q=joaquim').json['items']) == [joao.id]
+    assert joao.id not in ids(client.get('/api/alunos/busca?q=joao').json['items'])
+
+    client.delete(f'/api/alunos/{novo}')
+    assert client.get('/api/alunos/busca?q=enio').json['items'] == []
+
+
+def test_importacao_em_lote_e_reconstrucao(app, alunos):
+    """Testa inserções fora do ORM e a reconstrução do índice."""
+    db.session.execute(insert(Aluno), [{
+        'nome': 'Íris Lote',
+        'email': 'iris@teste.com',
+        'cpf': '000.000.001-91',
+        'data_nascimento': date(2000, 1, 1)
+    }])
+    db.session.commit()
+    assert [r['nome'] for r in buscar_alunos('iris')] == ['Íris Lote']
+
+    db.session.execute(text('DELETE FROM alunos_busca'))
+    assert buscar_alunos('iris') == []
+    saida = app.test_cli_runner().invoke(gymflow, ['reindex-busca'])
+    assert '5 alunos indexados' in saida.output
+    assert [r['nome'] for r in buscar_alunos('iris')] == ['Íris Lote']
+
+    db.session.execute(text('DELETE FROM alunos_busca'))
+    assert reconstruir_indice() == 5
+    assert [r['nome'] for r in buscar_alunos('joao silva')] == ['João Silva']
+
+
+def test_rota_busca(client, alunos):
+    """Testa a rota de busca e o limite de resultados."""
+    response = client.get('/api/alunos/busca?q=joa&limite=2')
+    assert response.status_code == 200
+    itens = response.json['items']
+    assert len(itens) == 2
+    assert set(itens[0]) == {'id', 'nome', 'email', 'cpf', 'telefone', 'status'}
+    assert client.get('/api/alunos/busca').json['items'] == []
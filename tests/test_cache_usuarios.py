@@ -0,0 +1,129 @@
+"""Testes para o cache de usuários das sessões do Flask-Login."""
+
+import pytest
+from flask import g
+from backend import create_app
+from backend.models import Usuario, Professor, criar_gerente_padrao, db
+from backend.autenticacao import CacheUsuarios, UsuarioAutenticado
+
+
+@pytest.fixture
+def app():
+    """Fixture que cria uma instância do app para testes."""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        criar_gerente_padrao()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def usuarios_cache(app):
+    """Fixture com o cache de usuários da aplicação."""
+    return app.extensions['usuarios_cache']
+
+
+def nova_requisicao():
+    """Descarta o usuário que o Flask-Login guardou em g na requisição anterior."""
+    g.pop('_login_user', None)
+
+
+def consultas_de_usuarios(sqls):
+    """Filtra os comandos que leem a tabela de usuários."""
+    return [sql for sql in sqls if 'FROM usuarios' in sql]
+
+
+def test_cache_lru_com_expiracao(monkeypatch):
+    """Testa a remoção do menos usado, a expiração e os contadores."""
+    agora = [100.0]
+    monkeypatch.setattr('backend.autenticacao.time.monotonic', lambda: agora[0])
+    carregados = []
+
+    def carregar(usuario_id):
+        carregados.append(usuario_id)
+        return UsuarioAutenticado({'user_id': usuario_id, 'tipo': 'professor'})
+
+    usuarios = CacheUsuarios(tamanho_maximo=2, ttl=10)
+    usuarios.obter(1, carregar)
+    usuarios.obter(2, carregar)
+    usuarios.obter(1, carregar)
+    usuarios.obter(3, carregar)  # remove o 2, menos usado
+    usuarios.obter(2, carregar)
+    assert carregados == [1, 2, 3, 2]
+
+    agora[0] += 11
+    usuarios.obter(3, carregar)
+    assert carregados == [1, 2, 3, 2, 3]
+
+    estatisticas = usuarios.estatisticas()
+    assert estatisticas['acertos'] == 1
+    assert estatisticas['falhas'] == 5
+    assert estatisticas['tamanho'] == 2
+
+    assert usuarios.obter(4, lambda usuario_id: None) is None
+    assert usuarios.estatisticas()['tamanho'] == 2
+
+
+def test_sessao_usa_cache(app, usuarios_cache, login_sessao, contador_queries):
+    """Testa que páginas seguidas consultam o usuário uma única vez."""
+    gerente = Usuario.query.filter_by(tipo='gerente').first()
+    client = login_sessao(gerente)
+    db.session.expunge_all()
+    contador_queries.clear()
+
+    for _ in range(4):
+        nova_requisicao()
+        assert client.get('/api/planos/disponiveis').status_code == 200
+
+    assert len(consultas_de_usuarios(contador_queries)) == 1
+    assert usuarios_cache.acertos == 3
+    assert usuarios_cache.falhas == 1
+
+    nova_requisicao()
+    response = client.get('/api/usuarios/cache')
+    assert response.json['acertos'] == 4
+    assert response.json['tamanho'] == 1
+
+
+def test_cache_invalidado_ao_alterar_usuario(app, usuarios_cache, login_sessao):
+    """Testa que alterar um usuário remove sua cópia do cache."""
+    gerente = Usuario.query.filter_by(tipo='gerente').first()
+    recepcionista = Usuario(nome='Recepção', email='rec@teste.com', tipo='recepcionista')
+    recepcionista.senha = 'senha123'
+    db.session.add(recepcionista)
+    db.session.commit()
+    recepcionista_id = recepcionista.id
+
+    client = login_sessao(recepcionista)
+    nova_requisicao()
+    assert client.get('/api/usuarios').status_code == 302
+
+    admin = login_sessao(gerente)
+    nova_requisicao()
+    admin.put(f'/api/usuarios/{recepcionista_id}', json={'tipo': 'gerente'})
+
+    nova_requisicao()
+    assert client.get('/api/usuarios').status_code == 200
+
+
+def test_cache_invalidado_ao_inativar_professor(app, usuarios_cache, login_sessao):
+    """Testa que inativar um professor remove o usuário do cache."""
+    usuario = Usuario(nome='Prof', email='prof@teste.com', tipo='professor')
+    usuario.senha = 'senha123'
+    db.session.add(usuario)
+    db.session.flush()
+    professor = Professor(usuario_id=usuario.id)
+    db.session.add(professor)
+    db.session.commit()
+    usuario_id, professor_id = usuario.id, professor.id
+
+    usuarios_cache.obter(usuario_id, lambda _: UsuarioAutenticado({'user_id': usuario_id}))
+    assert usuarios_cache.estatisticas()['tamanho'] == 1
+
+    admin = login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+    nova_requisicao()
+    assert admin.delete(f'/api/professores/{professor_id}').status_code == 200
+    assert usuario_id not in usuarios_cache._itens
@@ -0,0 +1,130 @@
+"""Testes de carregamento antecipado (sem consultas N+1)."""
+
+import pytest
+from datetime import date, time
+from backend import create_app
+from backend.models import (
+    Usuario, Professor, Aluno, Treino, TreinoExercicio, Exercicio,
+    Turma, MatriculaTurma, db
+)
+from backend.serializadores import serializar_turmas
+
+
+@pytest.fixture
+def app():
+    """Fixture que cria uma instância do app para testes."""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def treinos(app):
+    """Fixture que cria treinos de vários alunos e professores."""
+    exercicios = [
+        Exercicio(nome=f'Exercício {i}', grupo_muscular='Peitoral')
+        for i in range(3)
+    ]
+    db.session.add_all(exercicios)
+
+    professores = []
+    for i in range(2):
+        usuario = Usuario(
+            nome=f'Professor {i}',
+            email=f'prof{i}@teste.com',
+            tipo='professor'
+        )
+        usuario.senha = 'senha123'
+        professor = Professor(usuario=usuario)
+        professores.append(professor)
+    db.session.add_all(professores)
+
+    alunos = [
+        Aluno(
+            nome=f'Aluno {i}',
+            email=f'aluno{i}@teste.com',
+            cpf=f'000.000.000-{i:02d}',
+            data_nascimento=date(2000, 1, 1)
+        )
+        for i in range(4)
+    ]
+    db.session.add_all(alunos)
+    db.session.flush()
+
+    for i, aluno in enumerate(alunos):
+        treino = Treino(
+            aluno_id=aluno.id,
+            professor_id=professores[i % 2].id,
+            tipo='musculacao'
+        )
+        db.session.add(treino)
+        db.session.flush()
+        for ordem, exercicio in enumerate(exercicios, start=1):
+            db.session.add(TreinoExercicio(
+                treino_id=treino.id,
+                exercicio_id=exercicio.id,
+                series=3,
+                repeticoes=12,
+                ordem=ordem
+            ))
+    db.session.commit()
+    # Esvazia o identity map para que nada venha da sessão
+    db.session.expunge_all()
+
+
+def test_treinos_consulta_listagem(treinos, contador_queries):
+    """Testa que a listagem de treinos usa um número fixo de consultas."""
+    lista = Treino.consulta_listagem().all()
+    assert len(contador_queries) == 2
+
+    contador_queries.clear()
+    dados = [treino.to_dict() for treino in lista]
+    assert contador_queries == []
+
+    assert len(dados) == 4
+    assert all(len(treino['exercicios']) == 3 for treino in dados)
+    assert dados[0]['professor']['nome'] == 'Professor 0'
+
+
+@pytest.fixture
+def turmas(treinos):
+    """Fixture que cria turmas com alunos matriculados."""
+    professores = Professor.query.all()
+    alunos = Aluno.query.all()
+    turmas = [
+        Turma(
+            professor_id=professores[i % 2].id,
+            modalidade='yoga',
+            nivel='iniciante',
+            dia_semana=i,
+            horario_inicio=time(7 + i),
+            horario_fim=time(8 + i),
+            capacidade_maxima=20
+        )
+        for i in range(5)
+    ]
+    db.session.add_all(turmas)
+    db.session.flush()
+    for turma in turmas:
+        for aluno in alunos:
+            db.session.add(MatriculaTurma(aluno_id=aluno.id, turma_id=turma.id))
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def test_serializar_turmas(turmas, contador_queries):
+    """Testa que as turmas são serializadas com um número fixo de consultas."""
+    dados = serializar_turmas(Turma.query.order_by(Turma.id).all())
+
+    assert len(contador_queries) == 3
+    assert len(dados) == 5
+    assert dados[0]['professor']['nome'] == 'Professor 0'
+    assert dados[1]['horario_inicio'] == '08:00'
+    assert [m['aluno']['nome'] for m in dados[0]['matriculas']] == [
+        'Aluno 0', 'Aluno 1', 'Aluno 2', 'Aluno 3'
+    ]
+    assert serializar_turmas([]) == []
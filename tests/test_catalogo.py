@@ -0,0 +1,96 @@
+"""Testes para os catálogos em cache de planos e exercícios."""
+
+import pytest
+from backend import create_app
+from backend.models import Usuario, Plano, criar_gerente_padrao, init_db, db
+
+
+@pytest.fixture
+def app():
+    """Fixture que cria uma instância do app para testes."""
+    app = create_app('testing')
+
+    with app.app_context():
+        # Tabelas, planos básicos e gerente, como em ``flask gymflow init-db``
+        init_db()
+        criar_gerente_padrao()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app, login_sessao):
+    """Fixture com um cliente autenticado como gerente."""
+    return login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+
+
+def selects_em(sqls, tabela):
+    """Conta os SELECTs que leem a tabela informada."""
+    return len([sql for sql in sqls if sql.startswith('SELECT') and f'FROM {tabela}' in sql])
+
+
+def test_planos_disponiveis_em_cache(client, contador_queries):
+    """Testa que o catálogo de planos é lido do banco uma única vez."""
+    primeira = client.get('/api/planos/disponiveis')
+    segunda = client.get('/api/planos/disponiveis')
+
+    assert primeira.status_code == 200
+    assert primeira.json == segunda.json
+    assert [plano['nome'] for plano in primeira.json] == ['Mensal', 'Trimestral', 'Semestral', 'Anual']
+    assert selects_em(contador_queries, 'planos') == 1
+
+    client.get('/alunos')
+    assert selects_em(contador_queries, 'planos') == 1
+
+
+def test_planos_disponiveis_etag(client):
+    """Testa a revalidação com If-None-Match."""
+    response = client.get('/api/planos/disponiveis')
+    etag = response.headers['ETag']
+    assert 'no-cache' in response.headers['Cache-Control']
+
+    response = client.get('/api/planos/disponiveis', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+
+def test_invalidacao_de_planos(client):
+    """Testa que criar, alterar e excluir planos invalidam o catálogo."""
+    etag = client.get('/api/planos/disponiveis').headers['ETag']
+
+    response = client.post('/api/planos', json={
+        'nome': 'Diário',
+        'valor': 20,
+        'duracao_meses': 1
+    })
+    plano_id = response.json['id']
+    response = client.get('/api/planos/disponiveis', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert 'Diário' in [plano['nome'] for plano in response.json]
+
+    client.put(f'/api/planos/{plano_id}', json={'ativo': False})
+    nomes = [plano['nome'] for plano in client.get('/api/planos/disponiveis').json]
+    assert 'Diário' not in nomes
+
+    mensal = Plano.query.filter_by(nome='Mensal').first()
+    assert client.delete(f'/api/planos/{mensal.id}').status_code == 204
+    nomes = [plano['nome'] for plano in client.get('/api/planos/disponiveis').json]
+    assert 'Mensal' not in nomes
+
+
+def test_exercicios_em_cache_e_invalidacao(client, contador_queries):
+    """Testa o cache do catálogo de exercícios e sua invalidação."""
+    assert client.get('/api/exercicios').json == []
+    etag = client.get('/api/exercicios').headers['ETag']
+    assert selects_em(contador_queries, 'exercicios') == 1
+
+    response = client.post('/api/exercicios', json={
+        'nome': 'Supino',
+        'grupo_muscular': 'Peito'
+    })
+    assert response.status_code == 201
+
+    response = client.get('/api/exercicios', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert [exercicio['nome'] for exercicio in response.json] == ['Supino']
@@ -0,0 +1,189 @@
+"""Testes para o registro de pagamentos com detecção de duplicidade."""
+
+import pytest
+from datetime import date
+from backend import create_app
+from backend.models import Usuario, Aluno, Plano, Pagamento, criar_gerente_padrao, init_db, db
+from backend.cobranca import (
+    registrar_pagamento, registrar_pagamentos_em_lote, gerar_cobrancas_mes
+)
+from backend.comandos import gymflow
+
+
+@pytest.fixture
+def app():
+    """Fixture que cria uma instância do app para testes."""
+    app = create_app('testing')
+
+    with app.app_context():
+        # Tabelas, planos básicos e gerente, como em ``flask gymflow init-db``
+        init_db()
+        criar_gerente_padrao()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def alunos(app):
+    """Fixture que cria alunos para os pagamentos."""
+    alunos = [
+        Aluno(
+            nome=f'Aluno {i}',
+            email=f'aluno{i}@teste.com',
+            cpf=f'000.000.000-{i:02d}',
+            data_nascimento=date(2000, 1, 1)
+        )
+        for i in range(3)
+    ]
+    db.session.add_all(alunos)
+    db.session.commit()
+    return alunos
+
+
+@pytest.fixture
+def alunos_com_plano(app):
+    """Fixture que cria alunos ativos com plano, além de inativos e sem plano."""
+    plano = Plano.query.first()
+    alunos = [
+        Aluno(
+            nome=f'Aluno {i}',
+            email=f'aluno{i}@teste.com',
+            cpf=f'000.000.000-{i:02d}',
+            data_nascimento=date(2000, 1, 1),
+            plano_id=plano.id if i != 7 else None,
+            status='inativo' if i == 8 else 'ativo'
+        )
+        for i in range(12)
+    ]
+    db.session.add_all(alunos)
+    db.session.commit()
+    return [aluno.id for aluno in alunos]
+
+
+def test_registrar_pagamento_em_um_comando(alunos, contador_queries):
+    """Testa que a duplicidade é detectada no próprio INSERT."""
+    dados = {
+        'aluno_id': alunos[0].id,
+        'mes_referencia': '2024-03',
+        'status': 'pago',
+        'data_pagamento': '2024-03-05'
+    }
+    contador_queries.clear()
+    assert registrar_pagamento(dados) is True
+    assert registrar_pagamento(dados) is False
+    db.session.commit()
+
+    assert len(contador_queries) == 2
+    assert all(sql.startswith('INSERT') for sql in contador_queries)
+    pagamento = Pagamento.query.one()
+    assert pagamento.status == 'pago'
+    assert pagamento.data_pagamento.day == 5
+
+
+def test_registrar_pagamentos_em_lote(alunos, contador_queries, monkeypatch):
+    """Testa o registro em lote ignorando pagamentos já existentes."""
+    monkeypatch.setattr('backend.cobranca.LINHAS_POR_COMANDO', 2)
+    aluno_ids = [aluno.id for aluno in alunos]
+    registrar_pagamento({'aluno_id': aluno_ids[0], 'mes_referencia': '2024-03'})
+    contador_queries.clear()
+
+    resultado = registrar_pagamentos_em_lote(
+        {'aluno_id': aluno_id, 'mes_referencia': '2024-03'}
+        for aluno_id in aluno_ids
+    )
+    db.session.commit()
+
+    assert resultado == {'inseridos': 2, 'duplicados': 1}
+    assert len([sql for sql in contador_queries if sql.startswith('INSERT')]) == 2
+    assert Pagamento.query.filter_by(mes_referencia='2024-03').count() == 3
+    assert {p.status for p in Pagamento.query} == {'pendente'}
+
+
+def test_rotas_de_pagamento(alunos, login_sessao):
+    """Testa as rotas de registro individual e em lote."""
+    client = login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+    dados = {
+        'aluno_id': alunos[0].id,
+        'mes_referencia': '2024-04',
+        'status': 'pago'
+    }
+
+    assert client.post('/api/pagamentos', json=dados).status_code == 200
+    response = client.post('/api/pagamentos', json=dados)
+    assert response.status_code == 400
+    assert 'Já existe' in response.json['erro']
+
+    response = client.post('/api/pagamentos/lote', json={
+        'mes_referencia': '2024-04',
+        'pagamentos': [{'aluno_id': aluno.id} for aluno in alunos]
+    })
+    assert response.status_code == 201
+    assert response.json == {'inseridos': 2, 'duplicados': 1}
+
+    response = client.post('/api/pagamentos/lote', json={'pagamentos': []})
+    assert response.status_code == 400
+
+    for mes in ['2024-13', '04/2024', 202404]:
+        response = client.post('/api/pagamentos/lote', json={
+            'mes_referencia': mes,
+            'pagamentos': [{'aluno_id': alunos[0].id}]
+        })
+        assert response.status_code == 400
+        assert client.post('/api/pagamentos', json=dict(dados, mes_referencia=mes)).status_code == 400
+    assert Pagamento.query.count() == 3
+
+
+def test_gerar_cobrancas_mes(alunos_com_plano, contador_queries):
+    """Testa a geração em lotes, ignorando inativos, sem plano e existentes."""
+    registrar_pagamento({
+        'aluno_id': alunos_com_plano[0],
+        'mes_referencia': '2024-06',
+        'status': 'pago'
+    })
+    db.session.commit()
+    contador_queries.clear()
+
+    resultado = gerar_cobrancas_mes('2024-06', tamanho_lote=4)
+
+    assert resultado['alunos'] == 10
+    assert resultado['inseridos'] == 9
+    assert resultado['duplicados'] == 1
+    assert resultado['por_segundo'] > 0
+    inserts = [sql for sql in contador_queries if sql.startswith('INSERT')]
+    assert len(inserts) == 3
+    assert Pagamento.query.filter_by(status='pendente').count() == 9
+
+    # Repetir a execução não duplica pagamentos
+    assert gerar_cobrancas_mes('2024-06')['inseridos'] == 0
+
+    with pytest.raises(ValueError):
+        gerar_cobrancas_mes('2024-13')
+
+
+def test_comando_billing_run(app, alunos_com_plano):
+    """Testa o comando flask gymflow billing-run."""
+    runner = app.test_cli_runner()
+
+    resultado = runner.invoke(gymflow, ['billing-run', '--mes', '2024-07'])
+    assert resultado.exit_code == 0
+    assert '10 alunos, 10 pagamentos gerados' in resultado.output
+
+    resultado = runner.invoke(gymflow, ['billing-run', '--mes', 'julho'])
+    assert resultado.exit_code != 0
+
+
+def test_rota_gerar_cobranca(alunos_com_plano, login_sessao):
+    """Testa a rota de geração da cobrança mensal."""
+    client = login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+
+    response = client.post('/api/pagamentos/cobranca', json={'mes_referencia': '2024-08'})
+    assert response.status_code == 201
+    assert response.json['inseridos'] == 10
+
+    response = client.post('/api/pagamentos/cobranca', json={'mes_referencia': '08/2024'})
+    assert response.status_code == 400
+
+    for mes in (202408, None, ['2024-08']):
+        response = client.post('/api/pagamentos/cobranca', json={'mes_referencia': mes})
+        assert response.status_code == 400
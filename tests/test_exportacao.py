@@ -0,0 +1,120 @@
+"""Testes para a exportação em streaming (CSV e NDJSON)."""
+
+import csv
+import io
+import json
+import pytest
+from datetime import date, datetime
+from backend import create_app
+from backend.models import Usuario, Aluno, Pagamento, Presenca, criar_gerente_padrao, db
+
+
+@pytest.fixture
+def app():
+    """Fixture que cria uma instância do app para testes."""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        criar_gerente_padrao()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def dados(app):
+    """Fixture que cria alunos, pagamentos e presenças."""
+    alunos = [
+        Aluno(
+            nome=f'Aluno {i}',
+            email=f'aluno{i}@teste.com',
+            cpf=f'000.000.000-{i:02d}',
+            data_nascimento=date(2000, 1, i + 1)
+        )
+        for i in range(5)
+    ]
+    db.session.add_all(alunos)
+    db.session.flush()
+    db.session.add_all(
+        Pagamento(
+            aluno_id=aluno.id,
+            mes_referencia='2024-03',
+            status='pago' if i % 2 else 'pendente'
+        )
+        for i, aluno in enumerate(alunos)
+    )
+    db.session.add_all(
+        Presenca(
+            aluno_id=aluno.id,
+            turma_id=1 + i % 2,
+            data=datetime(2024, 3, 1, 7, 0),
+            tipo='entrada'
+        )
+        for i, aluno in enumerate(alunos)
+    )
+    db.session.commit()
+
+
+@pytest.fixture
+def client(dados, login_sessao):
+    """Fixture com um cliente autenticado."""
+    return login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+
+
+def test_exportar_alunos_csv_em_partes(client, monkeypatch):
+    """Testa que o CSV é transmitido em partes, uma por lote de linhas."""
+    monkeypatch.setattr('backend.exportacao.LINHAS_POR_PARTE', 2)
+
+    response = client.get('/api/alunos/export?format=csv')
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'text/csv'
+    assert 'alunos.csv' in response.headers['Content-Disposition']
+    # Cabeçalho + 3 partes (2 + 2 + 1 alunos)
+    partes = [parte.decode('utf-8') for parte in response.response]
+    assert len(partes) == 4
+
+    linhas = list(csv.DictReader(io.StringIO(''.join(partes))))
+    assert len(linhas) == 5
+    assert linhas[0]['email'] == 'aluno0@teste.com'
+    assert linhas[0]['data_nascimento'] == '2000-01-01'
+    assert linhas[0]['status'] == 'ativo'
+
+
+def test_exportar_alunos_ndjson(client):
+    """Testa a exportação de alunos em NDJSON."""
+    response = client.get('/api/alunos/export?format=ndjson')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    alunos = [json.loads(linha) for linha in response.get_data(as_text=True).splitlines()]
+    assert [aluno['nome'] for aluno in alunos] == [f'Aluno {i}' for i in range(5)]
+    assert alunos[4]['data_nascimento'] == '2000-01-05'
+    assert alunos[0]['telefone'] is None
+
+
+def test_exportar_formato_invalido(client):
+    """Testa a rejeição de formatos não suportados."""
+    response = client.get('/api/alunos/export?format=xlsx')
+    assert response.status_code == 400
+
+
+def test_exportar_pagamentos_com_filtros(client):
+    """Testa a exportação de pagamentos aplicando os filtros da listagem."""
+    response = client.get('/api/pagamentos/export?format=ndjson&status=pago')
+
+    pagamentos = [json.loads(linha) for linha in response.get_data(as_text=True).splitlines()]
+    assert [p['aluno_nome'] for p in pagamentos] == ['Aluno 1', 'Aluno 3']
+    assert {p['status'] for p in pagamentos} == {'pago'}
+
+
+def test_exportar_presencas(client):
+    """Testa a exportação de presenças filtradas por turma."""
+    response = client.get('/api/presencas/export?turma_id=1')
+
+    linhas = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(linhas) == 3
+    assert linhas[0]['data'] == '2024-03-01T07:00:00'
+    assert {linha['turma_id'] for linha in linhas} == {'1'}
@@ -0,0 +1,153 @@
+"""Testes para os filtros e a ordenação de /api/alunos."""
+
+import pytest
+from datetime import datetime, date
+from backend import create_app
+from backend.models import Usuario, Aluno, Plano, criar_gerente_padrao, init_db, db
+from backend.utils import filtrar_query
+from tests.test_indices import planos_de_execucao
+
+
+@pytest.fixture
+def app():
+    """Fixture que cria uma instância do app para testes."""
+    app = create_app('testing')
+
+    with app.app_context():
+        # Tabelas, planos básicos e gerente, como em ``flask gymflow init-db``
+        init_db()
+        criar_gerente_padrao()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app, login_sessao):
+    """Fixture com um cliente autenticado como gerente."""
+    return login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+
+
+@pytest.fixture
+def alunos(app):
+    """Fixture que cria alunos com planos, status e datas variados."""
+    plano = Plano.query.first()
+    dados = [
+        ('Ana Souza', 'ativo', 'Hipertrofia', plano.id, datetime(2024, 1, 10)),
+        ('Álvaro Lima', 'ativo', 'Emagrecimento', None, datetime(2024, 2, 5)),
+        ('andré Castro', 'inativo', 'Hipertrofia', plano.id, datetime(2024, 2, 20)),
+        ('Bruno Dias', 'ativo', 'Hipertrofia', plano.id, datetime(2024, 3, 1)),
+        ('Beatriz Melo', 'pendente', None, None, datetime(2024, 3, 31, 23, 59)),
+    ]
+    for i, (nome, status, objetivo, plano_id, matricula) in enumerate(dados):
+        db.session.add(Aluno(
+            nome=nome,
+            email=f'aluno{i}@teste.com',
+            cpf=f'000.000.000-{i:02d}',
+            data_nascimento=date(2000, 1, 1),
+            status=status,
+            objetivo=objetivo,
+            plano_id=plano_id,
+            data_matricula=matricula
+        ))
+    db.session.commit()
+    return plano
+
+
+def nomes(response):
+    """Nomes dos alunos de uma resposta da listagem."""
+    assert response.status_code == 200, response.json
+    return [aluno['nome'] for aluno in response.json['items']]
+
+
+def test_filtros_combinados(client, alunos):
+    """Testa os filtros por status, plano, objetivo e prefixo do nome."""
+    assert nomes(client.get('/api/alunos?status=ativo&ordenar=nome')) == [
+        'Álvaro Lima', 'Ana Souza', 'Bruno Dias'
+    ]
+    assert nomes(client.get(f'/api/alunos?plano_id={alunos.id}&objetivo=Hipertrofia&ordenar=id')) == [
+        'Ana Souza', 'andré Castro', 'Bruno Dias'
+    ]
+    # Prefixo sem diferenciar acentos nem maiúsculas
+    assert nomes(client.get('/api/alunos?nome=AL&ordenar=nome')) == ['Álvaro Lima']
+    assert nomes(client.get('/api/alunos?nome=an&ordenar=nome')) == ['Ana Souza', 'andré Castro']
+    assert nomes(client.get('/api/alunos?nome=zz')) == []
+
+
+def test_intervalo_de_matricula(client, alunos):
+    """Testa o intervalo de matrícula, com a data final inclusive."""
+    response = client.get('/api/alunos?matriculado_de=2024-02-01&matriculado_ate=2024-03-31')
+    assert nomes(response) == ['Beatriz Melo', 'Bruno Dias', 'andré Castro', 'Álvaro Lima']
+
+    response = client.get('/api/alunos?matriculado_ate=2024-02-05&ordenar=data_matricula')
+    assert nomes(response) == ['Ana Souza', 'Álvaro Lima']
+
+
+def test_ordenacao_com_cursor(client, alunos):
+    """Testa a paginação por cursor nas duas direções da ordenação por nome."""
+    for ordenar, esperado in [
+        ('nome', ['Álvaro Lima', 'Ana Souza', 'andré Castro', 'Beatriz Melo', 'Bruno Dias']),
+        ('-nome', ['Bruno Dias', 'Beatriz Melo', 'andré Castro', 'Ana Souza', 'Álvaro Lima']),
+    ]:
+        vistos, cursor = [], None
+        while True:
+            url = f'/api/alunos?ordenar={ordenar}&limite=2'
+            response = client.get(url + (f'&cursor={cursor}' if cursor else ''))
+            vistos += nomes(response)
+            cursor = response.json['next_cursor']
+            if not cursor:
+                break
+        assert vistos == esperado
+
+
+def test_parametros_invalidos(client, alunos):
+    """Testa a recusa de ordenações e filtros inválidos."""
+    assert client.get('/api/alunos?ordenar=email').status_code == 400
+    assert client.get('/api/alunos?plano_id=abc').status_code == 400
+    assert client.get('/api/alunos?matriculado_de=31/01/2024').status_code == 400
+
+
+def test_exportacao_usa_os_filtros(client, alunos):
+    """Testa que a exportação aplica os mesmos filtros da listagem."""
+    response = client.get('/api/alunos/export?status=ativo&nome=b')
+    linhas = response.get_data(as_text=True).strip().splitlines()
+    assert len(linhas) == 2
+    assert 'nome_normalizado' not in linhas[0]
+    assert 'Bruno Dias' in linhas[1]
+
+
+def test_filtrar_query_operadores(app, alunos):
+    """Testa os operadores aceitos por filtrar_query."""
+    mapeamento = {
+        'nome': (Aluno.nome_normalizado, 'prefixo'),
+        'desde': (Aluno.data_matricula, '>='),
+        'email': Aluno.email
+    }
+    query = filtrar_query(Aluno.query, {
+        'nome': 'b',
+        'desde': datetime(2024, 3, 15),
+        'ignorado': 'x'
+    }, mapeamento)
+    assert [aluno.nome for aluno in query] == ['Beatriz Melo']
+    assert filtrar_query(Aluno.query, {'email': 'aluno1%'}, mapeamento).count() == 1
+
+
+def test_filtros_usam_indices(app, alunos):
+    """Testa que os filtros principais usam os índices de alunos."""
+    plano_nome = planos_de_execucao(lambda: filtrar_query(
+        Aluno.query,
+        {'nome': 'an'},
+        {'nome': (Aluno.nome_normalizado, 'prefixo')}
+    ).order_by(Aluno.nome_normalizado).all())
+    assert 'ix_alunos_nome_normalizado' in plano_nome[0]
+
+    plano_id = alunos.id
+    plano_plano = planos_de_execucao(
+        lambda: Aluno.query.filter(Aluno.plano_id == plano_id).all()
+    )
+    assert 'ix_alunos_plano_id' in plano_plano[0]
+
+    plano_status = planos_de_execucao(lambda: Aluno.query.filter(
+        Aluno.status == 'ativo'
+    ).order_by(Aluno.data_matricula.desc()).limit(10).all())
+    assert 'ix_alunos_status_data_matricula' in plano_status[0]
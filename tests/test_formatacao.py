@@ -0,0 +1,69 @@
+"""Testes para os formatadores de exibição."""
+
+import random
+from decimal import Decimal
+from backend.formatacao import (
+    formatar_cpf, formatar_cpfs, formatar_telefone,
+    formatar_moeda, formatar_moedas
+)
+from backend.utils import validar_email
+
+
+def test_formatar_cpf():
+    """Testa a formatação individual de CPFs."""
+    assert formatar_cpf('12345678909') == '123.456.789-09'
+    assert formatar_cpf('123.456.789-09') == '123.456.789-09'
+    assert formatar_cpf(' 123 456 789 09 ') == '123.456.789-09'
+    assert formatar_cpf('') == ''
+    assert formatar_cpf('123') == '123'
+
+
+def test_formatar_cpfs_equivale_a_formatar_cpf():
+    """Testa que o lote dá o mesmo resultado da formatação individual."""
+    aleatorio = random.Random(3)
+    cpfs = [''.join(aleatorio.choices('0123456789', k=11)) for _ in range(500)]
+    cpfs[::3] = [formatar_cpf(cpf) for cpf in cpfs[::3]]
+
+    assert formatar_cpfs(cpfs) == [formatar_cpf(cpf) for cpf in cpfs]
+
+    mistos = ['12345678909', None, '123', 'CPF 123.456.789-09', '1234567890\n9', '']
+    assert formatar_cpfs(mistos) == [
+        '123.456.789-09', '', '123', '123.456.789-09', '123.456.789-09', ''
+    ]
+    assert formatar_cpfs([]) == []
+
+
+def test_formatar_telefone():
+    """Testa a formatação de telefones."""
+    assert formatar_telefone('11987654321') == '(11) 98765-4321'
+    assert formatar_telefone('(11) 98765-4321') == '(11) 98765-4321'
+    assert formatar_telefone('') == ''
+    assert formatar_telefone('123') == '123'
+
+
+def test_formatar_moeda():
+    """Testa a formatação de valores monetários, inclusive Decimal."""
+    assert formatar_moeda(100.0) == 'R$ 100,00'
+    assert formatar_moeda(1234.56) == 'R$ 1.234,56'
+    assert formatar_moeda(0) == 'R$ 0,00'
+    assert formatar_moeda(-100.0) == '-R$ 100,00'
+    assert formatar_moeda(1234567) == 'R$ 1.234.567,00'
+    assert formatar_moeda(Decimal('-1234.565')) == '-R$ 1.234,56'
+    assert formatar_moeda(Decimal('0.5')) == 'R$ 0,50'
+
+
+def test_formatar_moedas_equivale_a_formatar_moeda():
+    """Testa que o lote dá o mesmo resultado da formatação individual."""
+    aleatorio = random.Random(5)
+    valores = [round(aleatorio.uniform(-1e6, 1e6), 2) for _ in range(500)] + [0, 7, -0.5]
+
+    assert formatar_moedas(valores) == [formatar_moeda(valor) for valor in valores]
+    assert formatar_moedas(iter([Decimal('10'), 2.5])) == ['R$ 10,00', 'R$ 2,50']
+    assert formatar_moedas([]) == []
+
+
+def test_validar_email():
+    """Testa a validação de emails com o padrão pré-compilado."""
+    assert validar_email('aluno@gymflow.com') is True
+    assert validar_email('aluno.gymflow.com') is False
+    assert validar_email('aluno@gymflow') is False
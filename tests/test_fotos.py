@@ -0,0 +1,377 @@
+"""Testes para o processamento de fotos em segundo plano."""
+
+import hashlib
+import io
+import os
+import threading
+import time
+import pytest
+from datetime import date
+from PIL import Image
+from backend import create_app
+from backend.models import Usuario, Aluno, criar_gerente_padrao, db
+from backend import fotos as modulo_fotos
+from backend.fotos import (
+    FilaFotos, FotoInvalida, FotoGrandeDemais,
+    caminho_variante, contar_referencias, verificar_fotos
+)
+from backend.comandos import gymflow
+from backend.travas import travar
+from backend.utils import excluir_foto
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Fixture que cria uma instância do app com uploads em pasta temporária."""
+    app = create_app('testing')
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    app.extensions['fila_fotos'] = FilaFotos(str(tmp_path))
+
+    with app.app_context():
+        db.create_all()
+        criar_gerente_padrao()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def fila(app):
+    """Fixture com a fila de fotos da aplicação."""
+    return app.extensions['fila_fotos']
+
+
+@pytest.fixture
+def aluno(app):
+    """Fixture que cria um aluno."""
+    aluno = Aluno(
+        nome='Aluno',
+        email='aluno@teste.com',
+        cpf='000.000.000-00',
+        data_nascimento=date(2000, 1, 1)
+    )
+    db.session.add(aluno)
+    db.session.commit()
+    return aluno
+
+
+def arquivos_da_fila(fila):
+    """Arquivos de tarefas na pasta da fila (sem a trava entre processos)."""
+    return [nome for nome in os.listdir(fila.pasta_fila) if nome != modulo_fotos.ARQUIVO_TRAVA]
+
+
+def imagem_png(largura=1600, altura=1200, cor='red'):
+    """Gera os bytes de uma imagem PNG."""
+    buffer = io.BytesIO()
+    Image.new('RGB', (largura, altura), cor).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def test_enfileirar_gera_variantes(app, fila):
+    """Testa a geração das variantes fora da chamada de enfileiramento."""
+    liberar = threading.Event()
+    processar = fila._processar
+    fila._processar = lambda nome: (liberar.wait(), processar(nome))
+
+    caminho = fila.enfileirar(io.BytesIO(imagem_png()), 'alunos')
+    assert fila.status(caminho) == 'pendente'
+
+    liberar.set()
+    fila.aguardar(timeout=10)
+
+    assert fila.status(caminho) == 'pronta'
+    pasta = app.config['UPLOAD_FOLDER']
+    with Image.open(os.path.join(pasta, caminho)) as media:
+        assert media.size == (800, 600)
+    with Image.open(os.path.join(pasta, caminho_variante(caminho, 'thumb'))) as thumb:
+        assert thumb.size == (200, 150)
+    original = os.path.splitext(caminho)[0] + '_original.png'
+    with Image.open(os.path.join(pasta, original)) as imagem:
+        assert imagem.size == (1600, 1200)
+    assert arquivos_da_fila(fila) == []
+
+
+def test_retomar_tarefas_pendentes(app, fila):
+    """Testa que tarefas gravadas na fila são retomadas por uma nova fila."""
+    fila._enviar = lambda nome: None
+    caminho = fila.enfileirar(io.BytesIO(imagem_png()), 'alunos')
+    assert fila.status(caminho) == 'pendente'
+
+    nova = FilaFotos(app.config['UPLOAD_FOLDER'])
+    assert nova.retomar() == 1
+    nova.aguardar(timeout=10)
+    assert nova.status(caminho) == 'pronta'
+
+
+def test_tarefa_travada_por_outro_processo(app, fila):
+    """Testa que uma tarefa em processamento por outro processo não é repetida."""
+    fila._enviar = lambda nome: None
+    caminho = fila.enfileirar(io.BytesIO(imagem_png()), 'alunos')
+    tarefa_id = modulo_fotos._id_tarefa(caminho)
+
+    # Outra fila (outro processo) retoma a pasta enquanto a tarefa está travada
+    nova = FilaFotos(app.config['UPLOAD_FOLDER'])
+    with open(fila.caminho_tarefa(tarefa_id), encoding='utf-8') as arquivo:
+        assert travar(arquivo, esperar=False)
+        assert nova.retomar() == 1
+        nova.aguardar(timeout=10)
+        assert nova.status(caminho) == 'pendente'
+
+    nova.retomar()
+    nova.aguardar(timeout=10)
+    assert nova.status(caminho) == 'pronta'
+    assert arquivos_da_fila(fila) == []
+
+
+def test_retomada_na_primeira_requisicao(app, fila):
+    """Testa que as tarefas pendentes são retomadas na primeira requisição do processo."""
+    fila._enviar = lambda nome: None
+    caminho = fila.enfileirar(io.BytesIO(imagem_png()), 'alunos')
+    app.extensions['fila_fotos'] = nova = FilaFotos(app.config['UPLOAD_FOLDER'])
+
+    app.test_client().get('/api/ocupacao')
+    nova.aguardar(timeout=10)
+    assert nova.status(caminho) == 'pronta'
+
+
+def test_arquivo_invalido_marca_erro(fila):
+    """Testa que falhas de processamento deixam a tarefa marcada como erro."""
+    caminho = fila.enfileirar(io.BytesIO(imagem_png()[:200]), 'alunos')
+    fila.aguardar(timeout=10)
+    assert fila.status(caminho) == 'erro'
+    assert fila.status('../../etc/passwd') == 'inexistente'
+
+
+def test_rota_enviar_foto_aluno(app, fila, aluno, login_sessao):
+    """Testa o envio da foto pela API e a troca da foto anterior."""
+    client = login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+
+    response = client.post(
+        f'/api/alunos/{aluno.id}/foto',
+        data={'foto': (io.BytesIO(imagem_png()), 'foto.png')},
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 202
+    assert response.json['status'] == 'pendente'
+    primeira = response.json['foto_url']
+    assert primeira.startswith('alunos/')
+    fila.aguardar(timeout=10)
+
+    response = client.get(f'/api/fotos/status?caminho={primeira}')
+    assert response.json['status'] == 'pronta'
+
+    # A foto anterior só é apagada se não tiver sido modificada recentemente
+    antiga = time.time() - 2 * modulo_fotos.IDADE_MINIMA_EXCLUSAO
+    for arquivo in modulo_fotos._arquivos_da_foto(app.config['UPLOAD_FOLDER'], primeira):
+        os.utime(arquivo, (antiga, antiga))
+
+    response = client.post(
+        f'/api/alunos/{aluno.id}/foto',
+        data={'foto': (io.BytesIO(imagem_png(cor='blue')), 'nova.png')},
+        content_type='multipart/form-data'
+    )
+    fila.aguardar(timeout=10)
+    assert Aluno.query.get(aluno.id).foto_url == response.json['foto_url']
+    pasta = os.path.dirname(os.path.join(app.config['UPLOAD_FOLDER'], primeira))
+    assert not os.path.exists(pasta) or not os.listdir(pasta)
+
+    response = client.post(
+        f'/api/alunos/{aluno.id}/foto',
+        data={'foto': (io.BytesIO(b'texto'), 'foto.txt')},
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 400
+
+
+def test_excluir_aluno_apaga_foto(app, fila, aluno, login_sessao):
+    """Testa que a foto do aluno excluído não fica órfã no disco."""
+    client = login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+    caminho = fila.enfileirar(io.BytesIO(imagem_png()), 'alunos')
+    fila.aguardar(timeout=10)
+    aluno.foto_url = caminho
+    db.session.commit()
+    antiga = time.time() - 2 * modulo_fotos.IDADE_MINIMA_EXCLUSAO
+    arquivos = modulo_fotos._arquivos_da_foto(app.config['UPLOAD_FOLDER'], caminho)
+    for arquivo in arquivos:
+        os.utime(arquivo, (antiga, antiga))
+
+    assert client.delete(f'/api/alunos/{aluno.id}').status_code == 204
+    assert fila.status(caminho) == 'inexistente'
+    assert not any(os.path.exists(arquivo) for arquivo in arquivos)
+
+
+def test_rota_enviar_foto_no_corpo(app, fila, aluno, login_sessao):
+    """Testa o envio da imagem direto no corpo da requisição."""
+    client = login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+
+    response = client.post(
+        f'/api/alunos/{aluno.id}/foto',
+        data=imagem_png(),
+        content_type='image/png'
+    )
+    assert response.status_code == 202
+    fila.aguardar(timeout=10)
+    assert fila.status(response.json['foto_url']) == 'pronta'
+
+    # O tipo vem do conteúdo, não do Content-Type nem do nome
+    response = client.post(
+        f'/api/alunos/{aluno.id}/foto',
+        data={'foto': (io.BytesIO(b'<html></html>'), 'foto.png')},
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 400
+    assert 'text/html' in response.json['erro']
+
+    fila.limite_bytes = 1024
+    response = client.post(
+        f'/api/alunos/{aluno.id}/foto',
+        data=imagem_png(cor='blue'),
+        content_type='image/png'
+    )
+    assert response.status_code == 413
+
+
+def test_upload_grande_recusado_antes_de_ler(app, fila, aluno, login_sessao, monkeypatch):
+    """Testa que o Content-Length acima do limite é recusado sem ler o corpo."""
+    client = login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+    fila.limite_bytes = 1024 * 1024
+    lidos = []
+    monkeypatch.setattr(
+        'werkzeug.wrappers.request.Request.files',
+        property(lambda request: lidos.append(1))
+    )
+
+    response = client.post(
+        f'/api/alunos/{aluno.id}/foto',
+        data={'foto': (io.BytesIO(b'0' * (2 * 1024 * 1024)), 'foto.png')},
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 413
+    assert response.json['erro'] == 'Arquivo maior que 1MB'
+    assert lidos == []
+
+
+class FluxoContado(io.BytesIO):
+    """BytesIO que registra quantos bytes foram lidos."""
+
+    lidos = 0
+
+    def read(self, tamanho=-1):
+        bloco = super().read(tamanho)
+        self.lidos += len(bloco)
+        return bloco
+
+
+def test_limite_de_pixels_antes_de_ler_tudo(app, fila, monkeypatch):
+    """Testa que imagens grandes demais são recusadas pelo cabeçalho."""
+    monkeypatch.setattr(modulo_fotos, 'TAMANHO_BLOCO', 1024)
+    fila.limite_pixels = 1000 * 1000
+    buffer = io.BytesIO()
+    Image.effect_noise((1200, 1200), 64).save(buffer, format='PNG')
+    fluxo = FluxoContado(buffer.getvalue())
+
+    with pytest.raises(FotoInvalida, match='pixels demais'):
+        fila.enfileirar(fluxo, 'alunos')
+    assert fluxo.lidos == 1024
+    assert arquivos_da_fila(fila) == []
+
+    assert fila.enfileirar(io.BytesIO(imagem_png(800, 600)), 'alunos')
+
+
+def test_enfileirar_recusa_conteudo_invalido(fila):
+    """Testa a recusa de arquivos vazios, não imagens e acima do limite."""
+    with pytest.raises(FotoInvalida, match='vazio'):
+        fila.enfileirar(io.BytesIO(b''), 'alunos')
+    with pytest.raises(FotoInvalida, match='text/plain'):
+        fila.enfileirar(io.BytesIO(b'nao e imagem'), 'alunos')
+
+    fila.limite_bytes = 100
+    with pytest.raises(FotoGrandeDemais):
+        fila.enfileirar(io.BytesIO(imagem_png()), 'alunos')
+    assert arquivos_da_fila(fila) == []
+
+
+def test_fotos_enderecadas_pelo_conteudo(app, fila):
+    """Testa que fotos idênticas compartilham os mesmos arquivos."""
+    conteudo = imagem_png()
+    primeira = fila.enfileirar(io.BytesIO(conteudo), 'alunos')
+    segunda = fila.enfileirar(io.BytesIO(conteudo), 'alunos')
+    fila.aguardar(timeout=10)
+
+    resumo = hashlib.sha256(conteudo).hexdigest()
+    assert primeira == segunda == f'alunos/{resumo[:2]}/{resumo[2:4]}/{resumo}.jpg'
+    pasta = os.path.dirname(os.path.join(app.config['UPLOAD_FOLDER'], primeira))
+    assert len(os.listdir(pasta)) == 3
+
+
+def test_excluir_foto_referenciada(app, fila, aluno):
+    """Testa que a foto só é apagada quando ninguém mais a usa."""
+    caminho = fila.enfileirar(io.BytesIO(imagem_png()), 'alunos')
+    fila.aguardar(timeout=10)
+    gerente = Usuario.query.filter_by(tipo='gerente').first()
+    aluno.foto_url = caminho
+    gerente.foto_url = caminho
+    db.session.commit()
+    assert contar_referencias(caminho) == 2
+
+    assert excluir_foto(caminho, idade_minima=0) is False
+    aluno.foto_url = None
+    db.session.commit()
+    assert excluir_foto(caminho, idade_minima=0) is False
+    gerente.foto_url = None
+    db.session.commit()
+    # Sem referências, mas modificada há pouco: pode estar sendo reaproveitada
+    assert excluir_foto(caminho) is False
+    assert excluir_foto(caminho, idade_minima=0) is True
+    assert fila.status(caminho) == 'inexistente'
+
+
+def test_reaproveitamento_protege_foto_da_exclusao(app, fila):
+    """Testa que um upload idêntico renova a foto e impede a exclusão concorrente."""
+    conteudo = imagem_png()
+    caminho = fila.enfileirar(io.BytesIO(conteudo), 'alunos')
+    fila.aguardar(timeout=10)
+    antiga = time.time() - 2 * modulo_fotos.IDADE_MINIMA_EXCLUSAO
+    arquivos = modulo_fotos._arquivos_da_foto(app.config['UPLOAD_FOLDER'], caminho)
+    for arquivo in arquivos:
+        os.utime(arquivo, (antiga, antiga))
+
+    # Outro upload da mesma foto, cuja referência ainda não foi gravada
+    assert fila.enfileirar(io.BytesIO(conteudo), 'alunos') == caminho
+    assert excluir_foto(caminho) is False
+    assert verificar_fotos(fila, remover=True, idade_minima=60)['orfaos'] == []
+    assert fila.status(caminho) == 'pronta'
+
+    for arquivo in arquivos:
+        os.utime(arquivo, (antiga, antiga))
+    assert excluir_foto(caminho) is True
+
+
+def test_verificar_fotos_remove_orfaos(app, fila, aluno):
+    """Testa a verificação e a coleta de arquivos órfãos."""
+    usada = fila.enfileirar(io.BytesIO(imagem_png()), 'alunos')
+    orfa = fila.enfileirar(io.BytesIO(imagem_png(cor='blue')), 'alunos')
+    invalida = fila.enfileirar(io.BytesIO(imagem_png(cor='green')[:200]), 'alunos')
+    fila.aguardar(timeout=10)
+    aluno.foto_url = usada
+    Usuario.query.filter_by(tipo='gerente').first().foto_url = 'usuarios/ab/cd/inexistente.jpg'
+    db.session.commit()
+
+    # Arquivos recentes são preservados
+    assert verificar_fotos(fila)['orfaos'] == []
+
+    resultado = verificar_fotos(fila, idade_minima=0)
+    assert len(resultado['orfaos']) == 5  # 3 variantes da órfã + tarefa e upload com erro
+    assert resultado['faltando'] == ['usuarios/ab/cd/inexistente.jpg']
+    assert not resultado['removidos']
+
+    runner = app.test_cli_runner()
+    saida = runner.invoke(gymflow, ['fotos-fsck', '--remover', '--idade-minima', '0'])
+    assert saida.exit_code == 0
+    assert '5 arquivos órfãos removidos' in saida.output
+
+    pasta = app.config['UPLOAD_FOLDER']
+    assert os.path.exists(os.path.join(pasta, usada))
+    assert not os.path.exists(os.path.join(pasta, os.path.dirname(orfa)))
+    assert fila.status(invalida) == 'inexistente'
+    assert verificar_fotos(fila, idade_minima=0)['orfaos'] == []
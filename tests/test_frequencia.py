@@ -0,0 +1,221 @@
+"""Testes para os agregados e o relatório de frequência."""
+
+import pytest
+from datetime import date, datetime
+from sqlalchemy import delete, select
+from backend import create_app
+from backend.comandos import gymflow
+from backend.frequencia import inicio_da_semana, reconstruir_frequencias
+from backend.models import (
+    Usuario, Presenca, FrequenciaTurmaDia, FrequenciaAlunoSemana, OcupacaoHora,
+    criar_gerente_padrao, db
+)
+from backend.presencas import FilaPresencas, validar_evento
+
+
+@pytest.fixture
+def app():
+    """Fixture que cria uma instância do app para testes."""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        criar_gerente_padrao()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def fila(app, tmp_path):
+    """Fixture com uma fila de presenças em uma pasta temporária."""
+    fila = FilaPresencas(app, str(tmp_path), intervalo=None, fsync=False)
+    app.extensions['fila_presencas'] = fila
+    return fila
+
+
+@pytest.fixture
+def client(app, fila, login_sessao):
+    """Fixture com um cliente autenticado como gerente."""
+    return login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+
+
+# Segunda-feira 04/03/2024 a domingo 10/03/2024, e a segunda seguinte.
+# Horários em UTC; no fuso padrão (UTC-3) são 07h10, 07h20, ... 18h, 07h.
+EVENTOS = [
+    (1, 1, '2024-03-04T10:10:00', 'entrada'),
+    (2, 1, '2024-03-04T10:20:00', 'entrada'),
+    (1, 1, '2024-03-04T11:05:00', 'saida'),
+    (3, 1, '2024-03-04T11:30:00', 'entrada'),
+    (2, 1, '2024-03-04T12:00:00', 'saida'),
+    (1, 2, '2024-03-10T21:00:00', 'entrada'),
+    (1, 1, '2024-03-11T10:00:00', 'entrada'),
+]
+
+
+def eventos(linhas=EVENTOS):
+    """Eventos validados a partir de (aluno_id, turma_id, data, tipo)."""
+    return [
+        validar_evento({'aluno_id': a, 'turma_id': t, 'data': d, 'tipo': tipo})
+        for a, t, d, tipo in linhas
+    ]
+
+
+def agregados():
+    """Conteúdo das três tabelas agregadas, em ordem."""
+    return {
+        modelo.__tablename__: sorted(
+            tuple(linha) for linha in db.session.execute(select(*modelo.__table__.columns))
+        )
+        for modelo in (FrequenciaTurmaDia, FrequenciaAlunoSemana, OcupacaoHora)
+    }
+
+
+def test_inicio_da_semana():
+    """Testa o cálculo da segunda-feira da semana."""
+    assert inicio_da_semana(date(2024, 3, 4)) == date(2024, 3, 4)
+    assert inicio_da_semana(date(2024, 3, 10)) == date(2024, 3, 4)
+    assert inicio_da_semana(date(2024, 3, 11)) == date(2024, 3, 11)
+
+
+def test_gravacao_em_lote_atualiza_agregados(app, fila):
+    """Testa a soma incremental a cada descarga da fila de presenças."""
+    fila.registrar(eventos(EVENTOS[:3]))
+    fila.descarregar()
+    fila.registrar(eventos(EVENTOS[3:]))
+    fila.descarregar()
+
+    assert agregados() == {
+        'frequencia_turma_dia': [
+            (1, date(2024, 3, 4), 3, 2),
+            (1, date(2024, 3, 11), 1, 0),
+            (2, date(2024, 3, 10), 1, 0),
+        ],
+        'frequencia_aluno_semana': [
+            (1, date(2024, 3, 4), 2),
+            (1, date(2024, 3, 11), 1),
+            (2, date(2024, 3, 4), 1),
+            (3, date(2024, 3, 4), 1),
+        ],
+        'ocupacao_hora': [
+            (1, date(2024, 3, 4), 7, 2, 0),
+            (1, date(2024, 3, 4), 8, 1, 1),
+            (1, date(2024, 3, 4), 9, 0, 1),
+            (1, date(2024, 3, 11), 7, 1, 0),
+            (2, date(2024, 3, 10), 18, 1, 0),
+        ],
+    }
+
+
+def test_reconstrucao_igual_a_soma_incremental(app, fila):
+    """Testa que a recompactação produz os mesmos agregados que a ingestão."""
+    fila.registrar(eventos())
+    fila.descarregar()
+    incremental = agregados()
+
+    assert reconstruir_frequencias() == {
+        'frequencia_turma_dia': 3,
+        'ocupacao_hora': 5,
+        'frequencia_aluno_semana': 4,
+    }
+    assert agregados() == incremental
+
+
+def test_reconstrucao_de_intervalo(app, fila):
+    """Testa a recompactação de um intervalo, ampliado para semanas inteiras."""
+    fila.registrar(eventos())
+    fila.descarregar()
+    incremental = agregados()
+
+    # Presenças gravadas fora da fila (ex.: importação direta)
+    db.session.add(Presenca(aluno_id=4, turma_id=1, data=datetime(2024, 3, 6, 13), tipo='entrada'))
+    db.session.add(Presenca(aluno_id=4, turma_id=1, data=datetime(2024, 3, 12, 13), tipo='entrada'))
+    db.session.commit()
+
+    # A quarta-feira 06/03 refaz a semana de 04 a 10/03 inteira
+    reconstruir_frequencias(date(2024, 3, 6), date(2024, 3, 6))
+    depois = agregados()
+    assert (4, date(2024, 3, 4), 1) in depois['frequencia_aluno_semana']
+    assert (1, date(2024, 3, 4), 2) in depois['frequencia_aluno_semana']
+    assert (1, date(2024, 3, 6), 10, 1, 0) in depois['ocupacao_hora']
+    # A semana seguinte não foi refeita
+    assert (4, date(2024, 3, 11), 1) not in depois['frequencia_aluno_semana']
+    assert [l for l in depois['frequencia_turma_dia'] if l[1] >= date(2024, 3, 11)] == \
+        [l for l in incremental['frequencia_turma_dia'] if l[1] >= date(2024, 3, 11)]
+
+
+def test_dia_e_semana_no_horario_local(app, fila):
+    """Testa que a virada do dia e da semana segue o fuso, na soma e na recompactação."""
+    # Domingo 10/03 às 23h30 locais: já é segunda 11/03 em UTC
+    fila.registrar(eventos([(1, 1, '2024-03-11T02:30:00', 'entrada')]))
+    fila.descarregar()
+    esperado = {
+        'frequencia_turma_dia': [(1, date(2024, 3, 10), 1, 0)],
+        'frequencia_aluno_semana': [(1, date(2024, 3, 4), 1)],
+        'ocupacao_hora': [(1, date(2024, 3, 10), 23, 1, 0)],
+    }
+    assert agregados() == esperado
+
+    reconstruir_frequencias()
+    assert agregados() == esperado
+    reconstruir_frequencias(date(2024, 3, 10), date(2024, 3, 10))
+    assert agregados() == esperado
+
+    app.config['OCUPACAO_FUSO_HORAS'] = 0
+    reconstruir_frequencias()
+    assert agregados()['frequencia_aluno_semana'] == [(1, date(2024, 3, 11), 1)]
+
+
+def test_relatorio_frequencia(client, fila):
+    """Testa o relatório, lido apenas das tabelas agregadas."""
+    fila.registrar(eventos())
+    fila.descarregar()
+    # Os relatórios não dependem das linhas de presencas
+    db.session.execute(delete(Presenca))
+    db.session.commit()
+
+    response = client.get('/api/relatorios/frequencia?inicio=2024-03-04&fim=2024-03-10')
+    assert response.status_code == 200
+    dados = response.json
+    assert dados['inicio'] == '2024-03-04'
+    assert dados['por_dia'] == [
+        {'turma_id': 1, 'dia': '2024-03-04', 'entradas': 3, 'saidas': 2},
+        {'turma_id': 2, 'dia': '2024-03-10', 'entradas': 1, 'saidas': 0},
+    ]
+    assert [(h['hora'], h['ocupacao']) for h in dados['ocupacao']] == [(7, 2), (8, 2), (9, 1), (18, 1)]
+    assert dados['semanas'] == [
+        {'semana': '2024-03-04', 'alunos': 3, 'visitas': 4, 'media_por_aluno': 1.33}
+    ]
+
+    response = client.get('/api/relatorios/frequencia?inicio=2024-03-01&fim=2024-03-31&aluno_id=1&turma_id=2')
+    dados = response.json
+    assert dados['por_dia'] == [{'turma_id': 2, 'dia': '2024-03-10', 'entradas': 1, 'saidas': 0}]
+    assert dados['semanas'] == [
+        {'aluno_id': 1, 'semana': '2024-03-04', 'visitas': 2},
+        {'aluno_id': 1, 'semana': '2024-03-11', 'visitas': 1},
+    ]
+
+
+def test_relatorio_frequencia_parametros(client):
+    """Testa o intervalo padrão e os parâmetros inválidos."""
+    response = client.get('/api/relatorios/frequencia')
+    assert response.status_code == 200
+    assert (date.fromisoformat(response.json['fim']) - date.fromisoformat(response.json['inicio'])).days == 29
+
+    assert client.get('/api/relatorios/frequencia?inicio=04/03/2024').status_code == 400
+    assert client.get('/api/relatorios/frequencia?inicio=2024-03-10&fim=2024-03-01').status_code == 400
+    assert client.get('/api/relatorios/frequencia?inicio=2022-01-01&fim=2024-01-01').status_code == 400
+
+
+def test_comando_rollup_presencas(app):
+    """Testa o comando de recompactação dos agregados."""
+    db.session.add_all(
+        Presenca(aluno_id=a, turma_id=t, data=datetime.fromisoformat(d), tipo=tipo)
+        for a, t, d, tipo in EVENTOS
+    )
+    db.session.commit()
+
+    saida = app.test_cli_runner().invoke(gymflow, ['rollup-presencas', '--desde', '2024-03-11'])
+    assert saida.exit_code == 0
+    assert 'frequencia_turma_dia: 1 linhas' in saida.output
+    assert agregados()['frequencia_aluno_semana'] == [(1, date(2024, 3, 11), 1)]
@@ -0,0 +1,143 @@
+"""Testes para a importação de alunos a partir de CSV."""
+
+import io
+import pytest
+from datetime import date
+from backend import create_app
+from backend.models import Usuario, Aluno, criar_gerente_padrao, init_db, db
+from backend.importacao import importar_alunos_csv
+from backend.comandos import gymflow
+
+
+CABECALHO = 'nome,email,cpf,data_nascimento,objetivo,plano_id\n'
+
+
+@pytest.fixture
+def app():
+    """Fixture que cria uma instância do app para testes."""
+    app = create_app('testing')
+
+    with app.app_context():
+        # Tabelas, planos básicos e gerente, como em ``flask gymflow init-db``
+        init_db()
+        criar_gerente_padrao()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def aluno_existente(app):
+    """Fixture que cria um aluno já cadastrado."""
+    aluno = Aluno(
+        nome='Existente',
+        email='existente@teste.com',
+        cpf='529.982.247-25',
+        data_nascimento=date(1990, 1, 1)
+    )
+    db.session.add(aluno)
+    db.session.commit()
+    return aluno
+
+
+def test_importar_alunos_csv(aluno_existente, contador_queries):
+    """Testa a importação com validação, deduplicação e inserção em lotes."""
+    arquivo = io.StringIO(
+        CABECALHO
+        + 'Ana,ana@teste.com,111.444.777-35,1995-05-10,emagrecimento,1\n'
+        + 'Bruno,bruno@teste.com,39053344705,10/02/1988,,\n'
+        + 'Carla,carla@teste.com,123.456.789-00,1990-01-01,,\n'
+        + 'Duda,EXISTENTE@teste.com,86288366757,1990-01-01,,\n'
+        + 'Eva,eva@teste.com,529.982.247-25,1990-01-01,,\n'
+        + 'Fabi,ana@teste.com,71428793860,1990-01-01,,\n'
+        + 'Gil,gil@teste.com,71428793860,1990-01-01,forca,\n'
+        + 'Hugo,hugo@teste,16899535009,1990-01-01,,\n'
+        + ',ivo@teste.com,16899535009,1990-01-01,,\n'
+        + 'Juca,juca@teste.com,16899535009,1990-01-01,,99\n'
+    )
+    contador_queries.clear()
+
+    resultado = importar_alunos_csv(arquivo, tamanho_lote=1)
+
+    assert resultado['processados'] == 10
+    assert resultado['inseridos'] == 2
+    assert [erro['linha'] for erro in resultado['erros']] == list(range(4, 12))
+    assert 'CPF inválido' in resultado['erros'][0]['erro']
+    assert 'Email já cadastrado' in resultado['erros'][1]['erro']
+    assert 'CPF já cadastrado' in resultado['erros'][2]['erro']
+    assert 'Email já cadastrado' in resultado['erros'][3]['erro']
+    assert 'Objetivo inválido' in resultado['erros'][4]['erro']
+    assert 'Email inválido' in resultado['erros'][5]['erro']
+    assert 'nome é obrigatório' in resultado['erros'][6]['erro']
+    assert 'Plano não encontrado' in resultado['erros'][7]['erro']
+
+    # Uma consulta de emails/CPFs, uma de planos e um INSERT por lote
+    selects = [sql for sql in contador_queries if sql.startswith('SELECT')]
+    inserts = [sql for sql in contador_queries if sql.startswith('INSERT')]
+    assert len(selects) == 2
+    assert len(inserts) == 2
+
+    ana = Aluno.query.filter_by(email='ana@teste.com').one()
+    assert ana.cpf == '111.444.777-35'
+    assert ana.objetivo == 'Emagrecimento'
+    assert ana.plano_id == 1
+    bruno = Aluno.query.filter_by(email='bruno@teste.com').one()
+    assert bruno.data_nascimento == date(1988, 2, 10)
+    assert bruno.status == 'ativo'
+
+
+def test_importar_alunos_csv_ponto_e_virgula(app):
+    """Testa a detecção do separador ponto e vírgula."""
+    arquivo = io.StringIO(
+        'nome;email;cpf;data_nascimento;peso\n'
+        'Ana;ana@teste.com;111.444.777-35;1995-05-10;62,5\n'
+    )
+
+    resultado = importar_alunos_csv(arquivo)
+
+    assert resultado == {'processados': 1, 'inseridos': 1, 'erros': []}
+    assert float(Aluno.query.one().peso) == 62.5
+
+
+def test_rota_importar_alunos(aluno_existente, login_sessao):
+    """Testa a rota de importação por upload."""
+    client = login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+    conteudo = (
+        CABECALHO
+        + 'Ana,ana@teste.com,111.444.777-35,1995-05-10,,\n'
+        + 'Eva,existente@teste.com,39053344705,1990-01-01,,\n'
+    ).encode('utf-8-sig')
+
+    response = client.post(
+        '/api/alunos/import',
+        data={'arquivo': (io.BytesIO(conteudo), 'alunos.csv')},
+        content_type='multipart/form-data'
+    )
+
+    assert response.status_code == 201
+    assert response.json['inseridos'] == 1
+    assert response.json['erros'][0]['linha'] == 3
+    assert Aluno.query.count() == 2
+
+
+def test_comando_import_alunos(app, tmp_path):
+    """Testa o comando flask gymflow import-alunos com relatório de erros."""
+    arquivo = tmp_path / 'alunos.csv'
+    arquivo.write_text(
+        CABECALHO
+        + 'Ana,ana@teste.com,111.444.777-35,1995-05-10,,\n'
+        + 'Bruno,bruno@teste.com,000,1995-05-10,,\n',
+        encoding='utf-8'
+    )
+    relatorio = tmp_path / 'erros.csv'
+
+    resultado = app.test_cli_runner().invoke(
+        gymflow,
+        ['import-alunos', str(arquivo), '--relatorio', str(relatorio)]
+    )
+
+    assert resultado.exit_code == 0
+    assert '2 linhas processadas, 1 alunos importados, 1 com erro' in resultado.output
+    linhas = relatorio.read_text(encoding='utf-8').splitlines()
+    assert linhas[0] == 'linha,erro'
+    assert linhas[1].startswith('3,CPF inválido')
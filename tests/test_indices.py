@@ -0,0 +1,112 @@
+"""Testes que verificam, via EXPLAIN, o uso dos índices nas consultas."""
+
+import pytest
+from datetime import date
+from sqlalchemy import event
+from backend import create_app
+from backend.models import Aluno, Pagamento, Presenca, MatriculaTurma, db
+from backend.metricas import obter_metricas_dashboard, calcular_resumo_pagamentos
+from backend.ocupacao import ContadorOcupacao
+from backend.utils import paginar_por_cursor
+
+
+@pytest.fixture
+def app():
+    """Fixture que cria uma instância do app para testes."""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def planos_de_execucao(funcao):
+    """Executa a função e retorna o EXPLAIN QUERY PLAN de cada comando."""
+    executados = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        executados.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', registrar)
+    try:
+        funcao()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', registrar)
+
+    planos = []
+    with db.engine.connect() as conexao:
+        for sql, parametros in executados:
+            linhas = conexao.exec_driver_sql(
+                f'EXPLAIN QUERY PLAN {sql}',
+                parametros
+            )
+            planos.append(' | '.join(linha[-1] for linha in linhas))
+    return planos
+
+
+def test_indices_criados(app):
+    """Testa que os índices declarados nos modelos existem no banco."""
+    for tabela, esperados in [
+        (Aluno.__table__, {'ix_alunos_status_data_matricula', 'ix_alunos_data_matricula'}),
+        (Pagamento.__table__, {'uq_pagamentos_aluno_mes', 'ix_pagamentos_mes_status'}),
+        (MatriculaTurma.__table__, {'ix_matriculas_turmas_turma_aluno', 'ix_matriculas_turmas_aluno'}),
+        (Presenca.__table__, {'ix_presencas_turma_data', 'ix_presencas_aluno_data', 'ix_presencas_data'}),
+    ]:
+        indices = {indice['name'] for indice in db.inspect(db.engine).get_indexes(tabela.name)}
+        assert esperados <= indices
+
+
+def test_pagamento_unico_por_aluno_e_mes(app):
+    """Testa a restrição de unicidade de (aluno_id, mes_referencia)."""
+    db.session.add(Pagamento(aluno_id=1, mes_referencia='2024-01'))
+    db.session.add(Pagamento(aluno_id=1, mes_referencia='2024-01'))
+    with pytest.raises(Exception):
+        db.session.commit()
+    db.session.rollback()
+
+
+def test_dashboard_usa_indices(app):
+    """Testa que as consultas do dashboard usam os índices compostos."""
+    planos = planos_de_execucao(lambda: obter_metricas_dashboard(date(2024, 3, 15)))
+
+    assert len(planos) == 2
+    assert any('ix_alunos_status_data_matricula' in plano for plano in planos)
+    assert any('ix_pagamentos_mes_status' in plano for plano in planos)
+
+
+def test_resumo_pagamentos_usa_indice(app):
+    """Testa que o resumo de pagamentos usa o índice por mês e status."""
+    planos = planos_de_execucao(lambda: calcular_resumo_pagamentos(date(2024, 3, 15)))
+
+    assert 'ix_pagamentos_mes_status' in planos[0]
+
+
+def test_busca_pagamento_por_aluno_e_mes_usa_indice(app):
+    """Testa que a busca por aluno e mês usa o índice único."""
+    planos = planos_de_execucao(lambda: Pagamento.query.filter_by(
+        aluno_id=1,
+        mes_referencia='2024-03'
+    ).first())
+
+    assert 'uq_pagamentos_aluno_mes' in planos[0]
+
+
+def test_paginacao_de_alunos_usa_indice(app):
+    """Testa que a paginação por data de matrícula evita ordenar a tabela."""
+    planos = planos_de_execucao(lambda: paginar_por_cursor(
+        Aluno.query,
+        (Aluno.data_matricula, Aluno.id),
+        limite=10
+    ))
+
+    assert 'ix_alunos_data_matricula' in planos[0]
+
+
+def test_ocupacao_usa_indice_de_data(app):
+    """Testa que as presenças do dia são lidas pelo índice de data."""
+    planos = planos_de_execucao(lambda: ContadorOcupacao().carregar())
+
+    assert len(planos) == 1
+    assert 'ix_presencas_data' in planos[0]
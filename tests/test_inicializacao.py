@@ -0,0 +1,57 @@
+"""Testes para a inicialização dos serviços de cada processo."""
+
+import pytest
+from backend import create_app
+from backend.inicializacao import TarefasDoProcesso
+
+
+@pytest.fixture
+def app():
+    """Fixture que cria uma instância do app para testes."""
+    return create_app('testing')
+
+
+def test_tarefas_rodam_uma_vez_por_processo(app, monkeypatch):
+    """Testa que as tarefas rodam na primeira chamada e de novo após um fork."""
+    chamadas = []
+    tarefas = TarefasDoProcesso()
+    tarefas.adicionar('teste', lambda: chamadas.append(1))
+
+    with app.app_context():
+        tarefas.executar(app)
+        tarefas.executar(app)
+        assert chamadas == [1]
+
+        monkeypatch.setattr('os.getpid', lambda: -1)
+        tarefas.executar(app)
+        assert chamadas == [1, 1]
+
+
+def test_falha_registrada_sem_interromper(app, caplog):
+    """Testa que uma tarefa que falha vai para o log e as seguintes ainda rodam."""
+    chamadas = []
+
+    def falhar():
+        raise RuntimeError('banco indisponível')
+
+    tarefas = TarefasDoProcesso()
+    tarefas.adicionar('a tarefa com erro', falhar)
+    tarefas.adicionar('a tarefa seguinte', lambda: chamadas.append(1))
+
+    with app.app_context():
+        tarefas.executar(app)
+
+    assert chamadas == [1]
+    assert 'Erro ao iniciar a tarefa com erro' in caplog.text
+    assert 'banco indisponível' in caplog.text
+
+
+def test_tarefas_iniciadas_na_primeira_requisicao(app):
+    """Testa que os serviços só são iniciados na primeira requisição."""
+    iniciadas = []
+    app.extensions['tarefas_do_processo'].adicionar('teste', lambda: iniciadas.append(1))
+    assert iniciadas == []
+
+    app.test_client().get('/api/ocupacao')
+    app.test_client().get('/api/ocupacao')
+    assert iniciadas == [1]
@@ -0,0 +1,119 @@
+"""Testes para as métricas agregadas do sistema."""
+
+import pytest
+from datetime import datetime, date
+from backend import create_app
+from backend.models import Usuario, Aluno, Pagamento, criar_gerente_padrao, db
+from backend.metricas import (
+    meses_anteriores, contar_pagamentos_por_mes,
+    obter_metricas_dashboard, calcular_resumo_pagamentos
+)
+
+
+HOJE = date(2024, 3, 15)
+
+
+@pytest.fixture
+def app():
+    """Fixture que cria uma instância do app para testes."""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        criar_gerente_padrao()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def dados(app):
+    """Fixture que cria alunos e pagamentos em vários meses."""
+    alunos = []
+    for i in range(3):
+        aluno = Aluno(
+            nome=f'Aluno {i}',
+            email=f'aluno{i}@teste.com',
+            cpf=f'000.000.000-0{i}',
+            data_nascimento=date(2000, 1, 1),
+            status='ativo',
+            data_matricula=datetime(2024, 3, 1) if i == 0 else datetime(2023, 1, 1)
+        )
+        alunos.append(aluno)
+    alunos.append(Aluno(
+        nome='Aluno Inativo',
+        email='inativo@teste.com',
+        cpf='000.000.000-99',
+        data_nascimento=date(2000, 1, 1),
+        status='inativo'
+    ))
+    db.session.add_all(alunos)
+    db.session.flush()
+
+    pagamentos = [
+        ('2024-03', 'pago'), ('2024-03', 'pendente'), ('2024-03', 'pago'),
+        ('2024-02', 'pago'), ('2024-02', 'pendente'),
+        ('2024-01', 'pendente'), ('2023-10', 'pago'),
+        ('2023-01', 'pendente')
+    ]
+    for i, (mes, status) in enumerate(pagamentos):
+        db.session.add(Pagamento(
+            aluno_id=alunos[i % 3].id,
+            mes_referencia=mes,
+            status=status
+        ))
+    db.session.commit()
+
+
+def test_meses_anteriores():
+    """Testa o cálculo dos meses do gráfico, inclusive na virada do ano."""
+    meses = meses_anteriores(HOJE, 6)
+    assert [m.strftime('%Y-%m') for m in meses] == [
+        '2023-10', '2023-11', '2023-12', '2024-01', '2024-02', '2024-03'
+    ]
+
+
+def test_contar_pagamentos_por_mes(dados):
+    """Testa o agrupamento por mês e status."""
+    contagens = contar_pagamentos_por_mes('2024-01', '2024-03')
+    assert contagens == {
+        '2024-03': {'pago': 2, 'pendente': 1},
+        '2024-02': {'pago': 1, 'pendente': 1},
+        '2024-01': {'pendente': 1}
+    }
+
+
+def test_metricas_dashboard(dados, contador_queries):
+    """Testa os valores do dashboard e o número de consultas."""
+    metricas = obter_metricas_dashboard(HOJE)
+
+    assert len(contador_queries) <= 2
+    assert metricas['total_alunos'] == 3
+    assert metricas['alunos_novos'] == 1
+    assert metricas['pagamentos_mes'] == 2
+    assert metricas['pagamentos_pendentes'] == 1
+    assert metricas['labels_meses'][-1] == 'Mar/2024'
+    assert metricas['dados_pagamentos'] == [1, 0, 0, 0, 1, 2]
+
+
+def test_resumo_pagamentos(dados, contador_queries):
+    """Testa o resumo de pagamentos em uma única consulta."""
+    resumo = calcular_resumo_pagamentos(HOJE)
+
+    assert len(contador_queries) == 1
+    assert resumo['total_pagos'] == 2
+    assert resumo['total_pendentes'] == 1
+    assert resumo['total_atrasados'] == 3
+    assert resumo['taxa_inadimplencia'] == pytest.approx(100 / 3)
+
+
+def test_rota_resumo_pagamentos(dados, login_sessao):
+    """Testa a rota de resumo usando o serviço de métricas."""
+    client = login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+
+    response = client.get('/api/pagamentos/resumo')
+    assert response.status_code == 200
+    assert set(response.json) == {
+        'total_pagos', 'total_pendentes',
+        'total_atrasados', 'taxa_inadimplencia'
+    }
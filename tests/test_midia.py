@@ -0,0 +1,139 @@
+"""Testes para a entrega das fotos em /media."""
+
+import hashlib
+import io
+import os
+import pytest
+from PIL import Image
+from backend import create_app
+from backend.models import Usuario, criar_gerente_padrao, db
+from backend.fotos import FilaFotos, caminho_variante
+from backend.midia import etag_enderecada
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Fixture que cria uma instância do app com uploads em pasta temporária."""
+    app = create_app('testing')
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    app.extensions['fila_fotos'] = FilaFotos(str(tmp_path))
+
+    with app.app_context():
+        db.create_all()
+        criar_gerente_padrao()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app, login_sessao):
+    """Fixture com um cliente autenticado como gerente."""
+    return login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+
+
+@pytest.fixture
+def foto(app):
+    """Fixture que grava uma foto processada e retorna seu caminho."""
+    buffer = io.BytesIO()
+    Image.new('RGB', (1600, 1200), 'red').save(buffer, format='PNG')
+    fila = app.extensions['fila_fotos']
+    caminho = fila.enfileirar(io.BytesIO(buffer.getvalue()), 'alunos')
+    fila.aguardar(timeout=10)
+    return caminho
+
+
+def test_etag_enderecada():
+    """Testa o reconhecimento de caminhos endereçados pelo conteúdo."""
+    resumo = hashlib.sha256(b'foto').hexdigest()
+    base = f'alunos/{resumo[:2]}/{resumo[2:4]}/{resumo}'
+    assert etag_enderecada(f'{base}.jpg') == resumo
+    assert etag_enderecada(f'{base}_thumb.jpg') == f'{resumo}_thumb'
+    assert etag_enderecada(f'{base}_original.png') == f'{resumo}_original'
+    assert etag_enderecada(f'alunos/00/00/{resumo}.jpg') is None
+    assert etag_enderecada('usuarios/foto_antiga.jpg') is None
+
+
+def test_servir_foto_com_cache_imutavel(app, client, foto):
+    """Testa ETag forte, cache longo e 304 sem ler o arquivo."""
+    response = client.get(f'/media/{foto}')
+    assert response.status_code == 200
+    assert response.mimetype == 'image/jpeg'
+    etag, fraco = response.get_etag()
+    assert not fraco
+    assert etag == os.path.splitext(os.path.basename(foto))[0]
+    assert response.cache_control.max_age == 365 * 24 * 3600
+    assert response.cache_control.immutable
+    assert response.cache_control.private
+    assert not response.cache_control.no_cache
+
+    # O 304 é decidido pelo nome, mesmo sem o arquivo no disco
+    os.remove(os.path.join(app.config['UPLOAD_FOLDER'], foto))
+    response = client.get(f'/media/{foto}', headers={'If-None-Match': f'"{etag}"'})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.get_etag() == (etag, False)
+
+
+def test_servir_variante_e_range(app, client, foto):
+    """Testa a entrega da miniatura e de intervalos de bytes."""
+    response = client.get(f'/media/{foto}?tamanho=thumb')
+    assert response.status_code == 200
+    assert response.get_etag()[0].endswith('_thumb')
+    with Image.open(io.BytesIO(response.data)) as imagem:
+        assert imagem.size == (200, 150)
+
+    caminho = os.path.join(app.config['UPLOAD_FOLDER'], caminho_variante(foto, 'thumb'))
+    with open(caminho, 'rb') as arquivo:
+        inicio = arquivo.read(100)
+    response = client.get(caminho_variante(f'/media/{foto}', 'thumb'), headers={'Range': 'bytes=0-99'})
+    assert response.status_code == 206
+    assert response.data == inicio
+
+    assert client.get(f'/media/{foto}?tamanho=gigante').status_code == 404
+
+
+def test_servir_foto_antiga_e_caminhos_invalidos(app, client):
+    """Testa fotos sem endereçamento por conteúdo e caminhos recusados."""
+    pasta = app.config['UPLOAD_FOLDER']
+    os.makedirs(os.path.join(pasta, 'usuarios'))
+    Image.new('RGB', (10, 10)).save(os.path.join(pasta, 'usuarios', 'antiga.jpg'))
+
+    response = client.get('/media/usuarios/antiga.jpg')
+    assert response.status_code == 200
+    assert response.cache_control.no_cache
+    assert not response.cache_control.immutable
+    response = client.get(
+        '/media/usuarios/antiga.jpg',
+        headers={'If-None-Match': response.headers['ETag']}
+    )
+    assert response.status_code == 304
+
+    os.makedirs(os.path.join(pasta, '.fila'))
+    open(os.path.join(pasta, '.fila', 'tarefa.json'), 'w').close()
+    assert client.get('/media/.fila/tarefa.json').status_code == 404
+    assert client.get('/media/../segredo.txt').status_code == 404
+    assert client.get('/media/alunos/inexistente.jpg').status_code == 404
+
+
+def test_delegar_ao_servidor_web(app, client, foto):
+    """Testa X-Accel-Redirect e X-Sendfile."""
+    app.config['MEDIA_ACCEL_REDIRECT'] = '/_uploads/'
+    response = client.get(f'/media/{foto}')
+    assert response.status_code == 200
+    assert response.headers['X-Accel-Redirect'] == f'/_uploads/{foto}'
+    assert response.mimetype == 'image/jpeg'
+    assert response.data == b''
+    assert response.cache_control.immutable
+
+    app.config['MEDIA_ACCEL_REDIRECT'] = None
+    app.config['USE_X_SENDFILE'] = True
+    response = client.get(f'/media/{foto}?tamanho=thumb')
+    assert response.headers['X-Sendfile'].endswith(caminho_variante(foto, 'thumb'))
+    assert response.data == b''
+
+
+def test_media_exige_login(app, foto):
+    """Testa que as fotos não são públicas."""
+    client = app.test_client()
+    assert client.get(f'/media/{foto}').status_code in (302, 401)
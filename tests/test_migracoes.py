@@ -0,0 +1,137 @@
+"""Testes das migrações e da inicialização do banco pela linha de comando."""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import pytest
+from alembic.script import ScriptDirectory
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ESQUEMA_INICIAL = os.path.join(RAIZ, 'tests', 'dados', 'esquema_inicial.sql')
+
+
+@pytest.fixture
+def banco(tmp_path):
+    """Caminho de um arquivo SQLite em pasta temporária."""
+    return str(tmp_path / 'gymflow.db')
+
+
+def flask(banco, tmp_path, *argumentos):
+    """Executa um comando ``flask`` da aplicação contra o banco informado."""
+    ambiente = {
+        **os.environ,
+        'DATABASE_URL': f'sqlite:///{banco}',
+        'FLASK_APP': 'run.py',
+        'FLASK_ENV': 'production',
+        'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+        'PRESENCA_WAL_FOLDER': str(tmp_path / 'presencas'),
+        'OCUPACAO_FUSO_HORAS': '-3',
+    }
+    return subprocess.run(
+        [sys.executable, '-m', 'flask', *argumentos],
+        cwd=RAIZ,
+        env=ambiente,
+        capture_output=True,
+        text=True,
+        timeout=120
+    )
+
+
+def revisao_atual(conexao):
+    """Revisão registrada em alembic_version."""
+    return conexao.execute('SELECT version_num FROM alembic_version').fetchone()[0]
+
+
+def revisao_mais_recente():
+    """Última revisão da pasta de migrações."""
+    return ScriptDirectory(os.path.join(RAIZ, 'migrations')).get_current_head()
+
+
+def colunas(conexao, tabela):
+    """Nomes das colunas de uma tabela."""
+    return {linha[1] for linha in conexao.execute(f'PRAGMA table_info({tabela})')}
+
+
+def test_upgrade_de_banco_com_esquema_inicial(banco, tmp_path):
+    """Testa ``flask db upgrade`` em um banco criado antes das migrações."""
+    with open(ESQUEMA_INICIAL, encoding='utf-8') as arquivo:
+        esquema = arquivo.read()
+    with sqlite3.connect(banco) as conexao:
+        conexao.executescript(esquema)
+        conexao.execute(
+            "INSERT INTO usuarios (id, nome, email, _senha_hash, tipo, status, data_criacao, ultima_atualizacao) "
+            "VALUES (1, 'Administrador', 'admin@gymflow.com', 'x', 'gerente', 'ativo', "
+            "'2024-03-01 10:00:00', '2024-03-01 10:00:00')"
+        )
+        conexao.execute(
+            "INSERT INTO alunos (id, nome, email, cpf, data_nascimento, status, data_matricula, ultima_atualizacao) "
+            "VALUES (1, 'João Silva', 'joao@teste.com', '529.982.247-25', '2000-01-01', 'ativo', "
+            "'2024-03-01 10:00:00', '2024-03-01 10:00:00')"
+        )
+        conexao.execute(
+            "INSERT INTO presencas (aluno_id, turma_id, data, tipo) "
+            "VALUES (1, 1, '2024-03-04 02:00:00.000000', 'entrada')"
+        )
+    conexao.close()
+
+    resultado = flask(banco, tmp_path, 'db', 'upgrade')
+    assert resultado.returncode == 0, resultado.stderr
+
+    with sqlite3.connect(banco) as conexao:
+        assert revisao_atual(conexao) == revisao_mais_recente()
+        assert 'versao_token' in colunas(conexao, 'usuarios')
+        assert conexao.execute('SELECT email FROM usuarios').fetchall() == [('admin@gymflow.com',)]
+        assert conexao.execute(
+            "SELECT rowid FROM alunos_busca WHERE alunos_busca MATCH 'joao'"
+        ).fetchall() == [(1,)]
+        # Agregados no horário local: domingo 03/03 às 23h em UTC-3
+        assert conexao.execute(
+            'SELECT dia, hora, entradas FROM ocupacao_hora'
+        ).fetchall() == [('2024-03-03', 23, 1)]
+        assert conexao.execute(
+            'SELECT semana, visitas FROM frequencia_aluno_semana'
+        ).fetchall() == [('2024-02-26', 1)]
+    conexao.close()
+
+
+def test_upgrade_recusa_pagamentos_duplicados(banco, tmp_path):
+    """Testa que a migração lista os pagamentos duplicados sem criar nenhum índice."""
+    with open(ESQUEMA_INICIAL, encoding='utf-8') as arquivo:
+        esquema = arquivo.read()
+    with sqlite3.connect(banco) as conexao:
+        conexao.executescript(esquema)
+        conexao.executemany(
+            "INSERT INTO pagamentos (aluno_id, mes_referencia, status, data_criacao, ultima_atualizacao) "
+            "VALUES (?, ?, 'pendente', '2024-03-01 10:00:00', '2024-03-01 10:00:00')",
+            [(7, '2024-03'), (7, '2024-03'), (7, '2024-04'), (8, '2024-03')]
+        )
+    conexao.close()
+
+    resultado = flask(banco, tmp_path, 'db', 'upgrade')
+    assert resultado.returncode != 0
+    assert 'aluno_id=7 mes_referencia=2024-03 (2 pagamentos)' in resultado.stderr
+    assert 'mes_referencia=2024-04' not in resultado.stderr
+
+    with sqlite3.connect(banco) as conexao:
+        indices = {linha[1] for linha in conexao.execute('PRAGMA index_list(pagamentos)')}
+        assert 'ix_pagamentos_mes_status' not in indices
+        assert conexao.execute('SELECT count(*) FROM pagamentos').fetchone() == (4,)
+    conexao.close()
+
+
+def test_init_db_cria_banco_novo(banco, tmp_path):
+    """Testa que ``flask gymflow init-db`` cria as tabelas, o gerente e marca as migrações."""
+    resultado = flask(banco, tmp_path, 'gymflow', 'init-db')
+    assert resultado.returncode == 0, resultado.stderr
+    assert 'Banco inicializado' in resultado.stdout
+
+    with sqlite3.connect(banco) as conexao:
+        assert revisao_atual(conexao) == revisao_mais_recente()
+        assert 'versao_token' in colunas(conexao, 'usuarios')
+        assert ('admin@gymflow.com',) in conexao.execute('SELECT email FROM usuarios').fetchall()
+    conexao.close()
+
+    resultado = flask(banco, tmp_path, 'gymflow', 'init-db')
+    assert 'flask db upgrade' in resultado.stderr
+    assert flask(banco, tmp_path, 'db', 'upgrade').returncode == 0
@@ -0,0 +1,174 @@
+"""Testes para o contador de ocupação em memória."""
+
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import event
+from backend import create_app
+from backend.models import Usuario, Presenca, criar_gerente_padrao, db
+from backend.ocupacao import ContadorOcupacao
+from backend.presencas import FilaPresencas
+
+
+@pytest.fixture
+def app():
+    """Fixture que cria uma instância do app para testes."""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        criar_gerente_padrao()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app, tmp_path, login_sessao):
+    """Fixture com um cliente autenticado e a fila de presenças em pasta temporária."""
+    app.extensions['fila_presencas'] = FilaPresencas(app, str(tmp_path), intervalo=None, fsync=False)
+    return login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+
+
+def evento(contador, aluno_id, turma_id, tipo, minutos, dia=None):
+    """Evento de presença a tantos minutos da 01h do dia local (hoje por padrão)."""
+    inicio = contador.inicio_do_dia(dia or contador.hoje())
+    return {
+        'aluno_id': aluno_id,
+        'turma_id': turma_id,
+        'tipo': tipo,
+        'data': inicio + timedelta(hours=1, minutes=minutos)
+    }
+
+
+def test_contagem_por_turma_e_academia():
+    """Testa entradas e saídas por turma e o total de alunos na academia."""
+    contador = ContadorOcupacao()
+    contador.registrar([
+        evento(contador, 1, 10, 'entrada', 0),
+        evento(contador, 2, 10, 'entrada', 1),
+        evento(contador, 1, 20, 'entrada', 2),  # mesmo aluno em outra turma
+        evento(contador, 3, 20, 'entrada', 3),
+    ])
+    situacao = contador.situacao()
+    assert situacao['total'] == 3
+    assert situacao['turmas'] == {'10': 2, '20': 2}
+
+    contador.registrar([evento(contador, 1, 10, 'saida', 5), evento(contador, 3, 20, 'saida', 6)])
+    situacao = contador.situacao()
+    assert situacao['total'] == 2
+    assert situacao['turmas'] == {'10': 1, '20': 1}
+
+    contador.registrar([evento(contador, 1, 20, 'saida', 7), evento(contador, 2, 10, 'saida', 8)])
+    assert contador.situacao()['total'] == 0
+    assert contador.situacao()['turmas'] == {}
+
+
+def test_eventos_repetidos_e_fora_de_ordem():
+    """Testa que só o evento mais recente de cada aluno na turma vale."""
+    contador = ContadorOcupacao()
+    contador.registrar([
+        evento(contador, 1, 10, 'entrada', 0),
+        evento(contador, 1, 10, 'entrada', 1),  # cartão passado duas vezes
+        evento(contador, 2, 10, 'saida', 0),    # saída sem entrada
+    ])
+    assert contador.situacao()['turmas'] == {'10': 1}
+    versao = contador.situacao()['versao']
+
+    # Saída chega antes da entrada que a precedeu
+    contador.registrar([evento(contador, 3, 10, 'saida', 30), evento(contador, 3, 10, 'entrada', 10)])
+    assert contador.situacao()['turmas'] == {'10': 1}
+    assert contador.situacao()['versao'] == versao
+
+
+def test_virada_do_dia(monkeypatch):
+    """Testa que eventos de dias anteriores são ignorados e o contador zera."""
+    contador = ContadorOcupacao(fuso_horas=-3)
+    hoje = contador.hoje()
+    ontem = hoje - timedelta(days=1)
+    contador.registrar([
+        evento(contador, 1, 10, 'entrada', 0),
+        evento(contador, 2, 10, 'entrada', 0, dia=ontem),
+    ])
+    assert contador.situacao() == {'dia': hoje.isoformat(), 'total': 1, 'turmas': {'10': 1}, 'versao': 1}
+
+    # 02:59 UTC ainda é o dia anterior em UTC-3
+    assert contador.inicio_do_dia(date(2024, 3, 4)).isoformat() == '2024-03-04T03:00:00'
+
+    monkeypatch.setattr(contador, 'hoje', lambda: hoje + timedelta(days=1))
+    assert contador.situacao()['total'] == 0
+    assert contador.situacao()['dia'] == (hoje + timedelta(days=1)).isoformat()
+
+
+def test_carregar_do_banco_reaplica_eventos_recentes(app):
+    """Testa a remontagem com as presenças do dia e os eventos ainda não gravados."""
+    contador = ContadorOcupacao()
+    ontem = contador.hoje() - timedelta(days=1)
+    for aluno_id, tipo, minutos, dia in [
+        (1, 'entrada', 0, None),
+        (2, 'entrada', 1, None),
+        (2, 'saida', 2, None),
+        (3, 'entrada', 0, ontem),
+    ]:
+        db.session.add(Presenca(**evento(contador, aluno_id, 10, tipo, minutos, dia)))
+    db.session.commit()
+
+    # Registrado neste processo e ainda não gravado no banco
+    contador.registrar([evento(contador, 4, 20, 'entrada', 3)])
+
+    assert contador.carregar() == 3
+    assert contador.situacao()['turmas'] == {'10': 1, '20': 1}
+    assert contador.situacao()['total'] == 2
+
+
+def test_carregar_sem_mudanca_mantem_a_versao(app):
+    """Testa que remontar com a mesma contagem não muda a versão (nem o ETag)."""
+    contador = ContadorOcupacao()
+    db.session.add(Presenca(**evento(contador, 1, 10, 'entrada', 0)))
+    db.session.commit()
+
+    contador.carregar()
+    versao = contador.situacao()['versao']
+    contador.carregar()
+    assert contador.situacao()['versao'] == versao
+
+    db.session.add(Presenca(**evento(contador, 2, 10, 'entrada', 1)))
+    db.session.commit()
+    contador.carregar()
+    assert contador.situacao()['versao'] == versao + 1
+
+
+def test_rota_ocupacao_sem_consultar_o_banco(app, client):
+    """Testa que a presença conta depois de gravada e a leitura não consulta o banco."""
+    fila = app.extensions['fila_presencas']
+    client.post('/api/presencas', json=[
+        {'aluno_id': 1, 'turma_id': 10, 'tipo': 'entrada'},
+        {'aluno_id': 2, 'turma_id': 10, 'tipo': 'entrada'},
+    ])
+    assert fila.pendentes == 2
+    assert client.get('/api/ocupacao').json['total'] == 0
+    fila.descarregar()
+
+    consultas = []
+
+    def registrar_consulta(conexao, cursor, sql, *args):
+        consultas.append(sql)
+
+    event.listen(db.engine, 'before_cursor_execute', registrar_consulta)
+    try:
+        response = client.get('/api/ocupacao')
+        assert response.status_code == 200
+        assert response.json['total'] == 2
+        assert response.json['turmas'] == {'10': 2}
+        assert response.headers['Cache-Control'] == 'private, no-cache'
+
+        etag = response.headers['ETag']
+        assert client.get('/api/ocupacao', headers={'If-None-Match': etag}).status_code == 304
+        assert consultas == []
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', registrar_consulta)
+
+    client.post('/api/presencas', json={'aluno_id': 1, 'turma_id': 10, 'tipo': 'saida'})
+    fila.descarregar()
+    response = client.get('/api/ocupacao', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json['total'] == 1
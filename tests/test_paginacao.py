@@ -0,0 +1,128 @@
+"""Testes para a paginação por cursor."""
+
+import pytest
+from datetime import datetime, date
+from backend import create_app
+from backend.models import Usuario, Aluno, Pagamento, criar_gerente_padrao, db
+from backend.utils import (
+    codificar_cursor, decodificar_cursor, paginar_por_cursor
+)
+
+
+@pytest.fixture
+def app():
+    """Fixture que cria uma instância do app para testes."""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        criar_gerente_padrao()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def alunos(app):
+    """Fixture que cria alunos, alguns com a mesma data de matrícula."""
+    datas = [
+        datetime(2024, 1, 1), datetime(2024, 1, 1), datetime(2024, 1, 1),
+        datetime(2024, 2, 1), datetime(2024, 3, 1), datetime(2024, 3, 1),
+        datetime(2024, 4, 1)
+    ]
+    alunos = [
+        Aluno(
+            nome=f'Aluno {i}',
+            email=f'aluno{i}@teste.com',
+            cpf=f'000.000.000-{i:02d}',
+            data_nascimento=date(2000, 1, 1),
+            data_matricula=data
+        )
+        for i, data in enumerate(datas)
+    ]
+    db.session.add_all(alunos)
+    db.session.commit()
+    return alunos
+
+
+def test_cursor_ida_e_volta():
+    """Testa a codificação e decodificação de cursores."""
+    colunas = (Aluno.data_matricula, Aluno.id)
+    cursor = codificar_cursor([datetime(2024, 1, 2, 3, 4, 5), 42])
+    assert decodificar_cursor(cursor, colunas) == [
+        datetime(2024, 1, 2, 3, 4, 5), 42
+    ]
+
+    with pytest.raises(ValueError):
+        decodificar_cursor('nao-e-um-cursor', colunas)
+    with pytest.raises(ValueError):
+        decodificar_cursor(codificar_cursor([1]), colunas)
+
+
+def test_paginar_por_cursor_percorre_tudo(alunos, contador_queries):
+    """Testa que as páginas cobrem todos os registros sem repetição."""
+    colunas = (Aluno.data_matricula, Aluno.id)
+    vistos = []
+    cursor = None
+    paginas = 0
+    while True:
+        pagina = paginar_por_cursor(Aluno.query, colunas, cursor, limite=3)
+        vistos.extend(item['id'] for item in pagina['items'])
+        paginas += 1
+        cursor = pagina['next_cursor']
+        assert 'total' not in pagina
+        if not cursor:
+            break
+
+    esperado = [
+        aluno.id for aluno in
+        sorted(alunos, key=lambda a: (a.data_matricula, a.id), reverse=True)
+    ]
+    assert vistos == esperado
+    assert paginas == 3
+    assert not any('count(' in sql.lower() for sql in contador_queries)
+
+
+def test_paginar_por_cursor_com_total(alunos):
+    """Testa a inclusão opcional do total."""
+    pagina = paginar_por_cursor(
+        Aluno.query, (Aluno.id,), limite=5, incluir_total=True
+    )
+    assert pagina['total'] == len(alunos)
+    assert len(pagina['items']) == 5
+
+
+def test_rota_listar_alunos_paginada(alunos, login_sessao):
+    """Testa a paginação na rota de listagem de alunos."""
+    client = login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+
+    response = client.get('/api/alunos?limite=4&total=1')
+    assert response.status_code == 200
+    assert len(response.json['items']) == 4
+    assert response.json['total'] == len(alunos)
+
+    cursor = response.json['next_cursor']
+    response = client.get(f'/api/alunos?limite=4&cursor={cursor}')
+    assert len(response.json['items']) == 3
+    assert response.json['next_cursor'] is None
+
+    response = client.get('/api/alunos?cursor=invalido')
+    assert response.status_code == 400
+
+
+def test_rota_listar_pagamentos_paginada(alunos, login_sessao):
+    """Testa a paginação e os filtros na rota de pagamentos."""
+    for aluno in alunos:
+        db.session.add(Pagamento(
+            aluno_id=aluno.id,
+            mes_referencia='2024-05',
+            status='pago' if aluno.id % 2 else 'pendente'
+        ))
+    db.session.commit()
+    client = login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+
+    response = client.get('/api/pagamentos?status=pago&limite=2&total=1')
+    assert response.status_code == 200
+    assert response.json['total'] == 4
+    ids = [item['id'] for item in response.json['items']]
+    assert ids == sorted(ids, reverse=True)
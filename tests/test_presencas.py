@@ -0,0 +1,264 @@
+"""Testes para o registro de presenças em lote."""
+
+import json
+import os
+import time
+import pytest
+from datetime import date, datetime, time as dt_time
+from sqlalchemy import func, select, text
+from backend import create_app
+from backend.models import Usuario, Aluno, Presenca, Turma, criar_gerente_padrao, db
+from backend.presencas import EventoInvalido, FilaPresencas, validar_evento
+
+
+@pytest.fixture
+def app():
+    """Fixture que cria uma instância do app para testes."""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        criar_gerente_padrao()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def fila(app, tmp_path):
+    """Fixture com uma fila de presenças em uma pasta temporária."""
+    fila = FilaPresencas(app, str(tmp_path), tamanho_lote=3, intervalo=None, fsync=False)
+    app.extensions['fila_presencas'] = fila
+    return fila
+
+
+@pytest.fixture
+def client(app, fila, login_sessao):
+    """Fixture com um cliente autenticado como gerente."""
+    return login_sessao(Usuario.query.filter_by(tipo='gerente').first())
+
+
+def evento(aluno_id=1, tipo='entrada', minuto=0):
+    """Evento de presença com data fixa."""
+    return {
+        'aluno_id': aluno_id,
+        'turma_id': 1,
+        'tipo': tipo,
+        'data': f'2024-03-01T07:{minuto:02d}:00'
+    }
+
+
+def contar_presencas():
+    """Quantidade de presenças no banco."""
+    return db.session.scalar(select(func.count()).select_from(Presenca))
+
+
+def segmentos(pasta):
+    """Segmentos de log na pasta."""
+    return [nome for nome in os.listdir(pasta) if nome.endswith('.wal')]
+
+
+def test_validar_evento():
+    """Testa a validação e a normalização de eventos."""
+    assert validar_evento({'aluno_id': '7', 'turma_id': 2, 'tipo': 'saida', 'data': '2024-03-01T07:30:00'}) == {
+        'aluno_id': 7,
+        'turma_id': 2,
+        'tipo': 'saida',
+        'data': datetime(2024, 3, 1, 7, 30)
+    }
+    assert isinstance(validar_evento({'aluno_id': 1, 'turma_id': 1, 'tipo': 'entrada'})['data'], datetime)
+
+    for dados, mensagem in [
+        (None, 'objeto'),
+        ({'turma_id': 1, 'tipo': 'entrada'}, 'aluno_id'),
+        ({'aluno_id': 'x', 'turma_id': 1, 'tipo': 'entrada'}, 'inteiros'),
+        ({'aluno_id': 0, 'turma_id': 1, 'tipo': 'entrada'}, 'positivos'),
+        ({'aluno_id': 2 ** 63, 'turma_id': 1, 'tipo': 'entrada'}, 'intervalo'),
+        ({'aluno_id': 1, 'turma_id': 1, 'tipo': 'pausa'}, 'Tipo'),
+        ({'aluno_id': 1, 'turma_id': 1, 'tipo': 'entrada', 'data': 'ontem'}, 'Data'),
+        ({'aluno_id': 1, 'turma_id': 1, 'tipo': 'entrada', 'data': '2024-03-01T07:00:00+03:00'}, 'UTC'),
+    ]:
+        with pytest.raises(EventoInvalido, match=mensagem):
+            validar_evento(dados)
+
+
+def test_registrar_evento_grava_log_antes_do_banco(client, fila):
+    """Testa que o evento vai para o log e só depois, em lote, para o banco."""
+    response = client.post('/api/presencas', json=evento())
+
+    assert response.status_code == 201
+    assert response.json == {**evento(), 'data': '2024-03-01T07:00:00'}
+    assert contar_presencas() == 0
+    assert fila.pendentes == 1
+    [segmento] = segmentos(fila.pasta)
+    with open(os.path.join(fila.pasta, segmento), encoding='utf-8') as arquivo:
+        assert json.loads(arquivo.read())['aluno_id'] == 1
+
+    assert fila.descarregar() == 1
+    assert contar_presencas() == 1
+    assert fila.pendentes == 0
+    assert segmentos(fila.pasta) == []
+    assert fila.descarregar() == 0
+
+
+def test_lote_descarrega_ao_atingir_tamanho(client, fila):
+    """Testa o registro em lote e a descarga ao atingir tamanho_lote."""
+    response = client.post('/api/presencas', json=[evento(1), evento(2)])
+    assert response.status_code == 201
+    assert response.json == {'aceitos': 2}
+    assert contar_presencas() == 0
+
+    client.post('/api/presencas', json=[evento(3), evento(3, 'saida', 50)])
+    assert contar_presencas() == 4
+    assert fila.pendentes == 0
+    assert db.session.scalar(
+        select(Presenca.tipo).where(Presenca.aluno_id == 3).order_by(Presenca.data.desc())
+    ) == 'saida'
+
+
+def test_lote_invalido_nao_registra_nada(client, fila):
+    """Testa que um evento inválido recusa o lote inteiro."""
+    response = client.post('/api/presencas', json=[evento(1), {'aluno_id': 2}])
+    assert response.status_code == 400
+    assert response.json['erro'].startswith('Evento 1:')
+
+    response = client.post('/api/presencas', data='x', content_type='application/json')
+    assert response.status_code == 400
+    assert fila.pendentes == 0
+    assert segmentos(fila.pasta) == []
+
+
+def test_recupera_log_de_processo_encerrado(app, fila):
+    """Testa a recuperação do log sem duplicar eventos já gravados."""
+    fila.tamanho_lote = 100
+    fila.registrar([validar_evento(evento(1)), validar_evento(evento(2))])
+    # Simula uma queda depois do commit e antes de apagar o segmento
+    fila._inserir(fila._eventos)
+    fila.registrar([validar_evento(evento(3))])
+
+    # O segmento está travado pelo "processo" em execução
+    outra = FilaPresencas(app, fila.pasta, intervalo=None)
+    assert outra.retomar() == 0
+
+    # O processo termina sem descarregar: a trava é liberada
+    fila._segmento.close()
+    with open(os.path.join(fila.pasta, segmentos(fila.pasta)[0]), 'a', encoding='utf-8') as arquivo:
+        arquivo.write('{"aluno_id": 9, "tur')  # última linha incompleta
+
+    assert outra.retomar() == 1
+    assert contar_presencas() == 3
+    assert segmentos(fila.pasta) == []
+
+
+def test_linhas_corrompidas_sao_separadas(app, fila, caplog):
+    """Testa que linhas ilegíveis não impedem a recuperação do segmento."""
+    linhas = [
+        json.dumps(evento(1)) + '\n',
+        'lixo\n',
+        json.dumps({**evento(2), 'data': 'ontem'}) + '\n',
+        json.dumps({'aluno_id': 3}) + '\n',
+        json.dumps({**evento(5), 'aluno_id': 2 ** 63}) + '\n',
+        json.dumps(evento(4)) + '\n',
+    ]
+    with open(os.path.join(fila.pasta, '1-1.wal'), 'w', encoding='utf-8') as arquivo:
+        arquivo.writelines(linhas)
+
+    assert fila.retomar() == 2
+    assert contar_presencas() == 2
+    assert segmentos(fila.pasta) == []
+    with open(os.path.join(fila.pasta, 'corrompidos.jsonl'), encoding='utf-8') as arquivo:
+        separadas = [json.loads(linha) for linha in arquivo]
+    assert separadas == [{'segmento': '1-1.wal', 'linha': linha} for linha in linhas[1:5]]
+    assert '4 linha(s) ilegível(is)' in caplog.text
+
+
+def test_recuperacao_na_primeira_requisicao(app, fila):
+    """Testa que os segmentos deixados no disco são gravados na primeira requisição."""
+    with open(os.path.join(fila.pasta, '1-1.wal'), 'w', encoding='utf-8') as arquivo:
+        arquivo.write(json.dumps(evento(1)) + '\n')
+    assert contar_presencas() == 0
+
+    app.test_client().get('/api/ocupacao')
+    assert contar_presencas() == 1
+    assert segmentos(fila.pasta) == []
+
+
+def test_falha_no_banco_mantem_o_lote(app, fila, monkeypatch):
+    """Testa que um lote que falhou é gravado na descarga seguinte."""
+    fila.registrar([validar_evento(evento(1))])
+    inserir = fila._inserir
+
+    def falhar(eventos):
+        raise RuntimeError('banco indisponível')
+
+    monkeypatch.setattr(fila, '_inserir', falhar)
+    with pytest.raises(RuntimeError):
+        fila.descarregar()
+    fila.registrar([validar_evento(evento(2))])
+    assert fila.pendentes == 2
+    assert len(segmentos(fila.pasta)) == 2
+
+    monkeypatch.setattr(fila, '_inserir', inserir)
+    assert fila.descarregar() == 2
+    assert contar_presencas() == 2
+    assert segmentos(fila.pasta) == []
+
+
+def test_id_fora_do_intervalo_nao_trava_a_fila(app, fila):
+    """Testa que um valor que o banco não aceita vai para o arquivo de erros."""
+    # Já no log (ex.: gravado por uma versão sem a validação do intervalo)
+    fila.registrar([{**validar_evento(evento(1)), 'aluno_id': 2 ** 63}])
+    assert fila.descarregar() == 0
+
+    fila.registrar([validar_evento(evento(2))])
+    assert fila.descarregar() == 1
+    assert contar_presencas() == 1
+    assert fila.pendentes == 0
+    assert segmentos(fila.pasta) == []
+    with open(os.path.join(fila.pasta, 'erros.jsonl'), encoding='utf-8') as arquivo:
+        [recusado] = [json.loads(linha) for linha in arquivo]
+    assert recusado['aluno_id'] == 2 ** 63
+
+
+def test_eventos_recusados_vao_para_arquivo_de_erros(app, fila):
+    """Testa que eventos recusados pelo banco não impedem os demais."""
+    db.session.add(Aluno(
+        id=1,
+        nome='Aluno',
+        email='aluno@teste.com',
+        cpf='529.982.247-25',
+        data_nascimento=date(2000, 1, 1)
+    ))
+    db.session.add(Turma(
+        id=1,
+        professor_id=1,
+        modalidade='musculacao',
+        nivel='iniciante',
+        dia_semana=1,
+        horario_inicio=dt_time(8, 0),
+        horario_fim=dt_time(9, 0),
+        capacidade_maxima=10
+    ))
+    db.session.commit()
+    # Só as presenças são verificadas (a turma não tem professor cadastrado)
+    db.session.execute(text('PRAGMA foreign_keys = ON'))
+
+    fila.registrar([validar_evento(evento(1)), validar_evento(evento(99))])
+    assert fila.descarregar() == 1
+    assert contar_presencas() == 1
+    with open(os.path.join(fila.pasta, 'erros.jsonl'), encoding='utf-8') as arquivo:
+        [recusado] = [json.loads(linha) for linha in arquivo]
+    assert recusado['aluno_id'] == 99
+    assert 'FOREIGN KEY' in recusado['erro']
+
+
+def test_thread_descarrega_por_intervalo(app, tmp_path):
+    """Testa a descarga periódica pela thread em segundo plano."""
+    fila = FilaPresencas(app, str(tmp_path), tamanho_lote=100, intervalo=0.05, fsync=False)
+    fila.registrar([validar_evento(evento(1))])
+
+    limite = time.monotonic() + 5
+    while fila.pendentes and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert fila.pendentes == 0
+    assert contar_presencas() == 1
@@ -0,0 +1,117 @@
+"""Testes para a autenticação da API por token JWT sem consulta ao banco."""
+
+import pytest
+from flask import g
+from backend import create_app
+from backend.models import Usuario, criar_gerente_padrao, db
+
+
+@pytest.fixture
+def app():
+    """Fixture que cria uma instância do app para testes."""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        criar_gerente_padrao()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def usuarios(app):
+    """Fixture que cria um professor e retorna (gerente, professor)."""
+    professor = Usuario(nome='Professor', email='prof@teste.com', tipo='professor')
+    professor.senha = 'senha123'
+    db.session.add(professor)
+    db.session.commit()
+    return Usuario.query.filter_by(tipo='gerente').first(), professor
+
+
+def trocar_usuario():
+    """
+    Descarta o usuário carregado pela requisição anterior.
+
+    As requisições de teste reaproveitam o contexto da aplicação aberto
+    pela fixture, e o Flask-Login guarda o usuário atual em g.
+    """
+    g.pop('_login_user', None)
+
+
+def test_login_emite_token_valido(app, usuarios):
+    """Testa que o token retornado pelo login autentica a API."""
+    client = app.test_client()
+    response = client.post('/api/login', json={
+        'email': 'prof@teste.com',
+        'senha': 'senha123'
+    })
+    assert response.status_code == 200
+    token = response.json['token']
+
+    api = app.test_client()
+    trocar_usuario()
+    response = api.get('/api/exercicios', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+
+
+def test_token_nao_consulta_usuario(app, usuarios, contador_queries):
+    """Testa que, com o estado em cache, o token não consulta a tabela de usuários."""
+    _, professor = usuarios
+    cabecalho = {'Authorization': f'Bearer {professor.gerar_token()}'}
+    client = app.test_client()
+
+    client.get('/api/exercicios', headers=cabecalho)
+    contador_queries.clear()
+    for _ in range(3):
+        trocar_usuario()
+        assert client.get('/api/exercicios', headers=cabecalho).status_code == 200
+
+    assert not [sql for sql in contador_queries if 'usuarios' in sql]
+
+
+def test_token_invalido_ou_ausente(app, usuarios):
+    """Testa que requisições sem token válido não são autenticadas."""
+    client = app.test_client()
+
+    assert client.get('/api/turmas').status_code in (302, 401)
+    trocar_usuario()
+    response = client.get('/api/turmas', headers={'Authorization': 'Bearer abc.def.ghi'})
+    assert response.status_code in (302, 401)
+
+
+def test_token_revogado_ao_alterar_usuario(app, usuarios, login_sessao):
+    """Testa que mudar o tipo do usuário invalida o token já emitido."""
+    gerente, professor = usuarios
+    professor_id = professor.id
+    cabecalho = {'Authorization': f'Bearer {professor.gerar_token()}'}
+    api = app.test_client()
+    assert api.get('/api/exercicios', headers=cabecalho).status_code == 200
+
+    admin = login_sessao(gerente)
+    trocar_usuario()
+    response = admin.put(f'/api/usuarios/{professor_id}', json={'nome': 'Prof. Ana'})
+    assert response.status_code == 200
+    trocar_usuario()
+    assert api.get('/api/exercicios', headers=cabecalho).status_code == 200
+
+    trocar_usuario()
+    response = admin.put(f'/api/usuarios/{professor_id}', json={'tipo': 'recepcionista'})
+    assert response.status_code == 200
+    trocar_usuario()
+    assert api.get('/api/exercicios', headers=cabecalho).status_code != 200
+
+
+def test_token_revogado_ao_inativar_usuario(app, usuarios, login_sessao):
+    """Testa que inativar o usuário invalida o token já emitido."""
+    gerente, professor = usuarios
+    professor_id = professor.id
+    cabecalho = {'Authorization': f'Bearer {professor.gerar_token()}'}
+    api = app.test_client()
+    assert api.get('/api/exercicios', headers=cabecalho).status_code == 200
+
+    admin = login_sessao(gerente)
+    trocar_usuario()
+    assert admin.delete(f'/api/usuarios/{professor_id}').status_code == 200
+    trocar_usuario()
+    assert api.get('/api/exercicios', headers=cabecalho).status_code != 200
@@ -0,0 +1,98 @@
+"""Testes para a validação de CPFs em lote."""
+
+import random
+import pytest
+from datetime import date
+from backend import create_app
+from backend.models import Aluno, db
+from backend.comandos import gymflow
+from backend.utils import validar_cpf, validar_cpfs
+
+
+@pytest.fixture
+def app():
+    """Fixture que cria uma instância do app para testes."""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def gerar_cpf(aleatorio, valido=True):
+    """Gera um CPF com dígitos verificadores corretos (ou não)."""
+    digitos = [aleatorio.randrange(10) for _ in range(9)]
+    for pesos in (range(10, 1, -1), range(11, 1, -1)):
+        soma = sum(peso * digito for peso, digito in zip(pesos, digitos))
+        digitos.append((soma * 10 % 11) % 10)
+    if not valido:
+        digitos[-1] = (digitos[-1] + 1) % 10
+    return ''.join(map(str, digitos))
+
+
+def test_validar_cpfs_equivale_a_validar_cpf():
+    """Testa que o lote dá o mesmo resultado da validação individual."""
+    aleatorio = random.Random(7)
+    cpfs = [gerar_cpf(aleatorio, valido=i % 3 != 0) for i in range(3000)]
+    cpfs = [
+        f'{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}' if i % 2 else cpf
+        for i, cpf in enumerate(cpfs)
+    ]
+    cpfs += [
+        '', None, '123', '111.111.111-11', '00000000000',
+        '123.456.789-09 ', 'cpf: 123.456.789-09', '123.456.789-0٩'
+    ]
+
+    validos, normalizados = validar_cpfs(iter(cpfs))
+
+    assert validos == [validar_cpf(cpf or '') for cpf in cpfs]
+    assert sum(validos) == 2000 + 2
+    assert normalizados[1] == cpfs[1].replace('.', '').replace('-', '')
+    assert normalizados[-7:-1] == ['', '123', '11111111111', '00000000000', '12345678909', '12345678909']
+    assert validos[-3:] == [True, True, False]
+
+
+@pytest.mark.parametrize('semente', range(5))
+def test_validar_cpfs_equivale_a_validar_cpf_com_entradas_aleatorias(semente):
+    """Testa a equivalência com dígitos, máscaras e tamanhos de lote aleatórios."""
+    aleatorio = random.Random(semente)
+    cpfs = []
+    for _ in range(aleatorio.randrange(1, 2000)):
+        if aleatorio.random() < 0.3:
+            cpf = gerar_cpf(aleatorio, valido=aleatorio.random() < 0.5)
+        else:
+            # Dígitos quaisquer, inclusive noves (as maiores somas) e tamanhos errados
+            tamanho = aleatorio.choice([11, 11, 11, 10, 12])
+            cpf = ''.join(aleatorio.choice('0123456789999') for _ in range(tamanho))
+        if aleatorio.random() < 0.5:
+            cpf = f'{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}'
+        cpfs.append(cpf)
+
+    assert validar_cpfs(cpfs)[0] == [validar_cpf(cpf) for cpf in cpfs]
+
+
+def test_validar_cpfs_vazio():
+    """Testa a validação de uma lista vazia ou sem candidatos."""
+    assert validar_cpfs([]) == ([], [])
+    assert validar_cpfs(['', '999.999.999-99']) == ([False, False], ['', '99999999999'])
+
+
+def test_comando_audit_cpfs(app):
+    """Testa a auditoria dos CPFs cadastrados."""
+    for i, cpf in enumerate(['529.982.247-25', '123.456.789-10', '123.456.789-09']):
+        db.session.add(Aluno(
+            nome=f'Aluno {i}',
+            email=f'aluno{i}@teste.com',
+            cpf=cpf,
+            data_nascimento=date(2000, 1, 1)
+        ))
+    db.session.commit()
+
+    saida = app.test_cli_runner().invoke(gymflow, ['audit-cpfs', '--lote', '2'])
+
+    assert saida.exit_code == 0
+    assert '123.456.789-10\tAluno 1' in saida.output
+    assert '529.982.247-25' not in saida.output
+    assert '3 alunos verificados, 1 com CPF inválido' in saida.output